@@ -0,0 +1,29 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 8bb17919e2bf
+Revises: 0127c764fa7f
+Create Date: 2026-10-17 09:10:12.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8bb17919e2bf'
+down_revision = '0127c764fa7f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 游标分页的排序键索引，(tenant_id, 排序字段, id) 同时支持正序和倒序扫描
+    op.create_index('idx_transactions_tenant_date_id', 'transactions', ['tenant_id', 'transaction_date', 'id'], unique=False)
+    op.create_index('idx_projects_tenant_created_id', 'projects', ['tenant_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_suppliers_tenant_created_id', 'suppliers', ['tenant_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_suppliers_tenant_created_id', table_name='suppliers')
+    op.drop_index('idx_projects_tenant_created_id', table_name='projects')
+    op.drop_index('idx_transactions_tenant_date_id', table_name='transactions')
@@ -0,0 +1,48 @@
+"""add_trigram_search_indexes
+
+Revision ID: 3f2a9c6d1e47
+Revises: 8bb17919e2bf
+Create Date: 2026-10-17 09:35:48.207114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c6d1e47'
+down_revision = '8bb17919e2bf'
+branch_labels = None
+depends_on = None
+
+
+# 索引表达式必须与 app/services/search.py 中的搜索文档保持一致
+SEARCH_INDEXES = {
+    'idx_transactions_search_trgm': (
+        'transactions',
+        "coalesce(description, '') || ' ' || coalesce(notes, '') || ' ' || coalesce(reference_number, '')"
+    ),
+    'idx_projects_search_trgm': (
+        'projects',
+        "coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || coalesce(project_code, '')"
+    ),
+    'idx_suppliers_search_trgm': (
+        'suppliers',
+        "coalesce(name, '') || ' ' || coalesce(contact_person, '') || ' ' || coalesce(phone, '') || ' ' || coalesce(email, '')"
+    ),
+}
+
+
+def upgrade() -> None:
+    # pg_trgm 按字符三元组建索引，不依赖分词，对中文关键词同样有效
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, (table_name, expression) in SEARCH_INDEXES.items():
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} "
+            f"USING gin (({expression}) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    for index_name in SEARCH_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
@@ -0,0 +1,59 @@
+"""add_transaction_monthly_rollups
+
+Revision ID: 5c8e1f4a7b92
+Revises: 3f2a9c6d1e47
+Create Date: 2026-10-17 10:10:26.531842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c8e1f4a7b92'
+down_revision = '3f2a9c6d1e47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'transaction_monthly_rollups',
+        sa.Column('tenant_id', sa.UUID(), nullable=False, comment='租户ID'),
+        sa.Column('month', sa.Date(), nullable=False, comment='月份（当月1日）'),
+        sa.Column('type', sa.String(length=10), nullable=False, comment='交易类型: income/expense'),
+        sa.Column('status', sa.String(length=20), nullable=False, comment='交易状态'),
+        sa.Column('category_id', sa.UUID(), nullable=False, comment='分类ID（无分类为全零UUID）'),
+        sa.Column('project_id', sa.UUID(), nullable=False, comment='项目ID（无项目为全零UUID）'),
+        sa.Column('supplier_id', sa.UUID(), nullable=False, comment='供应商ID（无供应商为全零UUID）'),
+        sa.Column('payment_method', sa.String(length=50), nullable=False, comment='支付方式（未填写为空字符串）'),
+        sa.Column('transaction_count', sa.Integer(), nullable=False, comment='交易笔数'),
+        sa.Column('total_amount', sa.DECIMAL(precision=18, scale=2), nullable=False, comment='交易金额合计'),
+        sa.Column('id', sa.UUID(), nullable=False, comment='主键ID'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True, comment='更新时间'),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'tenant_id', 'month', 'type', 'status', 'category_id', 'project_id', 'supplier_id', 'payment_method',
+            name='uq_transaction_monthly_rollup_key'
+        )
+    )
+
+    # 用现有明细初始化汇总（与 app/services/transaction_rollup.py 的 rebuild 一致）
+    op.execute(
+        "INSERT INTO transaction_monthly_rollups "
+        "(id, tenant_id, month, type, status, category_id, project_id, supplier_id, payment_method, "
+        "transaction_count, total_amount) "
+        "SELECT gen_random_uuid(), tenant_id, date_trunc('month', transaction_date)::date, type, "
+        "COALESCE(status, ''), "
+        "COALESCE(category_id, '00000000-0000-0000-0000-000000000000'::uuid), "
+        "COALESCE(project_id, '00000000-0000-0000-0000-000000000000'::uuid), "
+        "COALESCE(supplier_id, '00000000-0000-0000-0000-000000000000'::uuid), "
+        "COALESCE(payment_method, ''), count(*), COALESCE(sum(amount), 0) "
+        "FROM transactions GROUP BY 2, 3, 4, 5, 6, 7, 8, 9"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('transaction_monthly_rollups')
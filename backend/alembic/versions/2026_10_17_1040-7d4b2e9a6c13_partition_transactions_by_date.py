@@ -0,0 +1,156 @@
+"""partition_transactions_by_date
+
+Revision ID: 7d4b2e9a6c13
+Revises: 5c8e1f4a7b92
+Create Date: 2026-10-17 10:40:12.384517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4b2e9a6c13'
+down_revision = '5c8e1f4a7b92'
+branch_labels = None
+depends_on = None
+
+
+# 预先创建的未来月份分区数，与 settings.TRANSACTION_PARTITION_MONTHS_AHEAD 默认值一致
+MONTHS_AHEAD = 3
+
+FOREIGN_KEYS = (
+    ('tenant_id', 'tenants', 'ON DELETE CASCADE'),
+    ('project_id', 'projects', ''),
+    ('supplier_id', 'suppliers', ''),
+    ('category_id', 'categories', ''),
+    ('created_by', 'users', ''),
+)
+
+# 分区表上的索引在父表创建，自动同步到每个分区。
+# LIKE 不复制原表索引，init_database.sql 中的单列索引需在这里重建：
+# idx_transactions_tenant_id 由 idx_transactions_tenant_date_id 的前缀列覆盖，不再单独创建；
+# idx_transactions_project_id 用于删除项目时的外键检查和不带租户条件的按项目查询，
+# 租户复合索引 idx_transactions_tenant_project 以 tenant_id 开头，无法替代
+INDEXES = (
+    "CREATE INDEX idx_transactions_tenant_date_id ON transactions (tenant_id, transaction_date, id)",
+    "CREATE INDEX idx_transactions_project_id ON transactions (project_id)",
+    "CREATE INDEX idx_transactions_search_trgm ON transactions USING gin (("
+    "coalesce(description, '') || ' ' || coalesce(notes, '') || ' ' || coalesce(reference_number, '')"
+    ") gin_trgm_ops)",
+)
+
+# 按月创建分区：transactions_yYYYYmMM 覆盖 [当月1日, 次月1日)。
+# 默认分区 transactions_default 兜底尚未建分区的日期；若默认分区中已有该月数据，
+# 先把这些行移到新表再挂载为分区（直接 CREATE ... PARTITION OF 会因默认分区校验失败）
+CREATE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_transaction_partition(p_month date) RETURNS text AS $$
+DECLARE
+    range_start date := date_trunc('month', p_month)::date;
+    range_end date := (date_trunc('month', p_month) + interval '1 month')::date;
+    partition_name text := 'transactions_' || to_char(range_start, '"y"YYYY"m"MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM transactions_default
+        WHERE transaction_date >= range_start AND transaction_date < range_end
+    ) THEN
+        EXECUTE format('CREATE TABLE %I (LIKE transactions INCLUDING DEFAULTS)', partition_name);
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM transactions_default '
+            'WHERE transaction_date >= %L AND transaction_date < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            range_start, range_end, partition_name
+        );
+        EXECUTE format(
+            'ALTER TABLE transactions ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+            partition_name, range_start, range_end
+        );
+    ELSE
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+            partition_name, range_start, range_end
+        );
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_transaction_partitions(p_months_ahead integer) RETURNS integer AS $$
+DECLARE
+    created integer := 0;
+    month_offset integer;
+    partition_name text;
+BEGIN
+    FOR month_offset IN 0..p_months_ahead LOOP
+        partition_name := 'transactions_' || to_char(
+            date_trunc('month', current_date) + make_interval(months => month_offset), '"y"YYYY"m"MM'
+        );
+        IF to_regclass(partition_name) IS NULL THEN
+            PERFORM create_transaction_partition(
+                (date_trunc('month', current_date) + make_interval(months => month_offset))::date
+            );
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE transactions RENAME TO transactions_legacy")
+    op.execute(
+        "CREATE TABLE transactions (LIKE transactions_legacy INCLUDING DEFAULTS INCLUDING COMMENTS) "
+        "PARTITION BY RANGE (transaction_date)"
+    )
+    op.execute("CREATE TABLE transactions_default PARTITION OF transactions DEFAULT")
+    op.execute(CREATE_PARTITION_FUNCTION)
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+
+    # 为已有数据涉及的每个月以及未来月份建分区，再整体复制数据
+    op.execute(
+        "SELECT create_transaction_partition(month) FROM ("
+        "SELECT DISTINCT date_trunc('month', transaction_date)::date AS month FROM transactions_legacy"
+        ") AS months ORDER BY month"
+    )
+    op.execute(f"SELECT ensure_transaction_partitions({MONTHS_AHEAD})")
+    op.execute("INSERT INTO transactions SELECT * FROM transactions_legacy")
+    op.execute("DROP TABLE transactions_legacy")
+
+    # 分区表的主键必须包含分区键
+    op.execute("ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY (id, transaction_date)")
+    for column, referenced_table, on_delete in FOREIGN_KEYS:
+        op.execute(
+            f"ALTER TABLE transactions ADD CONSTRAINT transactions_{column}_fkey "
+            f"FOREIGN KEY ({column}) REFERENCES {referenced_table} (id) {on_delete}"
+        )
+    for statement in INDEXES:
+        op.execute(statement)
+    op.execute("ANALYZE transactions")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE transactions RENAME TO transactions_partitioned")
+    op.execute(
+        "CREATE TABLE transactions (LIKE transactions_partitioned INCLUDING DEFAULTS INCLUDING COMMENTS)"
+    )
+    op.execute("INSERT INTO transactions SELECT * FROM transactions_partitioned")
+    op.execute("DROP TABLE transactions_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS ensure_transaction_partitions(integer)")
+    op.execute("DROP FUNCTION IF EXISTS create_transaction_partition(date)")
+
+    op.execute("ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY (id)")
+    for column, referenced_table, on_delete in FOREIGN_KEYS:
+        op.execute(
+            f"ALTER TABLE transactions ADD CONSTRAINT transactions_{column}_fkey "
+            f"FOREIGN KEY ({column}) REFERENCES {referenced_table} (id) {on_delete}"
+        )
+    for statement in INDEXES:
+        op.execute(statement)
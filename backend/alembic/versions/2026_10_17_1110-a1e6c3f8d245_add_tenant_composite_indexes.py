@@ -0,0 +1,91 @@
+"""add_tenant_composite_indexes
+
+Revision ID: a1e6c3f8d245
+Revises: 7d4b2e9a6c13
+Create Date: 2026-10-17 11:10:37.902416
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1e6c3f8d245'
+down_revision = '7d4b2e9a6c13'
+branch_labels = None
+depends_on = None
+
+
+# (tenant_id, transaction_date) 和 projects 的 (tenant_id, created_at) 已由游标分页索引覆盖，这里不再重复创建。
+# 索引定义与 app/models 中的 Index 保持一致：名称 -> (列定义, INCLUDE 列, WHERE 条件, 分区后缀)
+TRANSACTION_INDEXES = {
+    # 统计接口的明细聚合（ledger_source 的边缘月份）只读这些列，可走仅索引扫描
+    'idx_transactions_tenant_date_cover': (
+        'tenant_id, transaction_date',
+        'type, status, amount, project_id, category_id, supplier_id, payment_method',
+        None, 'date_cover_idx'
+    ),
+    # 待审批列表和计数，只索引 pending 记录
+    'idx_transactions_tenant_pending': (
+        'tenant_id, transaction_date', None, "status = 'pending'", 'pending_idx'
+    ),
+    'idx_transactions_tenant_supplier': (
+        'tenant_id, supplier_id, transaction_date', None, 'supplier_id IS NOT NULL', 'supplier_idx'
+    ),
+    'idx_transactions_tenant_category': (
+        'tenant_id, category_id, transaction_date', None, None, 'category_idx'
+    ),
+    'idx_transactions_tenant_project': (
+        'tenant_id, project_id, transaction_date', None, None, 'project_idx'
+    ),
+}
+
+PROJECT_INDEXES = {
+    # 按状态筛选的项目列表
+    'idx_projects_tenant_status_created': ('tenant_id, status, created_at', None, None),
+}
+
+
+def _index_clause(columns, include, where):
+    clause = f"({columns})"
+    if include:
+        clause += f" INCLUDE ({include})"
+    if where:
+        clause += f" WHERE {where}"
+    return clause
+
+
+def _transaction_partitions():
+    result = op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits AS i JOIN pg_class AS c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'transactions'::regclass ORDER BY c.relname"
+    ))
+    return [row[0] for row in result]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY 不能在事务中执行，也不能直接用于分区表：
+    # 先在父表上建 ON ONLY 的空索引，再逐个分区并发建索引并挂载，全部挂载后父表索引自动生效
+    with op.get_context().autocommit_block():
+        partitions = _transaction_partitions()
+        for index_name, (columns, include, where, suffix) in TRANSACTION_INDEXES.items():
+            clause = _index_clause(columns, include, where)
+            op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON ONLY transactions {clause}")
+            for partition in partitions:
+                partition_index = f"{partition}_{suffix}"
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition} {clause}")
+                op.execute(f"ALTER INDEX {index_name} ATTACH PARTITION {partition_index}")
+
+        for index_name, (columns, include, where) in PROJECT_INDEXES.items():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON projects {_index_clause(columns, include, where)}"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name in PROJECT_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+        # 分区表的索引不支持 CONCURRENTLY 删除，删除父表索引会一并删除各分区上的索引
+        for index_name in TRANSACTION_INDEXES:
+            op.execute(f"DROP INDEX IF EXISTS {index_name}")
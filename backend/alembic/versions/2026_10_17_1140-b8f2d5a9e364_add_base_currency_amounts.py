@@ -0,0 +1,100 @@
+"""add_base_currency_amounts
+
+Revision ID: b8f2d5a9e364
+Revises: a1e6c3f8d245
+Create Date: 2026-10-17 11:40:03.615720
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8f2d5a9e364'
+down_revision = 'a1e6c3f8d245'
+branch_labels = None
+depends_on = None
+
+
+# 与 settings.BASE_CURRENCY 默认值一致
+BASE_CURRENCY = 'CNY'
+NONE_ID = "'00000000-0000-0000-0000-000000000000'::uuid"
+
+# 统计聚合改为汇总 amount_base，覆盖索引随之替换 INCLUDE 列（定义与 app/models 中的 Index 一致）
+COVER_INDEX = 'idx_transactions_tenant_date_cover'
+COVER_INCLUDE = 'type, status, {amount}, project_id, category_id, supplier_id, payment_method'
+
+
+def _rebuild_cover_index(amount_column):
+    # 本迁移已整表更新 transactions，这里直接在分区表父表上重建（各分区一并建索引）
+    op.execute(f"DROP INDEX IF EXISTS {COVER_INDEX}")
+    op.execute(
+        f"CREATE INDEX {COVER_INDEX} ON transactions (tenant_id, transaction_date) "
+        f"INCLUDE ({COVER_INCLUDE.format(amount=amount_column)})"
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        'exchange_rates',
+        sa.Column('tenant_id', sa.UUID(), nullable=False, comment='租户ID'),
+        sa.Column('currency', sa.String(length=10), nullable=False, comment='货币类型'),
+        sa.Column('rate', sa.DECIMAL(precision=10, scale=6), nullable=False, comment='汇率（1单位外币折合本位币）'),
+        sa.Column('effective_date', sa.Date(), nullable=False, comment='生效日期'),
+        sa.Column('created_by', sa.UUID(), nullable=True, comment='创建人'),
+        sa.Column('id', sa.UUID(), nullable=False, comment='主键ID'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True, comment='更新时间'),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', 'currency', 'effective_date', name='uq_exchange_rate_currency_date')
+    )
+
+    # 已有记录按各自保存的汇率换算；本位币记录直接取原金额
+    op.add_column(
+        'transactions',
+        sa.Column('amount_base', sa.DECIMAL(precision=15, scale=2), nullable=True,
+                  comment='本位币金额（写入时按汇率换算，统计汇总使用）')
+    )
+    op.execute(
+        f"UPDATE transactions SET amount_base = CASE "
+        f"WHEN currency IS NULL OR upper(currency) = '{BASE_CURRENCY}' THEN amount "
+        f"ELSE round(amount * COALESCE(NULLIF(exchange_rate, 0), 1), 2) END"
+    )
+    op.alter_column('transactions', 'amount_base', nullable=False)
+    _rebuild_cover_index('amount_base')
+
+    # 只有存在外币记录时，月度汇总和项目实际成本才与原金额口径不同，需要按本位币金额重算
+    has_foreign = op.get_bind().execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM transactions WHERE amount_base <> amount)"
+    )).scalar()
+    if not has_foreign:
+        return
+
+    op.execute("DELETE FROM transaction_monthly_rollups")
+    op.execute(
+        "INSERT INTO transaction_monthly_rollups "
+        "(id, tenant_id, month, type, status, category_id, project_id, supplier_id, payment_method, "
+        "transaction_count, total_amount) "
+        "SELECT gen_random_uuid(), tenant_id, date_trunc('month', transaction_date)::date, type, "
+        f"COALESCE(status, ''), COALESCE(category_id, {NONE_ID}), COALESCE(project_id, {NONE_ID}), "
+        f"COALESCE(supplier_id, {NONE_ID}), COALESCE(payment_method, ''), count(*), COALESCE(sum(amount_base), 0) "
+        "FROM transactions GROUP BY 2, 3, 4, 5, 6, 7, 8, 9"
+    )
+    op.execute(
+        "UPDATE projects AS p SET actual_cost = COALESCE(s.total, 0), "
+        "cost_variance = p.budget - COALESCE(s.total, 0), "
+        "budget_utilization = CASE WHEN COALESCE(p.budget, 0) = 0 THEN NULL "
+        "ELSE GREATEST(LEAST(round(COALESCE(s.total, 0) / p.budget * 100, 2), 999.99), -999.99) END "
+        "FROM projects AS base "
+        "LEFT JOIN (SELECT project_id, SUM(amount_base) AS total FROM transactions "
+        "WHERE type = 'expense' GROUP BY project_id) AS s ON s.project_id = base.id "
+        "WHERE p.id = base.id"
+    )
+
+
+def downgrade() -> None:
+    _rebuild_cover_index('amount')
+    op.drop_column('transactions', 'amount_base')
+    op.drop_table('exchange_rates')
@@ -0,0 +1,39 @@
+"""add_daily_snapshot_key
+
+Revision ID: c4a7e2d9f158
+Revises: b8f2d5a9e364
+Create Date: 2026-10-17 12:10:27.204816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a7e2d9f158'
+down_revision = 'b8f2d5a9e364'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # system_statistics 之前只由 create_monitoring_tables.py 创建，未执行该脚本的库在此补建
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS system_statistics (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            tenant_id UUID REFERENCES tenants(id),
+            stat_date DATE NOT NULL,
+            stat_type VARCHAR(50) NOT NULL,
+            stat_data JSONB NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        )
+    """)
+    # 每日快照以 (租户, 日期, 类型) 为键 upsert，同时覆盖按租户、日期范围读取
+    op.create_unique_constraint(
+        'uq_system_statistics_tenant_date_type', 'system_statistics', ['tenant_id', 'stat_date', 'stat_type']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_system_statistics_tenant_date_type', 'system_statistics', type_='unique')
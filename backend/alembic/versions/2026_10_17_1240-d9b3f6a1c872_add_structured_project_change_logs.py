@@ -0,0 +1,35 @@
+"""add_structured_project_change_logs
+
+Revision ID: d9b3f6a1c872
+Revises: c4a7e2d9f158
+Create Date: 2026-10-17 12:40:51.338204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9b3f6a1c872'
+down_revision = 'c4a7e2d9f158'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 新记录把每个字段的变更存为 [{field, old, new, reason}]，展示文本在读取时生成；
+    # 历史记录保留 change_description 中已生成的文本
+    op.add_column(
+        'project_change_logs',
+        sa.Column('changes', postgresql.JSONB(astext_type=sa.Text()), nullable=True,
+                  comment='结构化变更明细 [{field, old, new, reason}]')
+    )
+    op.create_index(
+        'idx_project_change_logs_project_created', 'project_change_logs', ['project_id', 'created_at', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_project_change_logs_project_created', table_name='project_change_logs')
+    op.drop_column('project_change_logs', 'changes')
@@ -2,8 +2,9 @@
 租户管理API接口
 """
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, update, text
+from sqlalchemy import select, func, desc, update
 from sqlalchemy.orm import selectinload
 from typing import List, Optional, Dict, Any
 import secrets
@@ -15,9 +16,10 @@ from ...core.database import get_db
 from ...core.auth import require_super_admin
 from ...models.monitoring import AdminOperationLog
 from ...models.user import User
-from ...models.tenant import Tenant
+from ...models.tenant import Tenant, TENANT_DELETING
 from ...models.project import Project
 from ...models.transaction import Transaction
+from ...services import cascade_delete
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -377,6 +379,17 @@ async def reset_tenant_password(
         logger.error(f"重置租户密码失败: {str(e)}")
         raise HTTPException(status_code=500, detail="重置租户密码失败")
 
+@router.get("/tenants/delete-jobs/{job_id}")
+async def get_tenant_delete_job(
+    job_id: str,
+    current_user: User = Depends(require_super_admin)
+):
+    """查询租户删除任务状态和进度"""
+    job = await cascade_delete.get_status(job_id)
+    if job is None or (job["target_type"] is not None and job["target_type"] != cascade_delete.TENANT):
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+    return job
+
 @router.delete("/tenants/{tenant_id}")
 async def delete_tenant(
     tenant_id: str,
@@ -384,16 +397,18 @@ async def delete_tenant(
     db: AsyncSession = Depends(get_db),
     request: Request = None
 ):
-    """删除租户（危险操作）"""
+    """删除租户（危险操作，后台任务分批删除，通过 GET /admin/tenants/delete-jobs/{job_id} 查询进度）"""
     try:
         # 检查租户是否存在
         result = await db.execute(
-            select(Tenant).where(Tenant.id == tenant_id)
+            select(Tenant).where(Tenant.id == tenant_id).with_for_update()
         )
         tenant = result.scalar_one_or_none()
         
         if not tenant:
             raise HTTPException(status_code=404, detail="租户不存在")
+        if tenant.status == TENANT_DELETING:
+            raise HTTPException(status_code=409, detail="租户正在删除")
         
         # 防止删除监控系统租户
         if tenant.name == "监控系统":
@@ -425,43 +440,18 @@ async def delete_tenant(
             "transactions_count": transactions_count
         }
         
-        # 执行删除操作（级联删除）
-        # 使用SQLAlchemy ORM来确保级联删除
-        # 删除财务记录
-        await db.execute(
-            text("DELETE FROM transactions WHERE tenant_id = :tenant_id"),
-            {"tenant_id": tenant_id}
-        )
-        
-        # 删除项目
-        await db.execute(
-            text("DELETE FROM projects WHERE tenant_id = :tenant_id"),
-            {"tenant_id": tenant_id}
-        )
-        
-        # 删除分类
-        await db.execute(
-            text("DELETE FROM categories WHERE tenant_id = :tenant_id"),
-            {"tenant_id": tenant_id}
-        )
-        
-        # 删除供应商
-        await db.execute(
-            text("DELETE FROM suppliers WHERE tenant_id = :tenant_id"),
-            {"tenant_id": tenant_id}
-        )
-        
-        # 删除用户
-        await db.execute(
-            text("DELETE FROM users WHERE tenant_id = :tenant_id"),
-            {"tenant_id": tenant_id}
-        )
-        
-        # 删除租户
-        await db.execute(
-            text("DELETE FROM tenants WHERE id = :tenant_id"),
-            {"tenant_id": tenant_id}
-        )
+        # 标记租户删除中（该租户用户的请求随即被拒绝），下属数据由后台任务按外键依赖顺序分批删除
+        previous_status = tenant.status
+        tenant.status = TENANT_DELETING
+        await db.commit()
+        try:
+            job_id = await cascade_delete.submit(cascade_delete.TENANT, tenant.id, tenant.id)
+        except Exception:
+            await db.execute(
+                update(Tenant).where(Tenant.id == tenant.id).values(status=previous_status)
+            )
+            await db.commit()
+            raise
         
         # 记录操作日志
         await log_admin_operation(
@@ -470,6 +460,7 @@ async def delete_tenant(
             target_id=tenant_id,
             operation_details={
                 "tenant_info": tenant_info,
+                "job_id": job_id,
                 "deleted_data": {
                     "users": users_count,
                     "projects": projects_count,
@@ -481,12 +472,17 @@ async def delete_tenant(
             db=db
         )
         
-        return {
-            "success": True,
-            "message": "租户删除成功",
-            "deleted_tenant": tenant_info,
-            "warning": "此操作不可逆，所有相关数据已被永久删除"
-        }
+        return JSONResponse(
+            status_code=202,
+            content={
+                "success": True,
+                "message": "租户删除任务已提交",
+                "deleted_tenant": tenant_info,
+                "job_id": job_id,
+                "status_url": f"/api/v1/admin/tenants/delete-jobs/{job_id}",
+                "warning": "此操作不可逆，所有相关数据将被永久删除"
+            }
+        )
         
     except HTTPException:
         raise
@@ -9,7 +9,7 @@ from typing import Optional, List
 from datetime import datetime
 
 from ...core.auth import get_current_user, require_permissions
-from ...core.database import get_db
+from ...core.database import get_db, get_read_db
 from ...models.user import User
 from ...models.transaction import Category, Transaction
 from ...schemas.transaction import (
@@ -122,7 +122,7 @@ async def get_categories(
     parent_id: Optional[str] = Query(None, description="父分类ID筛选"),
     is_active: Optional[bool] = Query(None, description="激活状态筛选"),
     current_user: User = Depends(require_permissions(["category_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取分类列表
@@ -145,7 +145,7 @@ async def get_categories(
         categories_query = select(
             Category,
             func.count(Transaction.id).label('transaction_count'),
-            func.coalesce(func.sum(Transaction.amount), 0).label('total_amount')
+            func.coalesce(func.sum(Transaction.amount_base), 0).label('total_amount')
         ).outerjoin(Transaction, Category.id == Transaction.category_id).where(
             and_(*query_conditions)
         ).group_by(Category.id).order_by(
@@ -211,7 +211,7 @@ async def get_category(
         category_query = select(
             Category,
             func.count(Transaction.id).label('transaction_count'),
-            func.sum(Transaction.amount).label('total_amount')
+            func.sum(Transaction.amount_base).label('total_amount')
         ).select_from(
             Category.__table__.outerjoin(Transaction.__table__)
         ).where(
@@ -375,7 +375,7 @@ async def update_category(
         stats_result = await db.execute(
             select(
                 func.count(Transaction.id).label('transaction_count'),
-                func.sum(Transaction.amount).label('total_amount')
+                func.sum(Transaction.amount_base).label('total_amount')
             ).where(Transaction.category_id == category_id)
         )
         stats = stats_result.first()
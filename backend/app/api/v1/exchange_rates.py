@@ -0,0 +1,124 @@
+"""
+汇率管理API端点
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, desc
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Optional, List
+from datetime import datetime
+import uuid
+
+from ...core.auth import require_permissions
+from ...core.database import get_db, get_read_db
+from ...models.user import User
+from ...models.transaction import ExchangeRate
+from ...schemas.transaction import ExchangeRateUpsert, ExchangeRateResponse
+from ...services.currency import is_base_currency
+
+router = APIRouter(prefix="/exchange-rates", tags=["汇率管理"])
+
+def _build_exchange_rate_response(exchange_rate: ExchangeRate) -> ExchangeRateResponse:
+    return ExchangeRateResponse(
+        id=str(exchange_rate.id),
+        currency=exchange_rate.currency,
+        rate=exchange_rate.rate,
+        effective_date=exchange_rate.effective_date,
+        created_at=exchange_rate.created_at
+    )
+
+@router.get("/", response_model=List[ExchangeRateResponse], summary="获取汇率列表")
+async def get_exchange_rates(
+    currency: Optional[str] = Query(None, description="货币类型筛选"),
+    current_user: User = Depends(require_permissions(["transaction_read"])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    获取汇率列表，按货币和生效日期倒序排列
+
+    需要权限: transaction_read
+    """
+    query_conditions = [ExchangeRate.tenant_id == current_user.tenant_id]
+    if currency:
+        query_conditions.append(ExchangeRate.currency == currency.upper())
+
+    result = await db.execute(
+        select(ExchangeRate)
+        .where(and_(*query_conditions))
+        .order_by(ExchangeRate.currency, desc(ExchangeRate.effective_date))
+    )
+    return [_build_exchange_rate_response(exchange_rate) for exchange_rate in result.scalars().all()]
+
+@router.put("/", response_model=ExchangeRateResponse, summary="设置汇率")
+async def upsert_exchange_rate(
+    rate_data: ExchangeRateUpsert,
+    current_user: User = Depends(require_permissions(["transaction_update"])),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    设置某货币自生效日期起的汇率，同一货币同一生效日期已存在时覆盖
+
+    只影响之后写入的记录，已有记录保留写入时的汇率和本位币金额
+
+    需要权限: transaction_update
+    """
+    currency = rate_data.currency.strip().upper()
+    if is_base_currency(currency):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="本位币不需要设置汇率"
+        )
+
+    try:
+        statement = pg_insert(ExchangeRate).values(
+            id=uuid.uuid4(),
+            tenant_id=current_user.tenant_id,
+            currency=currency,
+            rate=rate_data.rate,
+            effective_date=rate_data.effective_date,
+            created_by=current_user.id
+        )
+        statement = statement.on_conflict_do_update(
+            constraint="uq_exchange_rate_currency_date",
+            set_={"rate": statement.excluded.rate, "updated_at": datetime.utcnow()}
+        ).returning(ExchangeRate)
+        result = await db.execute(statement)
+        exchange_rate = result.scalar_one()
+        await db.commit()
+        return _build_exchange_rate_response(exchange_rate)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"设置汇率失败: {str(e)}"
+        )
+
+@router.delete("/{exchange_rate_id}", summary="删除汇率")
+async def delete_exchange_rate(
+    exchange_rate_id: str,
+    current_user: User = Depends(require_permissions(["transaction_update"])),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    删除汇率
+
+    需要权限: transaction_update
+    """
+    result = await db.execute(
+        select(ExchangeRate).where(
+            and_(
+                ExchangeRate.id == exchange_rate_id,
+                ExchangeRate.tenant_id == current_user.tenant_id
+            )
+        )
+    )
+    exchange_rate = result.scalar_one_or_none()
+    if not exchange_rate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="汇率不存在"
+        )
+
+    await db.delete(exchange_rate)
+    await db.commit()
+    return {"message": "汇率已删除"}
@@ -10,7 +10,8 @@ import time
 import logging
 from datetime import datetime, date, timedelta
 
-from ...core.database import get_db
+from ...core.database import get_db, db_manager
+from ...core.cache import stats_cache
 from ...core.auth import get_current_user, require_super_admin
 from ...models.monitoring import MonitoringData, AdminOperationLog, SystemStatistics, TenantActivity, HealthCheck
 from ...models.user import User
@@ -255,6 +256,36 @@ async def detailed_health_check(
         logger.error(f"详细健康检查失败: {str(e)}")
         raise HTTPException(status_code=500, detail="详细健康检查失败")
 
+@router.get("/database/pool")
+async def get_database_pool_status(
+    current_user: User = Depends(require_super_admin)
+):
+    """获取数据库连接池状态（借出/空闲连接数、等待数、获取连接耗时分布）"""
+    try:
+        return {
+            "timestamp": time.time(),
+            **db_manager.get_pool_status()
+        }
+
+    except Exception as e:
+        logger.error(f"获取连接池状态失败: {str(e)}")
+        raise HTTPException(status_code=500, detail="获取连接池状态失败")
+
+@router.get("/cache/statistics")
+async def get_statistics_cache_status(
+    current_user: User = Depends(require_super_admin)
+):
+    """获取统计结果缓存状态（命中/未命中次数、命中率、各接口明细）"""
+    try:
+        return {
+            "timestamp": time.time(),
+            **stats_cache.get_metrics()
+        }
+
+    except Exception as e:
+        logger.error(f"获取统计缓存状态失败: {str(e)}")
+        raise HTTPException(status_code=500, detail="获取统计缓存状态失败")
+
 @router.get("/overview")
 async def get_system_overview(
     current_user: User = Depends(require_super_admin),
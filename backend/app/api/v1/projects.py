@@ -1,67 +1,118 @@
 """项目管理API端点"""
-from fastapi import APIRouter, Depends, HTTPException, status as http_status, Query
+from fastapi import APIRouter, Depends, HTTPException, status as http_status, Query, Response
 from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc, text, case
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, and_, desc, tuple_
+from sqlalchemy.orm import selectinload, load_only
 from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
 
 from ...core.auth import get_current_user, require_permissions
-from ...core.database import get_db
+from ...core.database import get_db, get_read_db
+from ...core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from ...services.search import PROJECT_SEARCH_DOCUMENT, keyword_filter, keyword_rank
+from ...services import project_costs, project_statistics, project_clone, cascade_delete
 from ...models.user import User
-from ...models.project import Project, ProjectChangeLog
+from ...models.project import Project, ProjectChangeLog, PROJECT_DELETING
 from ...models.transaction import Transaction
 from ...schemas.project import (
     ProjectCreate, ProjectUpdate, ProjectResponse, ProjectListResponse,
     ProjectStatistics, ProjectQueryParams, ProjectStatusEnum, ProjectTypeEnum,
-    ProjectPriorityEnum, ChangeLogResponse
+    ProjectPriorityEnum, ChangeLogResponse, ProjectCloneRequest, ProjectBulkCloneRequest,
+    ProjectCloneResult
 )
 
 router = APIRouter(prefix="/projects")
 
+# 项目列表只加载响应用到的列，技术规格、需求、审批历史、文档等大字段（JSONB）留到详情接口加载
+PROJECT_LIST_COLUMNS = (
+    Project.id, Project.tenant_id, Project.project_code, Project.name, Project.description,
+    Project.project_type, Project.priority, Project.status,
+    Project.start_date, Project.end_date, Project.actual_end_date,
+    Project.budget, Project.contract_value, Project.actual_cost,
+    Project.location, Project.client_info, Project.tags,
+    Project.manager_id, Project.manager_name, Project.created_by, Project.created_at, Project.updated_at,
+)
+
+def project_list_options():
+    """项目列表的加载方式：只取列表列，项目经理只取主键"""
+    return (
+        load_only(*PROJECT_LIST_COLUMNS),
+        selectinload(Project.manager).load_only(User.id),
+    )
+
+def _build_project_list_query(
+    tenant_id,
+    status: Optional[ProjectStatusEnum] = None,
+    type: Optional[ProjectTypeEnum] = None,
+    priority: Optional[ProjectPriorityEnum] = None,
+    search: Optional[str] = None
+):
+    """构建项目列表查询（租户隔离+筛选条件），不含排序和分页"""
+    query = select(Project).options(*project_list_options()).where(Project.tenant_id == tenant_id)
+    
+    if status:
+        query = query.where(Project.status == status)
+    if type:
+        query = query.where(Project.type == type)
+    if priority:
+        query = query.where(Project.priority == priority)
+    if search:
+        # 匹配名称、描述、项目编号拼接的搜索文档（pg_trgm索引）
+        query = query.where(keyword_filter(PROJECT_SEARCH_DOCUMENT, search))
+    
+    return query
+
 # 根路径路由必须在参数化路由之前定义，避免路由冲突
 @router.get("/", response_model=List[ProjectResponse])
 async def get_projects(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="分页游标（来自上一页的X-Next-Cursor响应头，传入后忽略skip）"),
     status: Optional[ProjectStatusEnum] = None,
     type: Optional[ProjectTypeEnum] = None,
     priority: Optional[ProjectPriorityEnum] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    sort_by_relevance: bool = Query(False, description="有搜索关键词时按相关度排序（不支持游标分页）")
 ):
-    """获取项目列表"""
+    """获取项目列表，页满时在X-Next-Cursor响应头返回下一页游标"""
     try:
-        # 构建查询条件 - 添加租户隔离
-        query = select(Project).options(selectinload(Project.manager))
-        
-        # 添加租户隔离条件
-        query = query.where(Project.tenant_id == current_user.tenant_id)
-        
-        # 添加过滤条件
-        if status:
-            query = query.where(Project.status == status)
-        if type:
-            query = query.where(Project.type == type)
-        if priority:
-            query = query.where(Project.priority == priority)
-        if search:
-            search_filter = or_(
-                Project.name.contains(search),
-                Project.description.contains(search),
-                Project.project_code.contains(search)
-            )
-            query = query.where(search_filter)
+        query = _build_project_list_query(
+            current_user.tenant_id, status=status, type=type, priority=priority, search=search
+        )
         
-        # 添加分页和排序
-        query = query.offset(skip).limit(limit).order_by(desc(Project.created_at))
+        # 按相关度排序时只支持skip/limit分页
+        rank_by_relevance = bool(search and sort_by_relevance)
+        if rank_by_relevance:
+            if cursor:
+                raise HTTPException(
+                    status_code=http_status.HTTP_400_BAD_REQUEST,
+                    detail="按相关度排序时不支持游标分页"
+                )
+            query = query.order_by(desc(keyword_rank(PROJECT_SEARCH_DOCUMENT, search)))
+        
+        # 添加分页和排序（按创建时间+ID排序，保证分页稳定）
+        query = query.order_by(desc(Project.created_at), desc(Project.id))
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor, datetime.fromisoformat, UUID)
+            query = query.where(
+                tuple_(Project.created_at, Project.id) < tuple_(cursor_created_at, cursor_id)
+            )
+        else:
+            query = query.offset(skip)
+        query = query.limit(limit)
         
         result = await db.execute(query)
         projects = result.scalars().unique().all()
         
+        if len(projects) == limit and not rank_by_relevance:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(projects[-1].created_at, projects[-1].id)
+        
         # 转换为前端期望的格式
         formatted_projects = []
         for project in projects:
@@ -134,6 +185,8 @@ async def get_projects(
         
         return formatted_projects
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"DEBUG: get_projects 函数出错: {str(e)}")
         import traceback
@@ -146,10 +199,136 @@ async def get_projects(
 
 
 # 统计API必须在项目详情API之前定义，避免路由冲突
+# 各项目统计接口均从 project_statistics.load_dashboard 的同一份聚合结果格式化
+
+# 状态颜色映射
+STATUS_COLORS = {
+    'planning': '#909399',
+    'in_progress': '#409eff',
+    'on_hold': '#e6a23c',
+    'completed': '#67c23a',
+    'cancelled': '#f56c6c',
+    'delayed': '#f56c6c'
+}
+
+# 状态名称映射
+STATUS_NAMES = {
+    'planning': '规划中',
+    'in_progress': '进行中',
+    'on_hold': '暂停',
+    'completed': '已完成',
+    'cancelled': '已取消',
+    'delayed': '延期'
+}
+
+# 类型名称映射
+TYPE_NAMES = {
+    'construction': '建筑工程',
+    'decoration': '装饰工程',
+    'municipal': '市政工程',
+    'electrical': '电气工程',
+    'mechanical': '机械工程',
+    'industrial': '工业工程',
+    'residential': '住宅工程',
+    'commercial': '商业工程',
+    'infrastructure': '基础设施工程',
+    'renovation': '改造工程',
+    'maintenance': '维护工程',
+    'other': '其他工程'
+}
+
+# 优先级名称映射
+PRIORITY_NAMES = {
+    'low': '低',
+    'medium': '中',
+    'high': '高',
+    'urgent': '紧急'
+}
+
+def _overview(dashboard: dict) -> dict:
+    status_counts = dashboard["status_counts"]
+    return {
+        "total_projects": dashboard["total_projects"],
+        "completed_projects": status_counts.get('completed', 0),
+        "ongoing_projects": status_counts.get('in_progress', 0),
+        "delayed_projects": status_counts.get('delayed', 0),
+        "planning_projects": status_counts.get('planning', 0),
+        "total_budget": dashboard["total_budget"],
+        "total_contract_amount": dashboard["total_contract_amount"]
+    }
+
+def _status_distribution(dashboard: dict) -> list:
+    return [
+        {
+            'name': STATUS_NAMES.get(status, status),
+            'value': count,
+            'itemStyle': { 'color': STATUS_COLORS.get(status, '#909399') }
+        }
+        for status, count in dashboard["status_counts"].items()
+    ]
+
+def _type_distribution(dashboard: dict) -> list:
+    return [
+        {
+            'name': TYPE_NAMES.get(project_type, project_type),
+            'value': count,
+            'itemStyle': { 'color': f'#{hash(project_type) % 0xFFFFFF:06x}' }
+        }
+        for project_type, count in dashboard["type_counts"].items()
+    ]
+
+def _priority_distribution(dashboard: dict) -> list:
+    return [
+        {'priority': priority, 'name': PRIORITY_NAMES.get(priority, priority), 'value': count}
+        for priority, count in dashboard["priority_counts"].items()
+    ]
+
+def _progress_distribution(dashboard: dict) -> list:
+    return [
+        {'range': progress_range, 'count': count}
+        for progress_range, count in dashboard["progress_counts"].items()
+    ]
+
+def _monthly_trend(dashboard: dict, months: int) -> list:
+    return [
+        {'month': item['month'], 'projects': item['projects'], 'budget': item['budget']}
+        for item in dashboard["monthly_trend"][-months:]
+    ]
+
+@router.get("/statistics/dashboard", summary="获取项目统计看板")
+async def get_project_dashboard(
+    months: int = Query(6, ge=1, le=project_statistics.TREND_MONTHS, description="趋势统计月数"),
+    current_user: User = Depends(require_permissions(["project_read"])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    一次返回项目统计概览、状态/类型/优先级/进度分布和月度趋势
+    
+    数据来自单次聚合（结果按租户数据版本缓存），与各单项统计接口一致
+    
+    需要权限: project_read
+    """
+    try:
+        dashboard = await project_statistics.load_dashboard(db, current_user.tenant_id)
+        return {
+            "overview": _overview(dashboard),
+            "status_distribution": _status_distribution(dashboard),
+            "type_distribution": _type_distribution(dashboard),
+            "priority_distribution": _priority_distribution(dashboard),
+            "progress_distribution": _progress_distribution(dashboard),
+            "monthly_trend": _monthly_trend(dashboard, months)
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取项目统计看板失败: {str(e)}"
+        )
+
 @router.get("/statistics", summary="获取项目统计概览")
 async def get_project_statistics(
     current_user: User = Depends(require_permissions(["project_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取项目统计概览数据
@@ -157,63 +336,10 @@ async def get_project_statistics(
     需要权限: project_read
     """
     try:
-        print(f"开始获取项目统计，用户ID: {current_user.id}, 租户ID: {current_user.tenant_id}")
-        
-        # 构建基础查询条件
-        base_conditions = [Project.tenant_id == current_user.tenant_id]
-        
-        # 1. 项目总数
-        total_query = await db.execute(
-            select(func.count(Project.id)).where(and_(*base_conditions))
-        )
-        total_projects = total_query.scalar() or 0
-        print(f"项目总数: {total_projects}")
-        
-        # 2. 各状态项目数量
-        status_query = await db.execute(
-            select(
-                Project.status,
-                func.count(Project.id).label('count')
-            ).where(and_(*base_conditions))
-            .group_by(Project.status)
-        )
-        
-        status_counts = {}
-        for row in status_query.all():
-            status_counts[row.status] = row.count
-            print(f"状态 {row.status}: {row.count} 个项目")
-        
-        # 3. 总预算和合同金额
-        financial_query = await db.execute(
-            select(
-                func.sum(Project.budget).label('total_budget'),
-                func.sum(Project.contract_value).label('total_contract_amount')
-            ).where(and_(*base_conditions))
-        )
-        financial_data = financial_query.first()
-        
-        total_budget = float(financial_data.total_budget or 0)
-        total_contract_amount = float(financial_data.total_contract_amount or 0)
-        
-        print(f"总预算: {total_budget}, 总合同金额: {total_contract_amount}")
-        
-        result = {
-            "total_projects": total_projects,
-            "completed_projects": status_counts.get('completed', 0),
-            "ongoing_projects": status_counts.get('in_progress', 0),
-            "delayed_projects": status_counts.get('delayed', 0),
-            "planning_projects": status_counts.get('planning', 0),
-            "total_budget": total_budget,
-            "total_contract_amount": total_contract_amount
-        }
-        
-        print(f"返回统计结果: {result}")
-        return result
+        dashboard = await project_statistics.load_dashboard(db, current_user.tenant_id)
+        return _overview(dashboard)
         
     except Exception as e:
-        print(f"项目统计查询异常: {str(e)}")
-        import traceback
-        traceback.print_exc()
         raise HTTPException(
             status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"获取项目统计失败: {str(e)}"
@@ -222,7 +348,7 @@ async def get_project_statistics(
 @router.get("/statistics/status", summary="获取项目状态分布")
 async def get_project_status_distribution(
     current_user: User = Depends(require_permissions(["project_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取项目状态分布数据
@@ -230,49 +356,9 @@ async def get_project_status_distribution(
     需要权限: project_read
     """
     try:
-        # 构建查询条件
-        query_conditions = [Project.tenant_id == current_user.tenant_id]
-        
-        # 查询各状态项目数量
-        status_query = await db.execute(
-            select(
-                Project.status,
-                func.count(Project.id).label('count')
-            ).where(and_(*query_conditions))
-            .group_by(Project.status)
-        )
-        
-        # 状态颜色映射
-        status_colors = {
-            'planning': '#909399',
-            'in_progress': '#409eff',
-            'on_hold': '#e6a23c',
-            'completed': '#67c23a',
-            'cancelled': '#f56c6c',
-            'delayed': '#f56c6c'
-        }
-        
-        # 状态名称映射
-        status_names = {
-            'planning': '规划中',
-            'in_progress': '进行中',
-            'on_hold': '暂停',
-            'completed': '已完成',
-            'cancelled': '已取消',
-            'delayed': '延期'
-        }
-        
-        status_distribution = []
-        for row in status_query.all():
-            status = row.status or 'unknown'
-            status_distribution.append({
-                'name': status_names.get(status, status),
-                'value': row.count,
-                'itemStyle': { 'color': status_colors.get(status, '#909399') }
-            })
-        
+        dashboard = await project_statistics.load_dashboard(db, current_user.tenant_id)
         return {
-            "status_distribution": status_distribution
+            "status_distribution": _status_distribution(dashboard)
         }
         
     except Exception as e:
@@ -283,54 +369,19 @@ async def get_project_status_distribution(
 
 @router.get("/statistics/trend", summary="获取项目月度趋势")
 async def get_project_monthly_trend(
-    months: int = Query(6, ge=1, le=24, description="统计月数"),
+    months: int = Query(6, ge=1, le=project_statistics.TREND_MONTHS, description="统计月数"),
     current_user: User = Depends(require_permissions(["project_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    获取项目月度趋势数据
+    获取项目月度趋势数据（有项目的最近N个月，按时间正序）
     
     需要权限: project_read
     """
     try:
-        # 构建查询条件
-        query_conditions = [Project.tenant_id == current_user.tenant_id]
-        
-        # 查询月度项目数量和预算
-        trend_query = await db.execute(
-            select(
-                func.extract('year', Project.created_at).label('year'),
-                func.extract('month', Project.created_at).label('month'),
-                func.count(Project.id).label('projects'),
-                func.sum(Project.budget).label('budget')
-            ).where(and_(*query_conditions))
-            .group_by(
-                func.extract('year', Project.created_at),
-                func.extract('month', Project.created_at)
-            )
-            .order_by(
-                func.extract('year', Project.created_at).desc(),
-                func.extract('month', Project.created_at).desc()
-            )
-            .limit(months)
-        )
-        
-        monthly_trend = []
-        month_names = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
-        
-        for row in trend_query.all():
-            month_label = f"{int(row.year)}年{month_names[int(row.month)-1]}"
-            monthly_trend.append({
-                'month': month_label,
-                'projects': row.projects,
-                'budget': float(row.budget or 0)
-            })
-        
-        # 按时间正序排列
-        monthly_trend.reverse()
-        
+        dashboard = await project_statistics.load_dashboard(db, current_user.tenant_id)
         return {
-            "monthly_trend": monthly_trend
+            "monthly_trend": _monthly_trend(dashboard, months)
         }
         
     except Exception as e:
@@ -342,7 +393,7 @@ async def get_project_monthly_trend(
 @router.get("/statistics/types", summary="获取项目类型分布")
 async def get_project_type_distribution(
     current_user: User = Depends(require_permissions(["project_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取项目类型分布数据
@@ -350,46 +401,9 @@ async def get_project_type_distribution(
     需要权限: project_read
     """
     try:
-        # 构建查询条件
-        query_conditions = [Project.tenant_id == current_user.tenant_id]
-        
-        # 查询各类型项目数量
-        type_query = await db.execute(
-            select(
-                Project.project_type,
-                func.count(Project.id).label('count')
-            ).where(and_(*query_conditions))
-            .group_by(Project.project_type)
-            .order_by(func.count(Project.id).desc())
-        )
-        
-        # 类型名称映射
-        type_names = {
-            'construction': '建筑工程',
-            'decoration': '装饰工程',
-            'municipal': '市政工程',
-            'electrical': '电气工程',
-            'mechanical': '机械工程',
-            'industrial': '工业工程',
-            'residential': '住宅工程',
-            'commercial': '商业工程',
-            'infrastructure': '基础设施工程',
-            'renovation': '改造工程',
-            'maintenance': '维护工程',
-            'other': '其他工程'
-        }
-        
-        type_distribution = []
-        for row in type_query.all():
-            project_type = row.project_type or 'other'
-            type_distribution.append({
-                'name': type_names.get(project_type, project_type),
-                'value': row.count,
-                'itemStyle': { 'color': f'#{hash(project_type) % 0xFFFFFF:06x}' }
-            })
-        
+        dashboard = await project_statistics.load_dashboard(db, current_user.tenant_id)
         return {
-            "type_distribution": type_distribution
+            "type_distribution": _type_distribution(dashboard)
         }
         
     except Exception as e:
@@ -401,7 +415,7 @@ async def get_project_type_distribution(
 @router.get("/statistics/progress", summary="获取项目进度分布")
 async def get_project_progress_distribution(
     current_user: User = Depends(require_permissions(["project_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取项目进度分布数据
@@ -409,47 +423,17 @@ async def get_project_progress_distribution(
     需要权限: project_read
     """
     try:
-        # 构建查询条件
-        query_conditions = [Project.tenant_id == current_user.tenant_id]
-        
-        # 查询各进度范围项目数量
-        progress_query = await db.execute(
-            select(
-                case(
-                    (Project.progress < 20, '0-20%'),
-                    (Project.progress < 50, '20-50%'),
-                    (Project.progress < 80, '50-80%'),
-                    (Project.progress < 100, '80-100%'),
-                    else_='100%'
-                ).label('progress_range'),
-                func.count(Project.id).label('count')
-            ).where(and_(*query_conditions))
-            .group_by(text('progress_range'))
-            .order_by(text('progress_range'))
-        )
-        
-        progress_distribution = []
-        for row in progress_query.all():
-            progress_distribution.append({
-                'range': row.progress_range,
-                'count': row.count
-            })
-        
+        dashboard = await project_statistics.load_dashboard(db, current_user.tenant_id)
         return {
-            "progress_distribution": progress_distribution
+            "progress_distribution": _progress_distribution(dashboard)
         }
         
     except Exception as e:
-        print(f"项目进度分布查询异常: {str(e)}")
-        import traceback
-        traceback.print_exc()
         raise HTTPException(
             status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"获取项目进度分布失败: {str(e)}"
         )
 
-
-
 @router.post("/", response_model=ProjectResponse)
 async def create_project(
     project_data: ProjectCreate,
@@ -517,6 +501,8 @@ async def create_project(
         new_project = Project(**mapped_data)
         
         db.add(new_project)
+        await db.flush()
+        await project_costs.refresh_budget_metrics(db, [new_project.id])
         await db.commit()
         await db.refresh(new_project)
         
@@ -567,6 +553,110 @@ async def create_project(
             detail=f"创建项目失败: {str(e)}"
         )
 
+async def _clone(db: AsyncSession, current_user: User, targets: List[project_clone.CloneTarget]) -> ProjectCloneResult:
+    """执行复制并提交，请求无效时返回400"""
+    try:
+        cloned = await project_clone.clone_projects(db, current_user.tenant_id, current_user.id, targets)
+        await db.commit()
+    except project_clone.ProjectCloneError as e:
+        await db.rollback()
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"复制项目失败: {str(e)}"
+        )
+    
+    return ProjectCloneResult(
+        cloned_count=len(cloned),
+        projects=[
+            {
+                "source_project_id": str(item["source_id"]),
+                "id": str(item["id"]),
+                "name": item["name"],
+                "project_code": item["project_code"]
+            }
+            for item in cloned
+        ]
+    )
+
+def _parse_project_id(project_id: str) -> UUID:
+    try:
+        return UUID(project_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=f"无效的项目ID格式: {project_id}"
+        )
+
+@router.get("/delete-jobs/{job_id}", summary="查询项目删除任务")
+async def get_project_delete_job(
+    job_id: str,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    查询项目删除任务状态和进度
+    
+    status: pending/running/succeeded/failed；progress 为各表已删除行数和删除前行数
+    """
+    job = await cascade_delete.get_status(job_id, current_user.tenant_id)
+    if job is None or (job["target_type"] is not None and job["target_type"] != cascade_delete.PROJECT):
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            detail="任务不存在或已过期"
+        )
+    response.headers["Cache-Control"] = "no-store"
+    return job
+
+@router.post("/clone", response_model=ProjectCloneResult, summary="批量复制项目")
+async def bulk_clone_projects(
+    clone_data: ProjectBulkCloneRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    从多个项目批量复制新项目，全部成功或全部失败
+    
+    复制在数据库内一条 INSERT ... SELECT 完成，JSONB 字段不经过应用层；
+    状态、进度、实际成本、审批和评审信息重置为新项目初始值
+    """
+    targets = [
+        project_clone.CloneTarget(
+            source_id=_parse_project_id(item.source_project_id),
+            name=item.name,
+            project_code=item.project_code,
+            start_date=item.start_date,
+            end_date=item.end_date
+        )
+        for item in clone_data.items
+    ]
+    return await _clone(db, current_user, targets)
+
+@router.post("/{project_id}/clone", response_model=ProjectCloneResult, summary="复制项目")
+async def clone_project(
+    project_id: str,
+    clone_data: ProjectCloneRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    以该项目（通常为模板项目）为源复制一个或多个新项目，全部成功或全部失败
+    """
+    source_id = _parse_project_id(project_id)
+    targets = [
+        project_clone.CloneTarget(
+            source_id=source_id,
+            name=target.name,
+            project_code=target.project_code,
+            start_date=target.start_date,
+            end_date=target.end_date
+        )
+        for target in clone_data.targets
+    ]
+    return await _clone(db, current_user, targets)
+
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: str,
@@ -653,13 +743,14 @@ async def get_project(
 @router.get("/{project_id}/change-logs")
 async def get_project_change_logs(
     project_id: str,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="分页游标（来自上一页的X-Next-Cursor响应头）")
 ):
-    """获取项目变更日志"""
+    """获取项目变更日志（按时间倒序），页满时在X-Next-Cursor响应头返回下一页游标"""
     try:
-        print(f"DEBUG: 获取项目变更日志，项目ID: {project_id}")
-        
         # 将字符串ID转换为UUID
         try:
             project_uuid = UUID(project_id)
@@ -671,72 +762,70 @@ async def get_project_change_logs(
         
         # 检查项目是否存在
         project = await db.execute(
-            select(Project).where(
+            select(Project.id).where(
                 and_(
                     Project.id == project_uuid,
                     Project.tenant_id == current_user.tenant_id  # 添加租户隔离
                 )
             )
         )
-        if not project.scalar_one_or_none():
+        if project.scalar_one_or_none() is None:
             raise HTTPException(
                 status_code=http_status.HTTP_404_NOT_FOUND,
                 detail="项目不存在"
             )
         
-        # 获取项目变更日志
-        change_logs = await db.execute(
+        # 获取一页变更日志（project_id, created_at, id 索引）
+        query = (
             select(ProjectChangeLog)
-            .where(ProjectChangeLog.project_id == project_uuid)
-            .order_by(desc(ProjectChangeLog.created_at))
+            .where(
+                ProjectChangeLog.project_id == project_uuid,
+                ProjectChangeLog.tenant_id == current_user.tenant_id
+            )
+            .order_by(desc(ProjectChangeLog.created_at), desc(ProjectChangeLog.id))
         )
-        change_logs = change_logs.scalars().all()
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor, datetime.fromisoformat, UUID)
+            query = query.where(
+                tuple_(ProjectChangeLog.created_at, ProjectChangeLog.id) < tuple_(cursor_created_at, cursor_id)
+            )
+        change_logs = (await db.execute(query.limit(limit))).scalars().all()
         
-        # 变更日志获取成功
+        if len(change_logs) == limit:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(change_logs[-1].created_at, change_logs[-1].id)
         
-        # 格式化变更记录数据
+        # 格式化变更记录数据（展示文本只为当前页生成）
         formatted_logs = []
         for log in change_logs:
-            # 处理合并后的变更记录
-            if log.field_name and ',' in log.field_name:
-                # 多个字段合并的变更
-                field_names = log.field_name.split(',')
-                field_display_names = [get_field_display_name(field) for field in field_names]
-                field_display_name = '、'.join(field_display_names)
-            else:
-                # 单个字段变更
-                field_display_name = get_field_display_name(log.field_name) if log.field_name else '项目信息'
+            field_names = log.field_name.split(',') if log.field_name else []
+            field_display_name = '、'.join(get_field_display_name(field) for field in field_names) or '项目信息'
             
-            # 构建完整的变更记录
-            if log.change_description:
-                # 使用后端已经格式化好的变更记录
+            if log.changes:
+                change_record = render_change_record(log.changes)
+            elif log.change_description:
+                # 历史记录：变更文本在写入时已生成
                 change_record = log.change_description
             else:
-                # 如果没有变更记录，构建一个
                 change_record = f"{field_display_name}已更新"
             
-            formatted_log = {
+            formatted_logs.append({
                 "id": str(log.id),
                 "change_type": log.change_type,
                 "field_name": log.field_name,
                 "field_display_name": field_display_name,
+                "changes": log.changes or [],
                 "change_description": log.change_description,
                 "change_reason": log.change_reason,
-                "change_record": change_record,  # 改名为change_record
+                "change_record": change_record,
                 "changed_by": str(log.changed_by) if log.changed_by else None,
                 "created_at": log.created_at.isoformat() if log.created_at else None
-            }
-            formatted_logs.append(formatted_log)
+            })
         
         return formatted_logs
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"ERROR: 获取项目变更日志失败: {str(e)}")
-        print(f"ERROR: 错误类型: {type(e)}")
-        import traceback
-        print(f"ERROR: 错误堆栈: {traceback.format_exc()}")
         raise HTTPException(
             status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"获取项目变更日志失败: {str(e)}"
@@ -777,15 +866,21 @@ async def update_project(
                 status_code=http_status.HTTP_404_NOT_FOUND,
                 detail="项目不存在"
             )
+        if project.status == PROJECT_DELETING:
+            raise HTTPException(
+                status_code=http_status.HTTP_409_CONFLICT,
+                detail="项目正在删除"
+            )
         
-        # 记录原始值用于变更日志
-        original_values = {}
         update_data = project_data.dict(exclude_unset=True)
         
-        # 记录变更记录 - 按您要求的格式
+        # 记录结构化变更明细 [{field, old, new, reason}]，展示文本在读取时生成
         change_logs = []
-        changed_fields = []
-        field_changes = []
+        changes = []
+        change_reasons = {
+            'budget': project_data.budget_change_reason,
+            'contract_amount': project_data.contract_change_reason,
+        }
         
         # 排除技术字段，只处理实际的项目字段
         excluded_fields = {'budget_change_reason', 'contract_change_reason', 'change_description'}
@@ -803,59 +898,26 @@ async def update_project(
             if hasattr(project, db_field):
                 old_value = getattr(project, db_field)
                 if old_value != new_value:
-                    original_values[field] = old_value
-                    changed_fields.append(field)
-                    
-                    # 格式化字段变更信息
-                    field_display_name = get_field_display_name(field)
-                    old_value_display = format_field_value(field, old_value)
-                    new_value_display = format_field_value(field, new_value)
-                    
-                    # 构建单个字段的变更记录
-                    if field in ['budget', 'contract_amount']:
-                        # 金额字段需要显示变更原因
-                        if field == 'budget' and hasattr(project_data, 'budget_change_reason') and project_data.budget_change_reason:
-                            field_change = f"{field_display_name}[{old_value_display}]变更成[{new_value_display}]，变更原因[{project_data.budget_change_reason}]"
-                        elif field == 'contract_amount' and hasattr(project_data, 'contract_change_reason') and project_data.contract_change_reason:
-                            field_change = f"{field_display_name}[{old_value_display}]变更成[{new_value_display}]，变更原因[{project_data.contract_change_reason}]"
-                        else:
-                            field_change = f"{field_display_name}[{old_value_display}]变更成[{new_value_display}]"
-                    else:
-                        # 非金额字段
-                        field_change = f"{field_display_name}[{old_value_display}]变更成[{new_value_display}]"
-                    
-                    field_changes.append(field_change)
+                    changes.append(jsonable_encoder({
+                        "field": field,
+                        "old": old_value,
+                        "new": new_value,
+                        "reason": change_reasons.get(field) or None,
+                    }))
         
         # 如果有变更，创建变更记录
-        if changed_fields:
-            # 获取变更原因和详细说明
-            change_reason = None
-            change_description = None
-            
-            # 检查是否有金额变更
-            has_budget_change = 'budget' in changed_fields
-            has_contract_change = 'contract_amount' in changed_fields
+        if changes:
+            # 变更原因取预算变更原因，其次合同变更原因
+            reasons = {change["field"]: change["reason"] for change in changes if change["reason"]}
+            change_reason = reasons.get('budget') or reasons.get('contract_amount')
             
-            if has_budget_change and hasattr(project_data, 'budget_change_reason') and project_data.budget_change_reason:
-                change_reason = project_data.budget_change_reason
-            elif has_contract_change and hasattr(project_data, 'contract_change_reason') and project_data.contract_change_reason:
-                change_reason = project_data.contract_change_reason
-            
-            if hasattr(project_data, 'change_description') and project_data.change_description:
-                change_description = project_data.change_description
-            
-            # 构建完整的变更记录
-            complete_change_record = "\n".join(field_changes)
-            
-            # 创建变更记录
             change_log = ProjectChangeLog(
                 tenant_id=current_user.tenant_id,
                 project_id=project_uuid,
                 change_type='update',
-                field_name=','.join(changed_fields),  # 合并所有变更字段
-                old_value=None,  # 不再单独存储每个字段的原值
-                new_value=None,  # 不再单独存储每个字段的新值
-                change_description=complete_change_record,  # 完整的变更记录
+                field_name=','.join(change["field"] for change in changes),  # 合并所有变更字段
+                changes=changes,
+                change_description=project_data.change_description or None,  # 用户填写的详细说明
                 change_reason=change_reason,
                 changed_by=current_user.id,
                 created_at=datetime.utcnow()
@@ -878,6 +940,11 @@ async def update_project(
         for change_log in change_logs:
             db.add(change_log)
         
+        # 预算变化时重新计算成本偏差和预算使用率
+        if 'budget' in update_data:
+            await db.flush()
+            await project_costs.refresh_budget_metrics(db, [project.id])
+        
         await db.commit()
         await db.refresh(project)
         
@@ -935,7 +1002,11 @@ async def delete_project(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """删除项目"""
+    """
+    删除项目（后台任务）
+    
+    返回202和任务ID，通过 GET /projects/delete-jobs/{job_id} 查询删除进度
+    """
     try:
         # 删除项目请求处理
         try:
@@ -947,26 +1018,49 @@ async def delete_project(
             )
         
         project = await db.execute(
-            select(Project).where(
+            select(Project.id, Project.status).where(
                 and_(
                     Project.id == project_uuid,
                     Project.tenant_id == current_user.tenant_id  # 添加租户隔离
                 )
-            )
+            ).with_for_update()
         )
-        project = project.scalar_one_or_none()
+        project = project.one_or_none()
         
-        if not project:
+        if project is None:
             raise HTTPException(
                 status_code=http_status.HTTP_404_NOT_FOUND,
                 detail="项目不存在"
             )
+        if project.status == PROJECT_DELETING:
+            raise HTTPException(
+                status_code=http_status.HTTP_409_CONFLICT,
+                detail="项目正在删除"
+            )
         
-        # 删除项目
-        await db.delete(project)
+        # 先标记为删除中（写接口随即拒绝该项目），再由后台任务分批删除交易记录、变更记录和项目
+        await db.execute(
+            update(Project).where(Project.id == project_uuid).values(status=PROJECT_DELETING)
+        )
         await db.commit()
-        
-        return {"message": "项目删除成功"}
+        try:
+            job_id = await cascade_delete.submit(cascade_delete.PROJECT, current_user.tenant_id, project_uuid)
+        except Exception:
+            await db.execute(
+                update(Project).where(Project.id == project_uuid).values(status=project.status)
+            )
+            await db.commit()
+            raise
+        
+        return JSONResponse(
+            status_code=http_status.HTTP_202_ACCEPTED,
+            content={
+                "message": "项目删除任务已提交",
+                "job_id": job_id,
+                "status": cascade_delete.PENDING,
+                "status_url": f"/api/v1/projects/delete-jobs/{job_id}"
+            }
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -1001,6 +1095,11 @@ async def update_project_status(
                 status_code=http_status.HTTP_404_NOT_FOUND,
                 detail="项目不存在"
             )
+        if project.status == PROJECT_DELETING:
+            raise HTTPException(
+                status_code=http_status.HTTP_409_CONFLICT,
+                detail="项目正在删除"
+            )
         
         # 验证状态值
         new_status = status_data.get("status")
@@ -1009,6 +1108,11 @@ async def update_project_status(
                 status_code=http_status.HTTP_400_BAD_REQUEST,
                 detail="状态值不能为空"
             )
+        if new_status == PROJECT_DELETING:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail="删除项目请使用删除接口"
+            )
         
         # 更新项目状态
         project.status = new_status
@@ -1114,6 +1218,21 @@ def format_field_value(field_name: str, value) -> str:
         return str(value) if value else '未设置'
 
 
+def render_change_record(changes: list) -> str:
+    """把结构化变更明细渲染为变更记录文本，每个字段一行"""
+    lines = []
+    for change in changes:
+        field = change.get('field')
+        line = (
+            f"{get_field_display_name(field)}[{format_field_value(field, change.get('old'))}]"
+            f"变更成[{format_field_value(field, change.get('new'))}]"
+        )
+        if change.get('reason'):
+            line += f"，变更原因[{change['reason']}]"
+        lines.append(line)
+    return "\n".join(lines)
+
+
 def build_change_summary(field_display_name: str, old_value: str, new_value: str, change_reason: str, change_description: str) -> str:
     """构建用户友好的变更描述"""
     # 基础变更描述
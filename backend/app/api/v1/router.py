@@ -11,6 +11,7 @@ from .projects import router as projects_router
 from .transactions import router as transactions_router
 from .categories import router as categories_router
 from .suppliers import router as suppliers_router
+from .exchange_rates import router as exchange_rates_router
 from .settings import router as settings_router
 from .admin import router as admin_router
 from .monitoring import router as monitoring_router
@@ -36,6 +37,7 @@ api_router.include_router(projects_router, tags=["项目管理"])
 api_router.include_router(transactions_router, tags=["财务记录"])
 api_router.include_router(categories_router, tags=["分类管理"])
 api_router.include_router(suppliers_router, tags=["供应商管理"])
+api_router.include_router(exchange_rates_router, tags=["汇率管理"])
 api_router.include_router(settings_router, tags=["系统设置"])
 api_router.include_router(admin_auth_router, prefix="/monitoring", tags=["监控系统认证"])
 api_router.include_router(admin_router, prefix="/admin", tags=["租户管理"])
@@ -1,10 +1,10 @@
 """
 供应商管理API端点
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc, extract, case, text
+from sqlalchemy import select, func, and_, desc, asc, extract, case, text, tuple_
 from sqlalchemy.orm import selectinload, joinedload
 from typing import Optional, List
 from datetime import datetime, date
@@ -12,7 +12,10 @@ from decimal import Decimal
 import uuid
 
 from ...core.auth import get_current_user, require_permissions
-from ...core.database import get_db
+from ...core.database import get_db, get_read_db
+from ...core.cache import cached_statistics
+from ...core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from ...services.search import SUPPLIER_SEARCH_DOCUMENT, keyword_filter, keyword_rank
 from ...models.user import User
 from ...models.transaction import Supplier, Transaction
 from ...schemas.supplier import (
@@ -109,20 +112,23 @@ async def create_supplier(
 
 @router.get("/", response_model=List[SupplierResponse], summary="获取供应商列表")
 async def get_suppliers(
+    response: Response,
     keyword: Optional[str] = Query(None, description="关键词搜索"),
     credit_rating: Optional[CreditRatingEnum] = Query(None, description="信用等级筛选"),
     is_active: Optional[bool] = Query(None, description="激活状态筛选"),
-    sort_by: Optional[str] = Query("created_at", description="排序字段"),
+    sort_by: Optional[str] = Query("created_at", description="排序字段（有关键词时可用relevance按相关度排序）"),
     sort_order: Optional[str] = Query("desc", description="排序方向"),
     page: int = Query(1, ge=1, description="页码"),
     size: int = Query(20, ge=1, le=100, description="每页大小"),
+    cursor: Optional[str] = Query(None, description="分页游标（仅按创建时间排序时可用，传入后忽略page）"),
     current_user: User = Depends(require_permissions(["supplier_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取供应商列表
     
     支持关键词搜索、筛选和排序
+    按创建时间排序时，页满会在X-Next-Cursor响应头返回下一页游标
     需要权限: supplier_read
     """
     try:
@@ -131,13 +137,8 @@ async def get_suppliers(
         
         # 关键词搜索
         if keyword:
-            keyword_condition = or_(
-                Supplier.name.ilike(f"%{keyword}%"),
-                Supplier.contact_person.ilike(f"%{keyword}%"),
-                Supplier.phone.ilike(f"%{keyword}%"),
-                Supplier.email.ilike(f"%{keyword}%")
-            )
-            query_conditions.append(keyword_condition)
+            # 匹配名称、联系人、电话、邮箱拼接的搜索文档（pg_trgm索引）
+            query_conditions.append(keyword_filter(SUPPLIER_SEARCH_DOCUMENT, keyword))
         
         # 信用等级筛选
         if credit_rating:
@@ -159,28 +160,50 @@ async def get_suppliers(
             order_column = func.cast(Supplier.transaction_count, func.INTEGER())
         elif sort_by == "credit_rating":
             order_column = Supplier.credit_rating
+        elif sort_by == "relevance" and keyword:
+            order_column = keyword_rank(SUPPLIER_SEARCH_DOCUMENT, keyword)
         else:
             order_column = Supplier.created_at
         
+        keyset_enabled = order_column is Supplier.created_at
+        if cursor and not keyset_enabled:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="游标分页仅支持按创建时间排序"
+            )
+        
+        # 追加ID作为次级排序键，保证分页稳定
         if sort_order == "desc":
-            base_query = base_query.order_by(desc(order_column))
+            base_query = base_query.order_by(desc(order_column), desc(Supplier.id))
         else:
-            base_query = base_query.order_by(asc(order_column))
+            base_query = base_query.order_by(asc(order_column), asc(Supplier.id))
         
         # 分页
-        offset = (page - 1) * size
-        suppliers_query = base_query.offset(offset).limit(size)
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor, datetime.fromisoformat, uuid.UUID)
+            keyset_key = tuple_(Supplier.created_at, Supplier.id)
+            keyset_value = tuple_(cursor_created_at, cursor_id)
+            if sort_order == "desc":
+                suppliers_query = base_query.where(keyset_key < keyset_value).limit(size)
+            else:
+                suppliers_query = base_query.where(keyset_key > keyset_value).limit(size)
+        else:
+            offset = (page - 1) * size
+            suppliers_query = base_query.offset(offset).limit(size)
         
         suppliers_result = await db.execute(suppliers_query)
         suppliers = suppliers_result.scalars().all()
         
+        if keyset_enabled and len(suppliers) == size:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(suppliers[-1].created_at, suppliers[-1].id)
+        
         # 构建响应
         suppliers_list = []
         for supplier in suppliers:
             # 动态计算交易统计信息
             transaction_stats_query = select(
                 func.count(Transaction.id).label('transaction_count'),
-                func.sum(Transaction.amount).label('total_amount')
+                func.sum(Transaction.amount_base).label('total_amount')
             ).where(
                 and_(
                     Transaction.supplier_id == supplier.id,
@@ -257,7 +280,7 @@ async def get_supplier(
         # 动态计算交易统计信息
         transaction_stats_query = select(
             func.count(Transaction.id).label('transaction_count'),
-            func.sum(Transaction.amount).label('total_amount')
+            func.sum(Transaction.amount_base).label('total_amount')
         ).where(
             and_(
                 Transaction.supplier_id == supplier.id,
@@ -367,7 +390,7 @@ async def update_supplier(
         # 动态计算交易统计信息
         transaction_stats_query = select(
             func.count(Transaction.id).label('transaction_count'),
-            func.sum(Transaction.amount).label('total_amount')
+            func.sum(Transaction.amount_base).label('total_amount')
         ).where(
             and_(
                 Transaction.supplier_id == supplier.id,
@@ -480,9 +503,10 @@ async def delete_supplier(
         )
 
 @router.get("/statistics/overview", response_model=SupplierStatistics, summary="获取供应商统计")
+@cached_statistics("suppliers.statistics.overview")
 async def get_supplier_statistics(
     current_user: User = Depends(require_permissions(["supplier_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取供应商统计信息
@@ -605,7 +629,7 @@ async def get_supplier_transactions(
     page: int = Query(1, ge=1, description="页码"),
     size: int = Query(20, ge=1, le=100, description="每页大小"),
     current_user: User = Depends(require_permissions(["supplier_read", "transaction_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取供应商的交易历史记录
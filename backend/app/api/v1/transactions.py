@@ -1,30 +1,44 @@
 """
 财务记录管理API端点
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc, extract, case
+from sqlalchemy import select, func, and_, desc, case, tuple_
 from sqlalchemy.orm import selectinload, joinedload
 from typing import Optional, List
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
+import logging
 import uuid
 
 from ...core.auth import get_current_user, require_permissions
-from ...core.database import get_db
+from ...core.database import get_db, get_read_db, db_manager
+from ...core.cache import cached_statistics
+from ...core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, planner_row_estimate
+from ...services.search import TRANSACTION_SEARCH_DOCUMENT, keyword_filter, keyword_rank
+from ...services.transaction_export import EXPORT_FORMATS, EXPORT_WRITERS
+from ...services import transaction_import, transaction_rollup, transaction_batch, project_costs, currency, chart_statistics, statistics_jobs, daily_snapshots
+from ...config import settings
 from ...models.user import User
-from ...models.project import Project
+from ...models.project import Project, PROJECT_DELETING
 from ...models.transaction import Transaction, Category, Supplier
 from ...schemas.transaction import (
     TransactionCreate, TransactionUpdate, TransactionApproval, TransactionResponse,
     TransactionListResponse, TransactionStatistics, MonthlyFinancialReport,
     TransactionQueryParams, TransactionTypeEnum, TransactionStatusEnum,
-    ApprovalStatusEnum, PaymentMethodEnum
+    ApprovalStatusEnum, PaymentMethodEnum, ImportResult,
+    BatchActionEnum, TransactionBatchOperation, TransactionBatchResult, TransactionBatchItemResult
 )
 
 router = APIRouter(prefix="/transactions", tags=["财务记录"])
 
+logger = logging.getLogger(__name__)
+
+# 导出时服务端游标每批读取的行数
+EXPORT_BATCH_SIZE = 1000
+
 @router.post("/", response_model=TransactionResponse, summary="创建财务记录")
 async def create_transaction(
     transaction_data: TransactionCreate,
@@ -42,7 +56,8 @@ async def create_transaction(
             select(Project).where(
                 and_(
                     Project.id == transaction_data.project_id,
-                    Project.tenant_id == current_user.tenant_id
+                    Project.tenant_id == current_user.tenant_id,
+                    Project.status.is_distinct_from(PROJECT_DELETING)
                 )
             )
         )
@@ -117,17 +132,23 @@ async def create_transaction(
             created_by=current_user.id
         )
         
+        # 确定汇率并换算本位币金额（未显式填写汇率的外币记录按汇率表取值）
+        try:
+            explicit_rate = transaction_data.exchange_rate if 'exchange_rate' in transaction_data.model_fields_set else None
+            await currency.apply_base_amount(db, new_transaction, explicit_rate)
+        except currency.MissingExchangeRateError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
         db.add(new_transaction)
         await db.flush()
         await db.refresh(new_transaction)
+        await transaction_rollup.record_change(db, None, transaction_rollup.snapshot(new_transaction))
+        await daily_snapshots.invalidate_days(db, current_user.tenant_id, [new_transaction.transaction_date])
         
-        # 更新项目实际成本（如果是支出）
-        if transaction_data.type == TransactionTypeEnum.EXPENSE:
-            # 确保类型一致，都转换为Decimal
-            from decimal import Decimal
-            current_cost = Decimal(str(project.actual_cost or 0))
-            transaction_amount = Decimal(str(transaction_data.amount))
-            project.actual_cost = current_cost + transaction_amount
+        # 更新项目实际成本（如果是支出），在数据库内原子累加
+        await project_costs.apply_cost_deltas(
+            db, project_costs.contribution_deltas(None, project_costs.expense_contribution(new_transaction))
+        )
         
         await db.commit()
         
@@ -147,8 +168,10 @@ async def create_transaction(
 
 @router.get("/", response_model=List[TransactionResponse])
 async def get_transactions(
+    response: Response,
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(100, ge=1, le=1000, description="返回记录数"),
+    cursor: Optional[str] = Query(None, description="分页游标（来自上一页的X-Next-Cursor响应头，传入后忽略skip）"),
     project_id: Optional[str] = Query(None, description="项目ID筛选"),
     category_id: Optional[str] = Query(None, description="分类ID筛选"),
     supplier_id: Optional[str] = Query(None, description="供应商ID筛选"),
@@ -156,100 +179,362 @@ async def get_transactions(
     start_date: Optional[date] = Query(None, description="开始日期"),
     end_date: Optional[date] = Query(None, description="结束日期"),
     search: Optional[str] = Query(None, description="搜索关键词"),
-    db: AsyncSession = Depends(get_db),
+    sort_by_relevance: bool = Query(False, description="有搜索关键词时按相关度排序（不支持游标分页）"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取交易记录列表"""
+    """
+    获取交易记录列表
+    
+    支持skip/limit分页和游标分页，页满时在X-Next-Cursor响应头返回下一页游标
+    """
     try:
-        # 构建查询
-        query = select(Transaction).where(Transaction.tenant_id == current_user.tenant_id)
+        # 项目、供应商、分类名称通过外连接一次取回，避免每行额外查询
+        query = _build_transaction_list_query(
+            current_user.tenant_id,
+            project_id=project_id,
+            category_id=category_id,
+            supplier_id=supplier_id,
+            type=type,
+            start_date=start_date,
+            end_date=end_date,
+            search=search
+        )
         
-        # 添加筛选条件
-        if project_id:
-            query = query.where(Transaction.project_id == project_id)
-        if category_id:
-            query = query.where(Transaction.category_id == category_id)
-        if supplier_id:
-            query = query.where(Transaction.supplier_id == supplier_id)
-        if type:
-            query = query.where(Transaction.type == type)
-        if start_date:
-            query = query.where(Transaction.transaction_date >= start_date)
-        if end_date:
-            query = query.where(Transaction.transaction_date <= end_date)
-        if search:
-            search_filter = or_(
-                Transaction.description.ilike(f"%{search}%"),
-                Transaction.notes.ilike(f"%{search}%"),
-                Transaction.reference_number.ilike(f"%{search}%")
+        # 按相关度排序时只支持skip/limit分页
+        rank_by_relevance = bool(search and sort_by_relevance)
+        if rank_by_relevance:
+            if cursor:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="按相关度排序时不支持游标分页"
+                )
+            query = query.order_by(desc(keyword_rank(TRANSACTION_SEARCH_DOCUMENT, search)))
+        
+        # 排序和分页（按交易日期+ID排序，保证分页稳定）
+        query = query.order_by(desc(Transaction.transaction_date), desc(Transaction.id))
+        if cursor:
+            cursor_date, cursor_id = decode_cursor(cursor, date.fromisoformat, uuid.UUID)
+            query = query.where(
+                tuple_(Transaction.transaction_date, Transaction.id) < tuple_(cursor_date, cursor_id)
             )
-            query = query.where(search_filter)
-        
-        # 排序和分页
-        query = query.order_by(desc(Transaction.transaction_date)).offset(skip).limit(limit)
+        else:
+            query = query.offset(skip)
+        query = query.limit(limit)
         
         result = await db.execute(query)
-        transactions = result.scalars().all()
+        rows = result.all()
+        
+        if len(rows) == limit and not rank_by_relevance:
+            last_transaction = rows[-1].Transaction
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+                last_transaction.transaction_date, last_transaction.id
+            )
         
         # 转换为响应格式
-        response_transactions = []
-        for transaction in transactions:
-            # 获取关联数据
-            project_name = None
-            supplier_name = None
-            category_name = None
-            
-            if transaction.project_id:
-                project_result = await db.execute(
-                    select(Project.name).where(Project.id == transaction.project_id)
-                )
-                project_name = project_result.scalar_one_or_none()
-            
-            if transaction.supplier_id:
-                supplier_result = await db.execute(
-                    select(Supplier.name).where(Supplier.id == transaction.supplier_id)
-                )
-                supplier_name = supplier_result.scalar_one_or_none()
-            
-            if transaction.category_id:
-                category_result = await db.execute(
-                    select(Category.name).where(Category.id == transaction.category_id)
+        return [
+            _build_transaction_list_item(row.Transaction, row.project_name, row.supplier_name, row.category_name)
+            for row in rows
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取交易记录失败: {str(e)}"
+        )
+
+def _build_transaction_list_query(
+    tenant_id,
+    project_id: Optional[str] = None,
+    category_id: Optional[str] = None,
+    supplier_id: Optional[str] = None,
+    type: Optional[TransactionTypeEnum] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    search: Optional[str] = None
+):
+    """构建交易记录列表查询（含关联名称），不含排序和分页"""
+    query = select(
+        Transaction,
+        Project.name.label('project_name'),
+        Supplier.name.label('supplier_name'),
+        Category.name.label('category_name')
+    ).outerjoin(
+        Project, Transaction.project_id == Project.id
+    ).outerjoin(
+        Supplier, Transaction.supplier_id == Supplier.id
+    ).outerjoin(
+        Category, Transaction.category_id == Category.id
+    ).where(Transaction.tenant_id == tenant_id)
+    
+    # 添加筛选条件
+    if project_id:
+        query = query.where(Transaction.project_id == project_id)
+    if category_id:
+        query = query.where(Transaction.category_id == category_id)
+    if supplier_id:
+        query = query.where(Transaction.supplier_id == supplier_id)
+    if type:
+        query = query.where(Transaction.type == type)
+    if start_date:
+        query = query.where(Transaction.transaction_date >= start_date)
+    if end_date:
+        query = query.where(Transaction.transaction_date <= end_date)
+    if search:
+        # 匹配描述、备注、参考编号拼接的搜索文档（pg_trgm索引）
+        query = query.where(keyword_filter(TRANSACTION_SEARCH_DOCUMENT, search))
+    
+    return query
+
+def _build_transaction_list_item(
+    transaction: Transaction,
+    project_name: Optional[str] = None,
+    supplier_name: Optional[str] = None,
+    category_name: Optional[str] = None
+) -> dict:
+    """构建交易记录列表项"""
+    return {
+        "id": str(transaction.id),
+        "tenant_id": str(transaction.tenant_id),
+        "project_id": str(transaction.project_id) if transaction.project_id else None,
+        "project_name": project_name,
+        "supplier_id": str(transaction.supplier_id) if transaction.supplier_id else None,
+        "supplier_name": supplier_name,
+        "category_id": str(transaction.category_id) if transaction.category_id else None,
+        "category_name": category_name,
+        "transaction_date": transaction.transaction_date,
+        "type": transaction.type,
+        "amount": str(transaction.amount) if transaction.amount else "0.00",
+        "currency": transaction.currency,
+        "exchange_rate": float(transaction.exchange_rate) if transaction.exchange_rate else 1.0,
+        "amount_base": float(transaction.amount_base) if transaction.amount_base is not None else None,
+        "description": transaction.description,
+        "notes": transaction.notes,
+        "tags": transaction.tags or [],
+        "payment_method": transaction.payment_method,
+        "status": transaction.status,
+        "attachment_url": transaction.attachment_url,
+        "reference_number": transaction.reference_number,
+        "approved_by": transaction.approved_by,
+        "approved_at": transaction.approved_at.isoformat() if transaction.approved_at else None,
+        "created_at": transaction.created_at.isoformat(),
+        "updated_at": transaction.updated_at.isoformat() if transaction.updated_at else None
+    }
+
+# 导出路由必须在详情路由之前定义，避免被 /{transaction_id} 匹配
+@router.get("/export", summary="导出财务记录")
+async def export_transactions(
+    format: str = Query("csv", pattern="^(csv|ndjson|xlsx)$", description="导出格式: csv/ndjson/xlsx"),
+    project_id: Optional[str] = Query(None, description="项目ID筛选"),
+    category_id: Optional[str] = Query(None, description="分类ID筛选"),
+    supplier_id: Optional[str] = Query(None, description="供应商ID筛选"),
+    type: Optional[TransactionTypeEnum] = Query(None, description="交易类型筛选"),
+    start_date: Optional[date] = Query(None, description="开始日期"),
+    end_date: Optional[date] = Query(None, description="结束日期"),
+    search: Optional[str] = Query(None, description="搜索关键词"),
+    current_user: User = Depends(require_permissions(["transaction_export"]))
+):
+    """
+    流式导出财务记录，筛选条件与列表接口一致
+    
+    数据通过服务端游标分批读取并边读边输出，内存占用与导出行数无关
+    需要权限: transaction_export
+    """
+    query = _build_transaction_list_query(
+        current_user.tenant_id,
+        project_id=project_id,
+        category_id=category_id,
+        supplier_id=supplier_id,
+        type=type,
+        start_date=start_date,
+        end_date=end_date,
+        search=search
+    ).order_by(desc(Transaction.transaction_date), desc(Transaction.id))
+    
+    async def iter_rows():
+        # 响应流式输出期间独立持有会话，不依赖请求依赖项的生命周期
+        async for session in db_manager.get_read_session():
+            result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for row in result:
+                yield _build_transaction_list_item(
+                    row.Transaction, row.project_name, row.supplier_name, row.category_name
                 )
-                category_name = category_result.scalar_one_or_none()
-            
-            transaction_dict = {
-                "id": str(transaction.id),
-                "tenant_id": str(transaction.tenant_id),
-                "project_id": str(transaction.project_id) if transaction.project_id else None,
-                "project_name": project_name,
-                "supplier_id": str(transaction.supplier_id) if transaction.supplier_id else None,
-                "supplier_name": supplier_name,
-                "category_id": str(transaction.category_id) if transaction.category_id else None,
-                "category_name": category_name,
-                "transaction_date": transaction.transaction_date,
-                "type": transaction.type,
-                "amount": str(transaction.amount) if transaction.amount else "0.00",
-                "currency": transaction.currency,
-                "exchange_rate": float(transaction.exchange_rate) if transaction.exchange_rate else 1.0,
-                "description": transaction.description,
-                "notes": transaction.notes,
-                "tags": transaction.tags or [],
-                "payment_method": transaction.payment_method,
-                "status": transaction.status,
-                "attachment_url": transaction.attachment_url,
-                "reference_number": transaction.reference_number,
-                "approved_by": transaction.approved_by,
-                "approved_at": transaction.approved_at.isoformat() if transaction.approved_at else None,
-                "created_at": transaction.created_at.isoformat(),
-                "updated_at": transaction.updated_at.isoformat() if transaction.updated_at else None
-            }
-            response_transactions.append(transaction_dict)
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"transactions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    
+    return StreamingResponse(
+        EXPORT_WRITERS[format](iter_rows()),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/import", response_model=ImportResult, summary="批量导入财务记录")
+async def import_transactions(
+    file: UploadFile = File(..., description="CSV或XLSX文件，表头支持字段名或导出文件的中文表头"),
+    atomic: bool = Query(False, description="存在任何错误行时整体不导入"),
+    dry_run: bool = Query(False, description="仅校验不写入"),
+    current_user: User = Depends(require_permissions(["transaction_import"])),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    批量导入财务记录
+    
+    项目/供应商/分类可填写ID或名称，按租户预加载映射后分批校验，
+    有效行通过COPY写入临时暂存表，最后在同一事务中合并到正式表。
+    返回逐行错误报告（行号对应文件行，表头为第1行）
+    需要权限: transaction_import
+    """
+    content = await file.read(settings.MAX_FILE_SIZE + 1)
+    if len(content) > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"文件大小不能超过 {settings.MAX_FILE_SIZE // (1024 * 1024)}MB"
+        )
+    
+    try:
+        rows = await run_in_threadpool(transaction_import.parse_upload, file.filename, content)
+    except (transaction_import.ImportFileError, UnicodeDecodeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"文件解析失败: {str(e)}"
+        )
+    
+    try:
+        lookups = await transaction_import.load_tenant_lookups(db, current_user.tenant_id)
+        rate_table = await currency.load_rate_table(db, current_user.tenant_id)
+        validator = transaction_import.TransactionRowValidator(
+            current_user.tenant_id, current_user.id, lookups, rate_table
+        )
+        write = not dry_run
+        success_ids = []
+        failed_records = []
+        
+        if write:
+            await transaction_import.create_staging_table(db)
+        
+        # 解析和逐行校验是纯CPU计算，放在线程池中按批执行，不阻塞事件循环
+        batch_size = transaction_import.IMPORT_BATCH_SIZE
+        for offset in range(0, len(rows), batch_size):
+            records, errors = await run_in_threadpool(
+                transaction_import.validate_rows,
+                rows[offset:offset + batch_size], validator, first_line=offset + 2
+            )
+            failed_records.extend(errors)
+            if atomic and failed_records:
+                # 整体模式下已出现错误，后续只需校验不再写入
+                write = False
+            if write:
+                await transaction_import.copy_to_staging(db, records)
+            success_ids.extend(str(record[0]) for record in records)
+        
+        if atomic and failed_records:
+            success_ids = []
+        
+        if write and success_ids:
+            await transaction_import.merge_staging(db)
+            await db.commit()
+        else:
+            await db.rollback()
+        
+        return ImportResult(
+            success_count=len(success_ids),
+            failed_count=len(failed_records),
+            total_count=len(rows),
+            failed_records=failed_records,
+            success_ids=success_ids
+        )
         
-        return response_transactions
+    except HTTPException:
+        raise
     except Exception as e:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"获取交易记录失败: {str(e)}"
+            detail=f"导入财务记录失败: {str(e)}"
+        )
+
+# 批量操作所需权限
+BATCH_ACTION_PERMISSIONS = {
+    BatchActionEnum.APPROVE: "transaction_approve",
+    BatchActionEnum.REJECT: "transaction_approve",
+    BatchActionEnum.DELETE: "transaction_delete",
+    BatchActionEnum.UPDATE: "transaction_update",
+}
+
+@router.post("/batch", response_model=TransactionBatchResult, summary="批量操作财务记录")
+async def batch_transactions(
+    operation: TransactionBatchOperation,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    批量审批、拒绝、删除或修改财务记录
+    
+    目标记录由ID列表或筛选条件指定（单次最多5000条），以集合方式执行UPDATE/DELETE并一次提交，
+    项目实际成本和月度汇总在同一事务中同步调整。返回逐条结果，不满足条件的记录跳过并给出原因
+    需要权限: approve/reject 需要 transaction_approve，delete 需要 transaction_delete，update 需要 transaction_update
+    """
+    require_permissions([BATCH_ACTION_PERMISSIONS[operation.action]])(current_user)
+    
+    try:
+        errors = {}
+        ids = None
+        if operation.ids is not None:
+            ids, errors = transaction_batch.parse_ids(operation.ids)
+        
+        update_values = None
+        if operation.action == BatchActionEnum.UPDATE:
+            update_values = await transaction_batch.validate_update_fields(
+                db, current_user.tenant_id, operation.updates
+            )
+        
+        targets = await transaction_batch.load_targets(db, current_user.tenant_id, ids, operation.filter)
+        if ids is not None:
+            for transaction_id in ids:
+                if transaction_id not in targets:
+                    errors[str(transaction_id)] = "财务记录不存在"
+        
+        eligible, ineligible = transaction_batch.check_eligibility(operation.action, targets, update_values)
+        errors.update({str(transaction_id): reason for transaction_id, reason in ineligible.items()})
+        if operation.action == BatchActionEnum.UPDATE:
+            eligible, missing_rates = await transaction_batch.check_exchange_rates(db, eligible, update_values)
+            errors.update({str(transaction_id): reason for transaction_id, reason in missing_rates.items()})
+        
+        await transaction_batch.execute(
+            db, operation.action, eligible, current_user,
+            approval_note=operation.approval_note, update_values=update_values
+        )
+        await db.commit()
+        
+        results = [TransactionBatchItemResult(id=str(transaction_id), success=True) for transaction_id in eligible]
+        results.extend(
+            TransactionBatchItemResult(id=transaction_id, success=False, error=reason)
+            for transaction_id, reason in errors.items()
+        )
+        
+        return TransactionBatchResult(
+            action=operation.action,
+            matched_count=len(targets),
+            success_count=len(eligible),
+            failed_count=len(errors),
+            results=results
+        )
+        
+    except transaction_batch.BatchOperationError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"批量操作财务记录失败: {str(e)}"
         )
 
 @router.get("/{transaction_id}", response_model=TransactionResponse, summary="获取财务记录详情")
@@ -336,6 +621,11 @@ async def update_transaction(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="财务记录不存在"
             )
+        if transaction.project is not None and transaction.project.status == PROJECT_DELETING:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="所属项目正在删除"
+            )
         
         # 检查是否可以编辑（已审批的记录不能编辑金额等关键字段）
         if transaction.approval_status == 'approved':
@@ -367,8 +657,10 @@ async def update_transaction(
                     detail="分类不存在"
                 )
         
-        # 保存原始金额（用于更新项目成本）
-        original_amount = transaction.amount
+        # 保存原始项目成本归属（用于更新项目成本）和汇总维度
+        original_cost = project_costs.expense_contribution(transaction)
+        rollup_before = transaction_rollup.snapshot(transaction)
+        original_date = transaction.transaction_date
         
         # 更新字段
         update_data = transaction_data.dict(exclude_unset=True)
@@ -379,21 +671,26 @@ async def update_transaction(
                 else:
                     setattr(transaction, field, value)
         
+        # 金额、货币、汇率或日期变化时重新确定汇率并换算本位币金额
+        if {'amount', 'currency', 'exchange_rate', 'transaction_date'} & set(update_data):
+            explicit_rate = update_data.get('exchange_rate')
+            if explicit_rate is None and 'currency' not in update_data and 'transaction_date' not in update_data:
+                explicit_rate = transaction.exchange_rate
+            try:
+                await currency.apply_base_amount(db, transaction, explicit_rate)
+            except currency.MissingExchangeRateError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
         transaction.updated_at = datetime.utcnow()
         
         await db.flush()
+        await transaction_rollup.record_change(db, rollup_before, transaction_rollup.snapshot(transaction))
+        await daily_snapshots.invalidate_days(db, current_user.tenant_id, [original_date, transaction.transaction_date])
         
-        # 更新项目实际成本（如果是支出且金额有变化）
-        if transaction.type == 'expense':
-            project = transaction.project
-            if project and original_amount and transaction.amount:
-                # 确保类型一致，都转换为Decimal
-                from decimal import Decimal
-                current_cost = Decimal(str(project.actual_cost or 0))
-                new_amount = Decimal(str(transaction.amount))
-                original_amount_decimal = Decimal(str(original_amount))
-                cost_difference = new_amount - original_amount_decimal
-                project.actual_cost = current_cost + cost_difference
+        # 更新项目实际成本（金额、类型或所属项目有变化时），在数据库内原子累加差额
+        await project_costs.apply_cost_deltas(
+            db, project_costs.contribution_deltas(original_cost, project_costs.expense_contribution(transaction))
+        )
         
         await db.refresh(transaction)
         await db.commit()
@@ -467,6 +764,7 @@ async def approve_transaction(
             )
         
         # 更新审批信息
+        rollup_before = transaction_rollup.snapshot(transaction)
         transaction.status = approval_data.approval_status.value if hasattr(approval_data.approval_status, 'value') else approval_data.approval_status
         transaction.approved_by = current_user.id
         transaction.approved_at = datetime.utcnow()
@@ -475,6 +773,8 @@ async def approve_transaction(
         if approval_data.approval_note:
             transaction.description += f"\n[审批备注: {approval_data.approval_note}]"
         
+        await transaction_rollup.record_change(db, rollup_before, transaction_rollup.snapshot(transaction))
+        await daily_snapshots.invalidate_days(db, current_user.tenant_id, [transaction.transaction_date])
         await db.commit()
         
         approval_status_text = approval_data.approval_status.value if hasattr(approval_data.approval_status, 'value') else approval_data.approval_status
@@ -534,15 +834,13 @@ async def delete_transaction(
             # 这里可以添加额外的权限检查
             pass
         
-        # 更新项目实际成本（如果是支出）
-        if transaction.type == 'expense':
-            project = transaction.project
-            if project and transaction.amount:
-                # 确保类型一致，都转换为Decimal
-                from decimal import Decimal
-                current_cost = Decimal(str(project.actual_cost or 0))
-                transaction_amount = Decimal(str(transaction.amount))
-                project.actual_cost = current_cost - transaction_amount
+        await transaction_rollup.record_change(db, transaction_rollup.snapshot(transaction), None)
+        await daily_snapshots.invalidate_days(db, current_user.tenant_id, [transaction.transaction_date])
+        
+        # 更新项目实际成本（如果是支出），在数据库内原子扣减
+        await project_costs.apply_cost_deltas(
+            db, project_costs.contribution_deltas(project_costs.expense_contribution(transaction), None)
+        )
         
         await db.delete(transaction)
         await db.commit()
@@ -564,13 +862,70 @@ async def delete_transaction(
             detail=f"删除财务记录失败: {str(e)}"
         )
 
+# 概览统计的分组集合，GROUPING() 位掩码中未参与分组的列对应位为1
+OVERVIEW_GROUPING_SETS = {
+    0b1111: 'total',
+    0b0111: 'status',
+    0b1011: 'payment_method',
+    0b1101: 'month',
+    0b1110: 'category',
+}
+
+def _build_overview_query(ledger):
+    """概览统计查询：总计及各维度分组在一次 GROUPING SETS 聚合中完成"""
+    category_name = Category.name.label('category_name')
+    dimensions = [ledger.c.status, ledger.c.payment_method, ledger.c.month, category_name]
+    
+    return (
+        select(
+            func.grouping(*dimensions).label('grouping_id'),
+            *dimensions,
+            func.sum(ledger.c.transaction_count).label('count'),
+            func.sum(ledger.c.total_amount).label('total_amount'),
+            func.sum(case((ledger.c.type == 'income', ledger.c.total_amount), else_=0)).label('income'),
+            func.sum(case((ledger.c.type == 'expense', ledger.c.total_amount), else_=0)).label('expense'),
+            func.sum(case((ledger.c.type == 'income', ledger.c.transaction_count), else_=0)).label('income_count'),
+            func.sum(case((ledger.c.type == 'expense', ledger.c.transaction_count), else_=0)).label('expense_count'),
+            func.sum(case((ledger.c.status == 'pending', ledger.c.transaction_count), else_=0)).label('pending_count'),
+            func.sum(case((ledger.c.status == 'pending', ledger.c.total_amount), else_=0)).label('pending_amount')
+        ).select_from(
+            ledger.outerjoin(Category.__table__, ledger.c.category_id == Category.id)
+        ).group_by(
+            func.grouping_sets(
+                tuple_(), ledger.c.status, ledger.c.payment_method, ledger.c.month, Category.name
+            )
+        )
+    )
+
+async def _aggregate_overview(db: AsyncSession, ledger) -> dict:
+    """
+    单次扫描计算概览统计的总计和各分组
+    
+    返回 {'total': 总计行或None, 'status': [...], 'payment_method': [...], 'month': [...], 'category': [...]}
+    """
+    result = await db.execute(_build_overview_query(ledger))
+    
+    groups = {name: [] for name in OVERVIEW_GROUPING_SETS.values()}
+    groups['total'] = None
+    for row in result.all():
+        group = OVERVIEW_GROUPING_SETS.get(row.grouping_id)
+        if group == 'total':
+            groups['total'] = row
+        elif group and row.count:
+            # 汇总表中抵消为0的维度、没有分类的记录不参与分组展示
+            if group == 'category' and row.category_name is None:
+                continue
+            groups[group].append(row)
+    return groups
+
 @router.get("/statistics/overview", response_model=TransactionStatistics, summary="获取财务统计")
+@cached_statistics("transactions.statistics.overview")
 async def get_transaction_statistics(
     project_id: Optional[str] = Query(None, description="项目ID筛选"),
     date_from: Optional[date] = Query(None, description="统计日期范围-起始"),
     date_to: Optional[date] = Query(None, description="统计日期范围-结束"),
     current_user: User = Depends(require_permissions(["transaction_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取财务统计数据
@@ -578,7 +933,7 @@ async def get_transaction_statistics(
     需要权限: transaction_read
     """
     try:
-        # 构建查询条件
+        # 构建查询条件（最近交易记录仍读取明细）
         query_conditions = [Transaction.tenant_id == current_user.tenant_id]
         
         if project_id:
@@ -588,97 +943,40 @@ async def get_transaction_statistics(
         if date_to:
             query_conditions.append(Transaction.transaction_date <= date_to)
         
-        # 基础统计查询
-        stats_query = await db.execute(
-            select(
-                func.count(Transaction.id).label('total_transactions'),
-                func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0)).label('total_income'),
-                func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)).label('total_expense'),
-                func.count(case((Transaction.type == 'income', 1))).label('income_count'),
-                func.count(case((Transaction.type == 'expense', 1))).label('expense_count'),
-                func.count(case((Transaction.status == 'pending', 1))).label('pending_count'),
-                func.sum(case((Transaction.status == 'pending', Transaction.amount), else_=0)).label('pending_amount'),
-                func.avg(Transaction.amount).label('avg_amount')
-            ).where(and_(*query_conditions))
-        )
-        stats = stats_query.first()
-        
-        # 按状态分组统计
-        status_query = await db.execute(
-            select(
-                Transaction.status,
-                func.count(Transaction.id).label('count')
-            ).where(and_(*query_conditions))
-            .group_by(Transaction.status)
-        )
-        transactions_by_status = {row.status: row.count for row in status_query.all()}
-        
-        # 按支付方式分组统计
-        payment_method_query = await db.execute(
-            select(
-                Transaction.payment_method,
-                func.count(Transaction.id).label('count')
-            ).where(and_(*query_conditions))
-            .group_by(Transaction.payment_method)
+        # 聚合统计读取月度汇总
+        ledger = transaction_rollup.ledger_source(
+            current_user.tenant_id, date_from=date_from, date_to=date_to, project_id=project_id
         )
+        
+        # 总计及各维度分组在一次 GROUPING SETS 聚合中完成
+        overview_groups = await _aggregate_overview(db, ledger)
+        stats = overview_groups['total']
+        
+        transactions_by_status = {
+            row.status or 'unknown': int(row.count) for row in overview_groups['status']
+        }
         transactions_by_payment_method = {
-            row.payment_method or 'unknown': row.count 
-            for row in payment_method_query.all()
+            row.payment_method or 'unknown': int(row.count) for row in overview_groups['payment_method']
         }
         
         # 月度趋势（最近6个月）
-        monthly_trend_query = await db.execute(
-            select(
-                extract('year', Transaction.transaction_date).label('year'),
-                extract('month', Transaction.transaction_date).label('month'),
-                func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0)).label('income'),
-                func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)).label('expense'),
-                func.count(Transaction.id).label('count')
-            ).where(and_(*query_conditions))
-            .group_by(
-                extract('year', Transaction.transaction_date),
-                extract('month', Transaction.transaction_date)
-            )
-            .order_by(
-                extract('year', Transaction.transaction_date).desc(),
-                extract('month', Transaction.transaction_date).desc()
-            )
-            .limit(6)
-        )
-        
         monthly_trend = []
-        for row in monthly_trend_query.all():
+        for row in sorted(overview_groups['month'], key=lambda row: row.month, reverse=True)[:6]:
             monthly_trend.append({
-                'year': int(row.year),
-                'month': int(row.month),
+                'year': row.month.year,
+                'month': row.month.month,
                 'income': float(row.income or 0),
                 'expense': float(row.expense or 0),
                 'net': float((row.income or 0) - (row.expense or 0)),
-                'count': row.count
+                'count': int(row.count)
             })
         
         # 热门分类（Top 5）
-        top_categories_query = await db.execute(
-            select(
-                Category.name,
-                func.count(Transaction.id).label('count'),
-                func.sum(Transaction.amount).label('total_amount')
-            ).select_from(
-                Transaction.__table__.join(
-                    Category.__table__,
-                    Transaction.category_id == Category.id
-                )
-            ).where(and_(*query_conditions))
-            .group_by(Category.name)
-            .order_by(func.sum(Transaction.amount).desc())
-            .limit(5)
-        )
-        
         top_categories = []
-        for row in top_categories_query.all():
+        for row in sorted(overview_groups['category'], key=lambda row: row.total_amount, reverse=True)[:5]:
             top_categories.append({
-                'name': row.name,
-                'count': row.count,
+                'name': row.category_name,
+                'count': int(row.count),
                 'total_amount': float(row.total_amount)
             })
         
@@ -708,20 +1006,22 @@ async def get_transaction_statistics(
             recent_transactions.append(TransactionResponse(**transaction_dict))
         
         # 计算统计数据
-        total_income = float(stats.total_income or 0)
-        total_expense = float(stats.total_expense or 0)
+        total_income = float(stats.income or 0) if stats else 0.0
+        total_expense = float(stats.expense or 0) if stats else 0.0
         net_amount = total_income - total_expense
+        total_transactions = int(stats.count or 0) if stats else 0
+        avg_amount = float(stats.total_amount or 0) / total_transactions if total_transactions else 0
         
         return TransactionStatistics(
-            total_transactions=stats.total_transactions or 0,
+            total_transactions=total_transactions,
             total_income=total_income,
             total_expense=total_expense,
             net_amount=net_amount,
-            income_transactions=stats.income_count or 0,
-            expense_transactions=stats.expense_count or 0,
-            pending_approval_count=stats.pending_count or 0,
-            pending_approval_amount=float(stats.pending_amount or 0),
-            avg_transaction_amount=float(stats.avg_amount or 0),
+            income_transactions=int(stats.income_count or 0) if stats else 0,
+            expense_transactions=int(stats.expense_count or 0) if stats else 0,
+            pending_approval_count=int(stats.pending_count or 0) if stats else 0,
+            pending_approval_amount=float(stats.pending_amount or 0) if stats else 0.0,
+            avg_transaction_amount=avg_amount,
             transactions_by_status=transactions_by_status,
             transactions_by_payment_method=transactions_by_payment_method,
             monthly_trend=monthly_trend,
@@ -735,25 +1035,27 @@ async def get_transaction_statistics(
             detail=f"获取财务统计失败: {str(e)}"
         )
 
+CHART_JOB_KIND = "transactions.statistics.charts"
+
 @router.get("/statistics/charts", summary="获取图表统计数据")
+@cached_statistics(CHART_JOB_KIND, exclude_params=("mode",))
 async def get_chart_statistics(
     period: str = Query("month", description="统计周期: month/quarter/year"),
     date_from: Optional[str] = Query(None, description="统计日期范围-起始 (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="统计日期范围-结束 (YYYY-MM-DD)"),
+    mode: str = Query("sync", pattern="^(sync|async|auto)$", description="执行方式: sync/async/auto"),
     current_user: User = Depends(require_permissions(["transaction_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取图表统计数据
     
+    mode=async 或 mode=auto 且跨度较大时（缓存未命中）提交后台任务，返回202和任务ID，
+    通过 GET /transactions/jobs/{job_id} 轮询结果；任务完成后同样参数的请求直接命中缓存
+    
     需要权限: transaction_read
     """
     try:
-        print(f"开始处理图表统计请求: period={period}, date_from={date_from}, date_to={date_to}")
-        
-        # 构建查询条件
-        query_conditions = [Transaction.tenant_id == current_user.tenant_id]
-        
         # 处理日期参数
         parsed_date_from = None
         parsed_date_to = None
@@ -761,10 +1063,8 @@ async def get_chart_statistics(
         if date_from:
             try:
                 parsed_date_from = datetime.strptime(date_from, "%Y-%m-%d").date()
-                query_conditions.append(Transaction.transaction_date >= parsed_date_from)
-                print(f"添加起始日期条件: {parsed_date_from}")
             except ValueError as e:
-                print(f"日期格式错误 date_from: {date_from}, 错误: {e}")
+                logger.info(f"图表统计起始日期格式错误: {date_from}, 错误: {e}")
                 raise HTTPException(
                     status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                     detail=f"起始日期格式错误，请使用 YYYY-MM-DD 格式: {date_from}"
@@ -773,254 +1073,196 @@ async def get_chart_statistics(
         if date_to:
             try:
                 parsed_date_to = datetime.strptime(date_to, "%Y-%m-%d").date()
-                query_conditions.append(Transaction.transaction_date <= parsed_date_to)
-                print(f"添加结束日期条件: {parsed_date_to}")
             except ValueError as e:
-                print(f"日期格式错误 date_to: {date_to}, 错误: {e}")
+                logger.info(f"图表统计结束日期格式错误: {date_to}, 错误: {e}")
                 raise HTTPException(
                     status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                     detail=f"结束日期格式错误，请使用 YYYY-MM-DD 格式: {date_to}"
                 )
         
-        print(f"查询条件数量: {len(query_conditions)}")
-        
-        # 1. 收支对比数据
-        print("开始查询收支对比数据...")
-        income_expense_query = await db.execute(
-            select(
-                func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0)).label('total_income'),
-                func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)).label('total_expense')
-            ).where(and_(*query_conditions))
-        )
-        income_expense_data = income_expense_query.first()
-        print(f"收支对比查询结果: income={income_expense_data.total_income}, expense={income_expense_data.total_expense}")
-        
-        # 2. 支出分类分布
-        print("开始查询支出分类分布...")
-        category_distribution_query = await db.execute(
-            select(
-                Category.name,
-                func.sum(Transaction.amount).label('total_amount')
-            ).select_from(
-                Transaction.__table__.join(
-                    Category.__table__,
-                    Transaction.category_id == Category.id
-                )
-            ).where(
-                and_(
-                    *query_conditions,
-                    Transaction.type == 'expense'
-                )
-            ).group_by(Category.name)
-            .order_by(func.sum(Transaction.amount).desc())
-        )
-        
-        category_distribution = []
-        for row in category_distribution_query.all():
-            category_distribution.append({
-                'name': row.name,
-                'value': float(row.total_amount or 0)
-            })
-        print(f"分类分布查询结果: {len(category_distribution)} 个分类")
-        
-        # 3. 月度趋势数据
-        print(f"开始查询{period}趋势数据...")
-        if period == "month":
-            # 最近12个月
-            trend_query = await db.execute(
-                select(
-                    extract('year', Transaction.transaction_date).label('year'),
-                    extract('month', Transaction.transaction_date).label('month'),
-                    func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0)).label('income'),
-                    func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)).label('expense')
-                ).where(and_(*query_conditions))
-                .group_by(
-                    extract('year', Transaction.transaction_date),
-                    extract('month', Transaction.transaction_date)
-                )
-                .order_by(
-                    extract('year', Transaction.transaction_date).desc(),
-                    extract('month', Transaction.transaction_date).desc()
-                )
-                .limit(12)
+        if statistics_jobs.should_run_async(mode, parsed_date_from, parsed_date_to):
+            job_id = await statistics_jobs.submit(
+                CHART_JOB_KIND, current_user.tenant_id,
+                {"period": period, "date_from": date_from, "date_to": date_to}
             )
-        elif period == "quarter":
-            # 最近4个季度
-            trend_query = await db.execute(
-                select(
-                    extract('year', Transaction.transaction_date).label('year'),
-                    extract('quarter', Transaction.transaction_date).label('quarter'),
-                    func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0)).label('income'),
-                    func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)).label('expense')
-                ).where(and_(*query_conditions))
-                .group_by(
-                    extract('year', Transaction.transaction_date),
-                    extract('quarter', Transaction.transaction_date)
-                )
-                .order_by(
-                    extract('year', Transaction.transaction_date).desc(),
-                    extract('quarter', Transaction.transaction_date).desc()
-                )
-                .limit(4)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={"job_id": job_id, "status": statistics_jobs.PENDING, "status_url": f"/api/v1/transactions/jobs/{job_id}"}
             )
-        else:  # year
-            # 最近5年
-            trend_query = await db.execute(
-                select(
-                    extract('year', Transaction.transaction_date).label('year'),
-                    func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0)).label('income'),
-                    func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)).label('expense')
-                ).where(and_(*query_conditions))
-                .group_by(extract('year', Transaction.transaction_date))
-                .order_by(extract('year', Transaction.transaction_date).desc())
-                .limit(5)
-            )
-        
-        monthly_trend = []
-        trend_rows = trend_query.all()
-        print(f"趋势查询结果: {len(trend_rows)} 条记录")
-        
-        for row in trend_rows:
-            if period == "month":
-                month_names = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
-                label = f"{int(row.year)}年{month_names[int(row.month)-1]}"
-            elif period == "quarter":
-                label = f"{int(row.year)}年Q{int(row.quarter)}"
-            else:
-                label = f"{int(row.year)}年"
-            
-            monthly_trend.append({
-                'label': label,
-                'income': float(row.income or 0),
-                'expense': float(row.expense or 0),
-                'net': float((row.income or 0) - (row.expense or 0))
-            })
-        
-        # 4. 供应商交易排行
-        print("开始查询供应商交易排行...")
-        supplier_ranking_query = await db.execute(
-            select(
-                Supplier.name,
-                func.sum(Transaction.amount).label('total_amount'),
-                func.count(Transaction.id).label('transaction_count')
-            ).select_from(
-                Transaction.__table__.join(
-                    Supplier.__table__,
-                    Transaction.supplier_id == Supplier.id
-                )
-            ).where(and_(*query_conditions))
-            .group_by(Supplier.name)
-            .order_by(func.sum(Transaction.amount).desc())
-            .limit(10)
-        )
-        
-        supplier_ranking = []
-        for row in supplier_ranking_query.all():
-            supplier_ranking.append({
-                'name': row.name,
-                'value': float(row.total_amount or 0),
-                'count': row.transaction_count
-            })
-        print(f"供应商排行查询结果: {len(supplier_ranking)} 个供应商")
-        
-        # 5. 项目财务分析
-        print("开始查询项目财务分析...")
-        project_analysis_query = await db.execute(
-            select(
-                Project.name,
-                Project.budget,
-                Project.contract_value,
-                func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)).label('actual_expense')
-            ).select_from(
-                Project.__table__.outerjoin(
-                    Transaction.__table__,
-                    Project.id == Transaction.project_id
-                )
-            ).where(
-                and_(
-                    Project.tenant_id == current_user.tenant_id,
-                    *query_conditions
-                )
-            ).group_by(Project.id, Project.name, Project.budget, Project.contract_value)
-            .order_by(func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)).desc())
-            .limit(10)
-        )
         
-        project_analysis = []
-        for row in project_analysis_query.all():
-            budget = float(row.budget or 0)
-            actual_expense = float(row.actual_expense or 0)
-            profit = budget - actual_expense
-            
-            project_analysis.append({
-                'name': row.name,
-                'budget': budget,
-                'actual_expense': actual_expense,
-                'profit': profit
-            })
-        print(f"项目分析查询结果: {len(project_analysis)} 个项目")
-        
-        # 6. 支付方式分析
-        print("开始查询支付方式分析...")
-        payment_method_query = await db.execute(
-            select(
-                Transaction.payment_method,
-                func.sum(Transaction.amount).label('total_amount'),
-                func.count(Transaction.id).label('count')
-            ).where(and_(*query_conditions))
-            .group_by(Transaction.payment_method)
-            .order_by(func.sum(Transaction.amount).desc())
+        return await chart_statistics.compute_chart_statistics(
+            db, current_user.tenant_id, period, parsed_date_from, parsed_date_to
         )
         
-        payment_method_analysis = []
-        for row in payment_method_query.all():
-            payment_method_analysis.append({
-                'name': row.payment_method or '其他',
-                'value': float(row.total_amount or 0),
-                'count': row.count
-            })
-        print(f"支付方式分析查询结果: {len(payment_method_analysis)} 种方式")
-        
-        # 构建响应数据
-        response_data = {
-            "income_expense": {
-                "income": float(income_expense_data.total_income or 0),
-                "expense": float(income_expense_data.total_expense or 0),
-                "net": float((income_expense_data.total_income or 0) - (income_expense_data.total_expense or 0))
-            },
-            "category_distribution": category_distribution,
-            "monthly_trend": monthly_trend,
-            "supplier_ranking": supplier_ranking,
-            "project_analysis": project_analysis,
-            "payment_method_analysis": payment_method_analysis
-        }
-        
-        print("图表统计数据处理完成，准备返回响应")
-        return response_data
-        
     except HTTPException:
         raise
     except Exception as e:
-        print(f"图表统计处理异常: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"图表统计处理异常: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"获取图表统计失败: {str(e)}"
         )
 
+@router.get("/jobs/{job_id}", summary="查询统计后台任务")
+async def get_statistics_job(
+    job_id: str,
+    response: Response,
+    current_user: User = Depends(require_permissions(["transaction_read"]))
+):
+    """
+    查询统计后台任务状态，完成后 result 为统计结果
+    
+    status: pending/running/succeeded/failed
+    
+    需要权限: transaction_read
+    """
+    job = await statistics_jobs.get_status(job_id, current_user.tenant_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="任务不存在或已过期"
+        )
+    response.headers["Cache-Control"] = "no-store"
+    return job
+
+DAILY_MAX_DAYS = 366
+
+@router.get("/statistics/daily", summary="获取每日财务统计")
+@cached_statistics("transactions.statistics.daily")
+async def get_daily_statistics(
+    days: int = Query(30, ge=1, le=DAILY_MAX_DAYS, description="最近N天（未指定日期范围时使用）"),
+    date_from: Optional[date] = Query(None, description="统计日期范围-起始"),
+    date_to: Optional[date] = Query(None, description="统计日期范围-结束，默认今天"),
+    top: int = Query(5, ge=0, le=20, description="每天返回的支出最高项目/供应商数"),
+    current_user: User = Depends(require_permissions(["transaction_read"])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    获取每日收支趋势
+    
+    已结束的日期读取每日快照（system_statistics），今天和尚未生成快照的日期实时计算（is_live=true），
+    日期范围最多 366 天
+    
+    需要权限: transaction_read
+    """
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=days - 1)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="起始日期不能晚于结束日期"
+        )
+    if (date_to - date_from).days + 1 > DAILY_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"日期范围不能超过 {DAILY_MAX_DAYS} 天"
+        )
+    
+    daily = await daily_snapshots.load_days(db, current_user.tenant_id, date_from, date_to)
+    
+    def top_items(totals: dict) -> list:
+        return sorted(totals.items(), key=lambda item: float(item[1]), reverse=True)[:top]
+    
+    # 一次查出各天排行中出现的项目、供应商名称
+    project_ids = {key for day in daily for key, _ in top_items(day.get("projects") or {})}
+    supplier_ids = {key for day in daily for key, _ in top_items(day.get("suppliers") or {})}
+    project_names, supplier_names = {}, {}
+    if project_ids:
+        rows = await db.execute(
+            select(Project.id, Project.name).where(
+                Project.tenant_id == current_user.tenant_id, Project.id.in_(project_ids)
+            )
+        )
+        project_names = {str(row.id): row.name for row in rows.all()}
+    if supplier_ids:
+        rows = await db.execute(
+            select(Supplier.id, Supplier.name).where(
+                Supplier.tenant_id == current_user.tenant_id, Supplier.id.in_(supplier_ids)
+            )
+        )
+        supplier_names = {str(row.id): row.name for row in rows.all()}
+    
+    items = []
+    for day in daily:
+        income = float(day.get("income") or 0)
+        expense = float(day.get("expense") or 0)
+        items.append({
+            "date": day["date"].isoformat(),
+            "is_live": day["is_live"],
+            "income": income,
+            "expense": expense,
+            "net": round(income - expense, 2),
+            "income_count": int(day.get("income_count") or 0),
+            "expense_count": int(day.get("expense_count") or 0),
+            "pending_count": int(day.get("pending_count") or 0),
+            "pending_amount": float(day.get("pending_amount") or 0),
+            "top_projects": [
+                {"id": key, "name": project_names.get(key), "amount": float(value)}
+                for key, value in top_items(day.get("projects") or {})
+            ],
+            "top_suppliers": [
+                {"id": key, "name": supplier_names.get(key), "amount": float(value)}
+                for key, value in top_items(day.get("suppliers") or {})
+            ],
+        })
+    
+    return {
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "total_income": round(sum(item["income"] for item in items), 2),
+        "total_expense": round(sum(item["expense"] for item in items), 2),
+        "items": items
+    }
+
+async def _table_total(db: AsyncSession, tenant_id, date_from, date_to, total_mode: str):
+    """
+    表格统计的总记录数，返回 (总数, 是否为估算值)
+
+    exact: 精确 COUNT(*)；estimate: 查询规划器估算；
+    auto: 估算值不超过 TABLE_EXACT_COUNT_THRESHOLD 时精确计数，否则由月度汇总计算
+    （整月读汇总、首尾不足整月的部分聚合明细，与明细计数一致，翻页不再扫描整个租户的明细）
+    """
+    conditions = [Transaction.tenant_id == tenant_id]
+    from_clause = "FROM transactions WHERE tenant_id = :tenant_id"
+    params = {"tenant_id": tenant_id}
+    if date_from:
+        conditions.append(Transaction.transaction_date >= date_from)
+        from_clause += " AND transaction_date >= :date_from"
+        params["date_from"] = date_from
+    if date_to:
+        conditions.append(Transaction.transaction_date <= date_to)
+        from_clause += " AND transaction_date <= :date_to"
+        params["date_to"] = date_to
+
+    if total_mode != "exact":
+        estimate = await planner_row_estimate(db, from_clause, params)
+        if total_mode == "estimate":
+            return estimate, True
+        if estimate > settings.TABLE_EXACT_COUNT_THRESHOLD:
+            ledger = transaction_rollup.ledger_source(tenant_id, date_from, date_to)
+            result = await db.execute(select(func.coalesce(func.sum(ledger.c.transaction_count), 0)))
+            return int(result.scalar()), False
+
+    result = await db.execute(select(func.count(Transaction.id)).where(and_(*conditions)))
+    return result.scalar(), False
+
 @router.get("/statistics/table", summary="获取表格统计数据")
+@cached_statistics("transactions.statistics.table")
 async def get_table_statistics(
     date_from: Optional[date] = Query(None, description="统计日期范围-起始"),
     date_to: Optional[date] = Query(None, description="统计日期范围-结束"),
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(100, ge=1, le=1000, description="返回记录数"),
+    total_mode: str = Query("auto", pattern="^(auto|exact|estimate)$", description="总数计算方式: auto/exact/estimate"),
     current_user: User = Depends(require_permissions(["transaction_read"])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取表格统计数据
     
+    总数默认按数据量选择精确计数或由月度汇总计算，estimate 时返回规划器估算值，
+    响应中的 total_is_estimate 标明总数是否为估算值
+    
     需要权限: transaction_read
     """
     try:
@@ -1033,10 +1275,7 @@ async def get_table_statistics(
             query_conditions.append(Transaction.transaction_date <= date_to)
         
         # 获取总数
-        total_query = await db.execute(
-            select(func.count(Transaction.id)).where(and_(*query_conditions))
-        )
-        total = total_query.scalar()
+        total, total_is_estimate = await _table_total(db, current_user.tenant_id, date_from, date_to, total_mode)
         
         # 获取分页数据
         transactions_query = await db.execute(
@@ -1073,6 +1312,7 @@ async def get_table_statistics(
         
         return {
             "total": total,
+            "total_is_estimate": total_is_estimate,
             "data": table_data,
             "skip": skip,
             "limit": limit
@@ -1105,6 +1345,7 @@ async def _build_transaction_response(
         "amount": transaction.amount,
         "currency": transaction.currency,
         "exchange_rate": transaction.exchange_rate,
+        "amount_base": transaction.amount_base,
         "description": transaction.description,
         "notes": transaction.notes,
         "tags": transaction.tags or [],
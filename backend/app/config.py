@@ -23,12 +23,33 @@ class Settings(BaseSettings):
     DB_NAME: str = "fince_project_prod"
     DB_USER: str = "fince_app_project"
     DB_PASSWORD: str = "Fince_project_5%8*6^9(3#0)"
-    
+
+    # 数据库连接池配置
+    DB_POOL_SIZE: int = 10  # 常驻连接数
+    DB_MAX_OVERFLOW: int = 20  # 高峰期允许额外创建的连接数
+    DB_POOL_RECYCLE: int = 1800  # 连接回收时间(秒)，避免被服务端或防火墙断开
+    DB_POOL_PRE_PING: bool = True  # 借出连接前检测可用性
+    DB_POOL_TIMEOUT: int = 30  # 获取连接的最长等待时间(秒)
+
+    # 只读副本配置（未配置DB_READ_HOST时所有读请求走主库）
+    DB_READ_HOST: Optional[str] = None
+    DB_READ_PORT: Optional[int] = None
+    DB_READ_MAX_LAG_SECONDS: float = 5.0  # 副本复制延迟超过该值时回退主库
+    DB_READ_LAG_CHECK_INTERVAL: float = 10.0  # 复制延迟检测间隔(秒)
+
     @property
     def DATABASE_URL(self) -> str:
         """构建异步数据库URL"""
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
-    
+
+    @property
+    def DATABASE_READ_URL(self) -> Optional[str]:
+        """构建只读副本异步数据库URL"""
+        if not self.DB_READ_HOST:
+            return None
+        read_port = self.DB_READ_PORT or self.DB_PORT
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_READ_HOST}:{read_port}/{self.DB_NAME}"
+
     @property
     def DATABASE_URL_SYNC(self) -> str:
         """构建同步数据库URL"""
@@ -38,6 +59,20 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_PASSWORD: Optional[str] = None
     
+    # 统计结果缓存配置
+    STATS_CACHE_ENABLED: bool = True
+    STATS_CACHE_BACKEND: str = "memory"  # memory: 进程内LRU；redis: 多进程共享（同时共享租户数据版本号）
+    STATS_CACHE_TTL: int = 300  # 缓存有效期(秒)，也是内存模式下多进程间数据不一致的最长时间
+    STATS_CACHE_MAX_ENTRIES: int = 2048  # 进程内缓存最大条目数
+    ETAG_ENABLED: bool = True  # 统计和列表接口按租户数据版本返回ETag/304（多进程部署需使用redis后端）
+    TABLE_EXACT_COUNT_THRESHOLD: int = 10000  # 表格统计总数：规划器估算不超过该值时精确计数，否则从月度汇总计算
+    
+    # 多币种配置
+    BASE_CURRENCY: str = "CNY"  # 本位币，统计汇总统一使用本位币金额
+    
+    # 交易表分区配置（按交易日期按月分区）
+    TRANSACTION_PARTITION_MONTHS_AHEAD: int = 3  # 启动时和维护脚本预建的未来月份分区数
+    
     # JWT安全配置
     SECRET_KEY: str = "your-super-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
@@ -66,6 +101,15 @@ class Settings(BaseSettings):
     # Celery配置
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
+    STATS_JOBS_BACKEND: str = "local"  # 重统计后台任务: celery 投递到上面的Broker由worker执行；local 在API进程内后台执行（开发环境）
+    # 注意: celery 需要 STATS_CACHE_BACKEND=redis，memory 缓存下worker写入的结果只在worker进程内，接口不会命中
+    STATS_JOB_RESULT_TTL: int = 3600  # 后台任务结果保留时间(秒)
+    CHART_ASYNC_MIN_MONTHS: int = 24  # 图表统计跨度达到该月数（或不限起始日期）时自动转为后台任务
+    DAILY_SNAPSHOT_HOUR: int = 1  # 每日财务快照生成时间（时，celery beat 调度）
+    DAILY_SNAPSHOT_BACKFILL_DAYS: int = 7  # 每次快照任务补齐最近N天缺失或已失效的快照
+    CASCADE_DELETE_BATCH_SIZE: int = 5000  # 删除项目、租户时每批删除的行数（每批一个事务）
+    DELETE_JOBS_BACKEND: str = "local"  # 级联删除后台任务: celery 由worker执行；local 在API进程内后台执行（开发环境）
+    DELETE_JOB_RESULT_TTL: int = 86400  # 删除任务状态保留时间(秒)
     
     # 日志配置
     LOG_LEVEL: str = "INFO"
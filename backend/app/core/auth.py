@@ -12,6 +12,7 @@ from sqlalchemy import select
 
 from ..config import settings
 from ..models.user import User
+from ..models.tenant import Tenant, TENANT_DELETING
 from .database import get_db
 
 # 密码加密上下文 - 使用更兼容的配置
@@ -135,14 +136,28 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    # 查询用户
+    # 查询用户（同时取所属租户状态）
     result = await db.execute(
-        select(User).where(User.id == user_id, User.is_active == True)
+        select(User, Tenant.status)
+        .outerjoin(Tenant, Tenant.id == User.tenant_id)
+        .where(User.id == user_id, User.is_active == True)
     )
-    user = result.scalar_one_or_none()
+    row = result.one_or_none()
     
-    if user is None:
+    if row is None:
         raise credentials_exception
+    user, tenant_status = row
+    
+    # 租户删除任务执行中，拒绝该租户的所有请求，避免写入与分批删除交错
+    if tenant_status == TENANT_DELETING:
+        raise HTTPException(
+            status_code=http_status.HTTP_403_FORBIDDEN,
+            detail="租户正在删除"
+        )
+    
+    # 结束查询用户的只读事务，主库连接在处理函数首次访问数据库前归还连接池；
+    # 使用只读副本的请求处理期间只占用副本连接
+    await db.commit()
     
     return user
 
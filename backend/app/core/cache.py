@@ -0,0 +1,240 @@
+"""
+统计结果缓存
+
+同一租户、同一统计接口、同样的查询参数在下一次写入之前结果不变，
+缓存键包含租户数据版本号（见 data_version.py），写请求递增版本号后旧缓存自然失效，
+无需逐个删除。默认使用进程内LRU缓存，STATS_CACHE_BACKEND=redis 时使用Redis。
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+from collections import OrderedDict
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from ..config import settings
+from .data_version import data_version
+import functools
+import hashlib
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class CacheMetrics:
+    """缓存命中指标"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """重置所有计数"""
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.endpoints: Dict[str, Dict[str, int]] = {}
+
+    def record(self, endpoint: str, hit: bool):
+        """记录一次查找"""
+        counts = self.endpoints.setdefault(endpoint, {"hits": 0, "misses": 0})
+        if hit:
+            self.hits += 1
+            counts["hits"] += 1
+        else:
+            self.misses += 1
+            counts["misses"] += 1
+
+    def snapshot(self) -> dict:
+        """导出指标快照"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / total, 4) if total else 0,
+            "endpoints": self.endpoints
+        }
+
+class MemoryCacheBackend:
+    """进程内LRU缓存，条目超过TTL后失效"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+    async def close(self):
+        self._entries.clear()
+
+class RedisCacheBackend:
+    """Redis缓存，值以JSON存储，由Redis负责过期"""
+
+    def __init__(self, ttl: int):
+        import redis.asyncio as redis
+
+        self.ttl = ttl
+        self._client = redis.from_url(settings.REDIS_URL, password=settings.REDIS_PASSWORD)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self._client.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any):
+        await self._client.set(key, json.dumps(value, ensure_ascii=False), ex=self.ttl)
+
+    def size(self) -> Optional[int]:
+        return None
+
+    async def close(self):
+        await self._client.close()
+
+class StatisticsCache:
+    """租户级统计结果缓存"""
+
+    KEY_PREFIX = "stats_cache"
+
+    def __init__(self):
+        self.metrics = CacheMetrics()
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if settings.STATS_CACHE_BACKEND == "redis":
+                self._backend = RedisCacheBackend(settings.STATS_CACHE_TTL)
+            else:
+                self._backend = MemoryCacheBackend(settings.STATS_CACHE_MAX_ENTRIES, settings.STATS_CACHE_TTL)
+        return self._backend
+
+    def make_key(self, tenant_id, version: int, endpoint: str, params: Dict[str, Any]) -> str:
+        """缓存键：租户 + 数据版本 + 接口 + 规范化后的查询参数"""
+        normalized = json.dumps(jsonable_encoder(params), sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}:{tenant_id}:{version}:{endpoint}:{digest}"
+
+    async def lookup(self, tenant_id, endpoint: str, params: Dict[str, Any]) -> Optional[Any]:
+        """只查缓存，不计算；未启用或后端异常时返回None"""
+        if not settings.STATS_CACHE_ENABLED:
+            return None
+        version = await data_version.get(tenant_id)
+        try:
+            cached = await self.backend.get(self.make_key(tenant_id, version, endpoint, params))
+        except Exception as e:
+            self.metrics.errors += 1
+            logger.warning(f"读取统计缓存失败: {e}")
+            return None
+        self.metrics.record(endpoint, hit=cached is not None)
+        return cached
+
+    async def store(self, tenant_id, version: int, endpoint: str, params: Dict[str, Any], value: Any):
+        """写入指定数据版本下的结果（后台任务在计算开始前取版本号，期间有写入则结果自然过期）"""
+        if not settings.STATS_CACHE_ENABLED:
+            return
+        try:
+            await self.backend.set(self.make_key(tenant_id, version, endpoint, params), jsonable_encoder(value))
+        except Exception as e:
+            self.metrics.errors += 1
+            logger.warning(f"写入统计缓存失败: {e}")
+
+    async def get_or_compute(
+        self,
+        tenant_id,
+        endpoint: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """命中则返回缓存结果，否则计算并写入缓存；缓存后端异常时直接计算"""
+        if not settings.STATS_CACHE_ENABLED:
+            return await compute()
+
+        version = await data_version.get(tenant_id)
+        key = self.make_key(tenant_id, version, endpoint, params)
+
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:
+            self.metrics.errors += 1
+            logger.warning(f"读取统计缓存失败: {e}")
+            return await compute()
+
+        if cached is not None:
+            self.metrics.record(endpoint, hit=True)
+            return cached
+
+        self.metrics.record(endpoint, hit=False)
+        result = await compute()
+        if isinstance(result, Response):
+            return result
+
+        value = jsonable_encoder(result)
+        try:
+            await self.backend.set(key, value)
+        except Exception as e:
+            self.metrics.errors += 1
+            logger.warning(f"写入统计缓存失败: {e}")
+        return value
+
+    def get_metrics(self) -> dict:
+        """缓存运行指标"""
+        return {
+            "enabled": settings.STATS_CACHE_ENABLED,
+            "backend": settings.STATS_CACHE_BACKEND,
+            "ttl_seconds": settings.STATS_CACHE_TTL,
+            "entries": self.backend.size(),
+            **self.metrics.snapshot()
+        }
+
+    async def close(self):
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+# 全局统计缓存实例
+stats_cache = StatisticsCache()
+
+# 不参与缓存键的接口参数
+_NON_KEY_PARAMS = {"db", "current_user", "response"}
+
+def cached_statistics(endpoint: str, exclude_params: tuple = ()):
+    """
+    统计接口缓存装饰器
+
+    放在路由装饰器之下，按当前用户租户和其余查询参数缓存接口返回值：
+
+        @router.get("/statistics")
+        @cached_statistics("projects.statistics")
+        async def get_project_statistics(...):
+
+    exclude_params 中的参数不影响结果（如执行方式），不参与缓存键
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            current_user = kwargs["current_user"]
+            params = {
+                name: value for name, value in kwargs.items()
+                if name not in _NON_KEY_PARAMS and name not in exclude_params
+            }
+            return await stats_cache.get_or_compute(
+                current_user.tenant_id, endpoint, params, lambda: func(*args, **kwargs)
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,210 @@
+"""
+租户数据版本号
+
+每个租户维护一个单调递增的版本号，修改交易、项目、供应商、分类的请求成功后递增。
+统计缓存把版本号作为缓存键的一部分，版本变化即视为该租户所有缓存失效；
+轮询频繁的统计和列表接口据此生成ETag，数据未变化时直接返回304，不访问数据库。
+
+版本号递增后的一段时间内（副本最大允许延迟 + 延迟检测间隔），该租户的读请求改为读取主库
+（与是否启用ETag无关），避免用新版本号给延迟副本上的旧数据生成ETag和缓存。
+"""
+from typing import Dict, Optional
+from datetime import date
+from fastapi import HTTPException
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from ..config import settings
+from .auth import auth_manager
+from .database import primary_reads
+import hashlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# 修改这些资源的请求会递增租户版本号
+VERSIONED_PATH_PREFIXES = tuple(
+    f"/api/v1/{resource}" for resource in ("transactions", "projects", "suppliers", "categories")
+)
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# 支持ETag的GET接口：结果只取决于租户数据和查询参数
+ETAG_PATHS = {
+    "/api/v1/categories/",
+    "/api/v1/suppliers/",
+}
+ETAG_PATH_PREFIXES = (
+    "/api/v1/transactions/statistics/",
+    "/api/v1/projects/statistics",
+    "/api/v1/suppliers/statistics/",
+)
+
+class TenantDataVersion:
+    """
+    租户数据版本号存储
+
+    缓存后端为 redis 时版本号存放在Redis中，多个进程共享；
+    否则存放在进程内，多进程部署下各进程独立计数，缓存最多滞后 STATS_CACHE_TTL 秒。
+    """
+
+    KEY_PREFIX = "tenant_data_version:"
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        # 各租户最近一次递增版本号的时间
+        self._bumped_at: Dict[str, float] = {}
+        # 以进程启动时间为初始值，重启后版本号不会与重启前的值重复
+        self._base = int(time.time() * 1000)
+        self._redis = None
+
+    def _redis_client(self):
+        if settings.STATS_CACHE_BACKEND != "redis":
+            return None
+        if self._redis is None:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(settings.REDIS_URL, password=settings.REDIS_PASSWORD)
+        return self._redis
+
+    async def get(self, tenant_id) -> int:
+        """获取租户当前版本号"""
+        client = self._redis_client()
+        if client is not None:
+            key = f"{self.KEY_PREFIX}{tenant_id}"
+            try:
+                value = await client.get(key)
+                if value is None:
+                    await client.set(key, self._base, nx=True)
+                    value = await client.get(key)
+                return int(value)
+            except Exception as e:
+                logger.warning(f"读取Redis租户数据版本失败，使用进程内版本: {e}")
+        return self._versions.get(str(tenant_id), self._base)
+
+    @staticmethod
+    def _replica_window() -> float:
+        """写入后副本可能仍返回旧数据的时长：超过最大允许延迟的副本在下次延迟检测后才会被回退"""
+        return settings.DB_READ_MAX_LAG_SECONDS + settings.DB_READ_LAG_CHECK_INTERVAL
+
+    async def bump(self, tenant_id) -> int:
+        """递增租户版本号，返回新版本号"""
+        version = self._versions.get(str(tenant_id), self._base) + 1
+        self._versions[str(tenant_id)] = version
+        self._bumped_at[str(tenant_id)] = time.monotonic()
+
+        client = self._redis_client()
+        if client is not None:
+            key = f"{self.KEY_PREFIX}{tenant_id}"
+            try:
+                await client.set(key, self._base, nx=True)
+                version = int(await client.incr(key))
+                if settings.DATABASE_READ_URL:
+                    await client.set(f"{key}:recent", 1, px=int(self._replica_window() * 1000))
+            except Exception as e:
+                logger.warning(f"递增Redis租户数据版本失败: {e}")
+        return version
+
+    async def recently_bumped(self, tenant_id) -> bool:
+        """租户版本号是否在副本可能滞后的时间内递增过（未配置只读副本时总是False）"""
+        if not settings.DATABASE_READ_URL:
+            return False
+        bumped_at = self._bumped_at.get(str(tenant_id))
+        if bumped_at is not None and time.monotonic() - bumped_at < self._replica_window():
+            return True
+
+        client = self._redis_client()
+        if client is not None:
+            try:
+                return bool(await client.exists(f"{self.KEY_PREFIX}{tenant_id}:recent"))
+            except Exception as e:
+                logger.warning(f"读取Redis租户最近写入标记失败: {e}")
+        return False
+
+    async def close(self):
+        """关闭Redis连接"""
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+# 全局租户数据版本实例
+data_version = TenantDataVersion()
+
+def token_payload(request: Request) -> Optional[dict]:
+    """解析Bearer令牌，令牌缺失或无效时返回None"""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return auth_manager.verify_token(token)
+    except HTTPException:
+        return None
+
+def tenant_id_from_request(request: Request) -> Optional[str]:
+    """从Bearer令牌中解析租户ID，令牌缺失或无效时返回None"""
+    payload = token_payload(request)
+    return payload.get("tenant_id") if payload else None
+
+def build_etag(version: int, payload: dict, request: Request) -> str:
+    """
+    强ETag：数据版本 + 用户、路径、规范化查询参数和当天日期的摘要
+
+    包含用户ID，ETag不能跨用户复用；包含日期，"最近N个月"这类相对今天的统计跨天后重新计算
+    """
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    source = f"{payload.get('sub')}|{request.url.path}?{query}|{date.today().isoformat()}"
+    digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+class DataVersionMiddleware(BaseHTTPMiddleware):
+    """
+    租户数据版本中间件
+
+    写请求：成功后递增租户数据版本号，在响应返回给客户端之前完成，
+    客户端收到写成功响应后再读取统计一定不会命中旧缓存。
+    轮询接口的GET请求：生成ETag，If-None-Match 命中时直接返回304。
+    版本化资源的GET请求：租户刚写入过时本次查询读主库。
+    注意：多进程部署必须使用 redis 后端共享版本号，否则其他进程的写入不会使本进程的ETag失效。
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        if request.method == "GET" and path.startswith(VERSIONED_PATH_PREFIXES):
+            payload = token_payload(request)
+            tenant_id = payload.get("tenant_id") if payload else None
+            # 刚写入时副本可能还是旧数据，本次查询读主库，保证ETag和统计缓存对应的是该版本的数据
+            if tenant_id and await data_version.recently_bumped(tenant_id):
+                primary_reads.set(True)
+            if settings.ETAG_ENABLED and tenant_id and (path in ETAG_PATHS or path.startswith(ETAG_PATH_PREFIXES)):
+                return await self._conditional_get(request, call_next, payload)
+
+        response = await call_next(request)
+
+        if (
+            request.method in MUTATING_METHODS
+            and response.status_code < 400
+            and request.url.path.startswith(VERSIONED_PATH_PREFIXES)
+        ):
+            tenant_id = tenant_id_from_request(request)
+            if tenant_id:
+                await data_version.bump(tenant_id)
+
+        return response
+
+    async def _conditional_get(self, request: Request, call_next, payload: dict):
+        # 在执行查询之前取版本号：查询期间发生写入时，旧版本的ETag在下次请求时不会匹配
+        version = await data_version.get(payload["tenant_id"])
+        etag = build_etag(version, payload, request)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers.update(headers)
+        return response
@@ -1,43 +1,165 @@
 """
 数据库连接和配置
 """
+from typing import Optional
+from contextvars import ContextVar
+from fastapi import Depends
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from ..config import settings
+import bisect
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# 为True时当前上下文的只读会话走主库（租户刚写入、副本可能尚未同步时，见 data_version.py）
+primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
+class PoolMetrics:
+    """连接池运行指标"""
+
+    # 获取连接耗时直方图的桶上限(毫秒)
+    LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """重置所有计数"""
+        self.waiters = 0
+        self.max_waiters = 0
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_errors = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.latency_total_ms = 0.0
+        self.latency_max_ms = 0.0
+        self.latency_counts = [0] * (len(self.LATENCY_BUCKETS_MS) + 1)
+
+    def begin_wait(self):
+        """开始等待获取连接"""
+        self.waiters += 1
+        self.max_waiters = max(self.max_waiters, self.waiters)
+
+    def end_wait(self, elapsed_ms: float, error: Exception = None):
+        """结束等待，记录耗时"""
+        self.waiters -= 1
+        if error is not None:
+            if isinstance(error, PoolTimeoutError):
+                self.checkout_timeouts += 1
+            else:
+                self.checkout_errors += 1
+            return
+
+        self.checkouts += 1
+        self.latency_total_ms += elapsed_ms
+        self.latency_max_ms = max(self.latency_max_ms, elapsed_ms)
+        self.latency_counts[bisect.bisect_left(self.LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def snapshot(self) -> dict:
+        """导出指标快照"""
+        histogram = []
+        for index, count in enumerate(self.latency_counts):
+            if index < len(self.LATENCY_BUCKETS_MS):
+                label = f"<={self.LATENCY_BUCKETS_MS[index]}ms"
+            else:
+                label = f">{self.LATENCY_BUCKETS_MS[-1]}ms"
+            histogram.append({"bucket": label, "count": count})
+
+        return {
+            "waiters": self.waiters,
+            "max_waiters": self.max_waiters,
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "checkout_errors": self.checkout_errors,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "checkout_latency_avg_ms": round(self.latency_total_ms / self.checkouts, 3) if self.checkouts else 0,
+            "checkout_latency_max_ms": round(self.latency_max_ms, 3),
+            "checkout_latency_histogram": histogram
+        }
+
 class DatabaseManager:
     """数据库管理器"""
-    
+
     def __init__(self):
         self.engine = None
         self.session_maker = None
-    
+        self.pool_metrics = PoolMetrics()
+
+        # 只读副本
+        self.read_engine = None
+        self.read_session_maker = None
+        self.read_pool_metrics = PoolMetrics()
+        self.replica_lag_seconds = None
+        self.replica_available = False
+        self.replica_checked_at = 0.0
+        self.replica_fallbacks = 0
+
+    def _create_engine(self, url: str):
+        """按连接池配置创建异步引擎"""
+        return create_async_engine(
+            url,
+            echo=settings.DEBUG,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            future=True
+        )
+
     async def initialize(self):
         """初始化数据库连接"""
         if self.engine is None:
-            self.engine = create_async_engine(
-                settings.DATABASE_URL,
-                echo=settings.DEBUG,
-                poolclass=NullPool,  # 使用NullPool避免连接池问题
-                future=True
-            )
-            
+            self.engine = self._create_engine(settings.DATABASE_URL)
+            self._register_pool_events(self.engine, self.pool_metrics)
+
             self.session_maker = async_sessionmaker(
                 bind=self.engine,
                 class_=AsyncSession,
                 expire_on_commit=False
             )
-    
-    async def get_session(self):
-        """获取数据库会话"""
-        if self.session_maker is None:
-            await self.initialize()
-        
-        async with self.session_maker() as session:
+
+        if self.read_engine is None and settings.DATABASE_READ_URL:
+            self.read_engine = self._create_engine(settings.DATABASE_READ_URL)
+            self._register_pool_events(self.read_engine, self.read_pool_metrics)
+
+            self.read_session_maker = async_sessionmaker(
+                bind=self.read_engine,
+                class_=AsyncSession,
+                expire_on_commit=False
+            )
+
+    def _register_pool_events(self, engine, metrics: PoolMetrics):
+        """注册连接池事件，统计新建和失效的连接"""
+        @event.listens_for(engine.sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            metrics.connects += 1
+
+        @event.listens_for(engine.sync_engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            metrics.invalidations += 1
+
+    async def _checkout(self, session: AsyncSession, metrics: PoolMetrics):
+        """从连接池借出连接并记录等待耗时"""
+        metrics.begin_wait()
+        start_time = time.perf_counter()
+        try:
+            await session.connection()
+        except Exception as e:
+            metrics.end_wait(0, error=e)
+            raise
+        metrics.end_wait((time.perf_counter() - start_time) * 1000)
+
+    async def _session_scope(self, session_maker, metrics: PoolMetrics):
+        """打开会话并在异常时回滚"""
+        async with session_maker() as session:
             try:
+                await self._checkout(session, metrics)
                 yield session
             except Exception as e:
                 await session.rollback()
@@ -45,11 +167,109 @@ class DatabaseManager:
                 raise
             finally:
                 await session.close()
-    
+
+    async def get_session(self):
+        """获取数据库会话"""
+        if self.session_maker is None:
+            await self.initialize()
+
+        async for session in self._session_scope(self.session_maker, self.pool_metrics):
+            yield session
+
+    async def _replica_usable(self) -> bool:
+        """检查只读副本是否可用且复制延迟在允许范围内（结果按间隔缓存）"""
+        now = time.monotonic()
+        if now - self.replica_checked_at < settings.DB_READ_LAG_CHECK_INTERVAL:
+            return self.replica_available
+
+        self.replica_checked_at = now
+        try:
+            async with self.read_engine.connect() as conn:
+                result = await conn.execute(text(
+                    "SELECT CASE WHEN pg_is_in_recovery() "
+                    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+                    "ELSE 0 END"
+                ))
+                self.replica_lag_seconds = float(result.scalar() or 0)
+            self.replica_available = self.replica_lag_seconds <= settings.DB_READ_MAX_LAG_SECONDS
+            if not self.replica_available:
+                logger.warning(f"只读副本复制延迟 {self.replica_lag_seconds:.1f}s，读请求回退主库")
+        except Exception as e:
+            self.replica_lag_seconds = None
+            self.replica_available = False
+            logger.warning(f"只读副本不可用，读请求回退主库: {e}")
+
+        return self.replica_available
+
+    async def get_read_session(self, primary: Optional[AsyncSession] = None):
+        """
+        获取只读数据库会话（副本不可用、延迟过大或上下文要求读主库时回退主库）
+
+        回退主库时如果传入了本请求已有的主库会话 primary，直接复用，不再从主库连接池借出第二个连接
+        """
+        if self.session_maker is None or (settings.DATABASE_READ_URL and self.read_engine is None):
+            await self.initialize()
+
+        if self.read_session_maker is not None and not primary_reads.get() and await self._replica_usable():
+            session_maker, metrics = self.read_session_maker, self.read_pool_metrics
+        else:
+            if self.read_session_maker is not None and not primary_reads.get():
+                self.replica_fallbacks += 1
+            if primary is not None:
+                yield primary
+                return
+            session_maker, metrics = self.session_maker, self.pool_metrics
+
+        async for session in self._session_scope(session_maker, metrics):
+            yield session
+
+    def _engine_pool_status(self, engine) -> dict:
+        """获取单个引擎的连接池状态"""
+        pool = engine.pool
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "status": pool.status()
+        }
+
+    def get_pool_status(self) -> dict:
+        """获取连接池实时状态"""
+        status = {
+            "initialized": self.engine is not None,
+            "config": {
+                "pool_size": settings.DB_POOL_SIZE,
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "pool_recycle": settings.DB_POOL_RECYCLE,
+                "pool_pre_ping": settings.DB_POOL_PRE_PING,
+                "pool_timeout": settings.DB_POOL_TIMEOUT
+            }
+        }
+
+        if self.engine is not None:
+            status["pool"] = self._engine_pool_status(self.engine)
+
+        status["metrics"] = self.pool_metrics.snapshot()
+
+        if self.read_engine is not None:
+            status["read_replica"] = {
+                "available": self.replica_available,
+                "lag_seconds": self.replica_lag_seconds,
+                "max_lag_seconds": settings.DB_READ_MAX_LAG_SECONDS,
+                "fallbacks": self.replica_fallbacks,
+                "pool": self._engine_pool_status(self.read_engine),
+                "metrics": self.read_pool_metrics.snapshot()
+            }
+
+        return status
+
     async def close(self):
         """关闭数据库连接"""
         if self.engine:
             await self.engine.dispose()
+        if self.read_engine:
+            await self.read_engine.dispose()
 
 # 创建全局数据库管理器实例
 db_manager = DatabaseManager()
@@ -58,3 +278,12 @@ async def get_db() -> AsyncSession:
     """FastAPI依赖函数：获取数据库会话"""
     async for session in db_manager.get_session():
         yield session
+
+async def get_read_db(db: AsyncSession = Depends(get_db)) -> AsyncSession:
+    """
+    FastAPI依赖函数：获取只读数据库会话，用于统计和列表查询
+
+    与 get_current_user 共用同一请求内的主库会话：未配置只读副本或副本回退主库时不再借出第二个连接
+    """
+    async for session in db_manager.get_read_session(primary=db):
+        yield session
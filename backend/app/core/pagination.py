@@ -0,0 +1,56 @@
+"""
+游标分页工具
+"""
+from fastapi import HTTPException, status as http_status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime
+from uuid import UUID
+import base64
+import json
+
+# 下一页游标通过响应头返回，保持列表接口的响应结构不变
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _to_json_value(value):
+    """将游标字段转换为可JSON序列化的值"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+def encode_cursor(*values) -> str:
+    """将排序键编码为不透明的游标字符串"""
+    payload = json.dumps([_to_json_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, *parsers) -> list:
+    """
+    解码游标字符串
+
+    parsers 与编码时的字段一一对应，例如 (date.fromisoformat, UUID)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("游标字段数量不匹配")
+        return [parser(value) for parser, value in zip(parsers, values)]
+    except Exception:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标"
+        )
+
+async def planner_row_estimate(db: AsyncSession, from_clause: str, params: dict) -> int:
+    """
+    查询规划器对 "SELECT ... {from_clause}" 返回行数的估算，不扫描数据
+
+    from_clause 形如 "FROM transactions WHERE tenant_id = :tenant_id"，精度取决于表的统计信息
+    """
+    result = await db.execute(text(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_clause}"), params)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -9,6 +9,11 @@ import logging
 
 from .api.v1.router import api_router
 from .core.database import db_manager
+from .core.pagination import NEXT_CURSOR_HEADER
+from .core.cache import stats_cache
+from .core.data_version import data_version, DataVersionMiddleware
+from .services import transaction_partitions
+from .config import settings
 
 # 配置日志
 logging.basicConfig(level=logging.DEBUG)
@@ -30,8 +35,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],  # 游标分页的下一页游标、条件请求的ETag
 )
 
+# 写请求成功后递增租户数据版本号（统计缓存失效），轮询接口的ETag/304
+app.add_middleware(DataVersionMiddleware)
+
 # 请求处理时间中间件
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
@@ -59,12 +68,28 @@ async def startup_event():
     logger.info("正在初始化数据库连接...")
     await db_manager.initialize()
     logger.info("数据库连接初始化完成")
+    
+    # 预建交易表未来月份的分区，避免新数据落入默认分区
+    try:
+        async with db_manager.session_maker() as session:
+            created = await transaction_partitions.ensure_partitions(session)
+            await session.commit()
+        if created:
+            logger.info(f"已预建 {created} 个交易表分区")
+    except Exception as e:
+        logger.warning(f"预建交易表分区失败: {e}")
+    
+    # worker 写入的统计缓存和递增的数据版本号只有 redis 后端才对API进程可见
+    if settings.STATS_JOBS_BACKEND == "celery" and settings.STATS_CACHE_BACKEND != "redis":
+        logger.warning("STATS_JOBS_BACKEND=celery 时应使用 STATS_CACHE_BACKEND=redis，否则后台任务结果不会进入接口缓存")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭时清理资源"""
     logger.info("正在关闭数据库连接...")
     await db_manager.close()
+    await stats_cache.close()
+    await data_version.close()
     logger.info("数据库连接已关闭")
 
 # 注册API路由
@@ -3,7 +3,7 @@ from .base import Base, BaseModel
 from .tenant import Tenant
 from .user import User
 from .project import Project
-from .transaction import Category, Transaction, Supplier
+from .transaction import Category, Transaction, Supplier, TransactionMonthlyRollup, ExchangeRate
 from .monitoring import MonitoringData, AdminOperationLog, SystemStatistics, TenantActivity, HealthCheck
 
 # 导出所有模型，确保Alembic能够发现它们
@@ -16,6 +16,8 @@ __all__ = [
     "Category",
     "Transaction",
     "Supplier",
+    "TransactionMonthlyRollup",
+    "ExchangeRate",
     "MonitoringData",
     "AdminOperationLog", 
     "SystemStatistics",
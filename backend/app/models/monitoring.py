@@ -1,7 +1,7 @@
 """
 监控系统数据模型
 """
-from sqlalchemy import Column, String, Integer, Text, JSON, DateTime, ForeignKey, Date, Boolean
+from sqlalchemy import Column, String, Integer, Text, JSON, DateTime, ForeignKey, Date, Boolean, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, INET
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -52,6 +52,11 @@ class SystemStatistics(BaseModel):
     stat_type = Column(String(50), nullable=False, comment="统计类型")
     stat_data = Column(JSON, nullable=False, comment="统计数据")
     
+    __table_args__ = (
+        # 每日快照按 (租户, 日期, 类型) 唯一，重复生成时覆盖
+        UniqueConstraint('tenant_id', 'stat_date', 'stat_type', name='uq_system_statistics_tenant_date_type'),
+    )
+    
     # 关系
     tenant = relationship("Tenant", back_populates="system_statistics")
     
@@ -1,7 +1,7 @@
 """
 项目数据模型 - 完整版本
 """
-from sqlalchemy import Column, String, Text, Date, Integer, DECIMAL, UUID, ForeignKey, Boolean
+from sqlalchemy import Column, String, Text, Date, Integer, DECIMAL, UUID, ForeignKey, Boolean, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -21,6 +21,12 @@ class ProjectChangeLog(BaseModel):
     change_description = Column(Text, comment="变更描述")
     change_reason = Column(Text, comment="变更原因")
     changed_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), comment="变更人")
+    changes = Column(JSONB, comment="结构化变更明细 [{field, old, new, reason}]")
+    
+    __table_args__ = (
+        # 变更历史按 (created_at, id) 倒序游标分页
+        Index('idx_project_change_logs_project_created', 'project_id', 'created_at', 'id'),
+    )
     
     # 关联关系
     project = relationship("Project", back_populates="change_logs")
@@ -31,6 +37,9 @@ class ProjectChangeLog(BaseModel):
 
 
 
+# 删除任务执行中的项目状态：拒绝新增、修改该项目及其财务记录（见 services/cascade_delete.py）
+PROJECT_DELETING = "deleting"
+
 class Project(BaseModel):
     """项目模型 - 完整字段版本"""
     __tablename__ = "projects"
@@ -122,6 +131,13 @@ class Project(BaseModel):
     is_active = Column(Boolean, default=True, comment="是否激活")
     is_template = Column(Boolean, default=False, comment="是否为模板项目")
     
+    __table_args__ = (
+        # 游标分页：按 (created_at, id) 倒序翻页
+        Index('idx_projects_tenant_created_id', 'tenant_id', 'created_at', 'id'),
+        # 按状态筛选的项目列表
+        Index('idx_projects_tenant_status_created', 'tenant_id', 'status', 'created_at'),
+    )
+    
     # ==================== 关联关系 ====================
     tenant = relationship("Tenant", back_populates="projects")
     created_by_user = relationship("User", back_populates="created_projects", foreign_keys=[created_by])
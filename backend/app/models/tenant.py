@@ -6,6 +6,9 @@ from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
+# 删除任务执行中的租户状态：拒绝该租户用户的所有请求（见 services/cascade_delete.py）
+TENANT_DELETING = "deleting"
+
 class Tenant(BaseModel):
     """租户模型"""
     __tablename__ = "tenants"
@@ -1,7 +1,7 @@
 """
 交易记录数据模型
 """
-from sqlalchemy import Column, String, Text, Date, DECIMAL, UUID, ForeignKey, UniqueConstraint, Enum, DateTime
+from sqlalchemy import Column, String, Text, Date, DECIMAL, UUID, ForeignKey, UniqueConstraint, Enum, DateTime, Index, Integer, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -43,11 +43,13 @@ class Transaction(BaseModel):
     project_id = Column(UUID(as_uuid=True), ForeignKey('projects.id'), comment="关联项目ID")
     supplier_id = Column(UUID(as_uuid=True), ForeignKey('suppliers.id'), comment="关联供应商ID")
     category_id = Column(UUID(as_uuid=True), ForeignKey('categories.id'), comment="分类ID")
-    transaction_date = Column(Date, nullable=False, comment="交易日期")
+    # 按交易日期按月分区，分区表的主键必须包含分区键
+    transaction_date = Column(Date, primary_key=True, nullable=False, comment="交易日期")
     type = Column(String(10), nullable=False, comment="交易类型: income/expense")
     amount = Column(DECIMAL(15, 2), nullable=False, comment="交易金额")
     currency = Column(String(10), default='CNY', comment="货币类型")
     exchange_rate = Column(DECIMAL(10, 6), default=1.000000, comment="汇率")
+    amount_base = Column(DECIMAL(15, 2), nullable=False, comment="本位币金额（写入时按汇率换算，统计汇总使用）")
     description = Column(Text, comment="交易描述")
     notes = Column(Text, comment="备注")
     tags = Column(JSONB, comment="标签")
@@ -61,6 +63,33 @@ class Transaction(BaseModel):
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
     
+    __table_args__ = (
+        # 游标分页：按 (transaction_date, id) 倒序翻页
+        Index('idx_transactions_tenant_date_id', 'tenant_id', 'transaction_date', 'id'),
+        # 统计明细聚合（transaction_rollup._raw_ledger）的覆盖索引，可走仅索引扫描
+        Index(
+            'idx_transactions_tenant_date_cover', 'tenant_id', 'transaction_date',
+            postgresql_include=[
+                'type', 'status', 'amount_base', 'project_id', 'category_id', 'supplier_id', 'payment_method'
+            ]
+        ),
+        # 待审批列表和计数
+        Index(
+            'idx_transactions_tenant_pending', 'tenant_id', 'transaction_date',
+            postgresql_where=text("status = 'pending'")
+        ),
+        Index(
+            'idx_transactions_tenant_supplier', 'tenant_id', 'supplier_id', 'transaction_date',
+            postgresql_where=text("supplier_id IS NOT NULL")
+        ),
+        Index('idx_transactions_tenant_category', 'tenant_id', 'category_id', 'transaction_date'),
+        Index('idx_transactions_tenant_project', 'tenant_id', 'project_id', 'transaction_date'),
+        # 删除项目时的外键检查（tenant_id 单列索引由上面各复合索引的前缀列覆盖）
+        Index('idx_transactions_project_id', 'project_id'),
+        # 分区由迁移中的 create_transaction_partition / ensure_transaction_partitions 维护
+        {'postgresql_partition_by': 'RANGE (transaction_date)'},
+    )
+    
     # 关系
     tenant = relationship("Tenant", back_populates="transactions")
     project = relationship("Project", back_populates="transactions")
@@ -71,6 +100,24 @@ class Transaction(BaseModel):
     def __repr__(self):
         return f"<Transaction(type='{self.type}', amount={self.amount}, date='{self.transaction_date}')>"
 
+class ExchangeRate(BaseModel):
+    """汇率模型：外币折算为本位币的汇率，自生效日期起适用"""
+    __tablename__ = "exchange_rates"
+    
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False, comment="租户ID")
+    currency = Column(String(10), nullable=False, comment="货币类型")
+    rate = Column(DECIMAL(10, 6), nullable=False, comment="汇率（1单位外币折合本位币）")
+    effective_date = Column(Date, nullable=False, comment="生效日期")
+    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), comment="创建人")
+    
+    __table_args__ = (
+        # 唯一约束同时用于按 (货币, 日期) 查找最近生效的汇率
+        UniqueConstraint('tenant_id', 'currency', 'effective_date', name='uq_exchange_rate_currency_date'),
+    )
+    
+    def __repr__(self):
+        return f"<ExchangeRate(currency='{self.currency}', rate={self.rate}, date='{self.effective_date}')>"
+
 class Supplier(BaseModel):
     """供应商模型"""
     __tablename__ = "suppliers"
@@ -89,9 +136,45 @@ class Supplier(BaseModel):
     is_active = Column(String(1), default='1', comment="是否激活")
     notes = Column(Text, comment="备注")
     
+    __table_args__ = (
+        # 游标分页：按 (created_at, id) 翻页
+        Index('idx_suppliers_tenant_created_id', 'tenant_id', 'created_at', 'id'),
+    )
+    
     # 关系
     tenant = relationship("Tenant", back_populates="suppliers")
     transactions = relationship("Transaction", back_populates="supplier")
     
     def __repr__(self):
         return f"<Supplier(id={self.id}, name='{self.name}', tenant_id={self.tenant_id})>"
+
+class TransactionMonthlyRollup(BaseModel):
+    """
+    交易月度汇总模型
+
+    按 (租户, 月份, 类型, 状态, 分类, 项目, 供应商, 支付方式) 累计笔数和金额，
+    随交易的增删改在同一事务中增量维护。维度为空时存储占位值（全零UUID/空字符串），
+    以便唯一约束可用于 ON CONFLICT 累加。
+    """
+    __tablename__ = "transaction_monthly_rollups"
+    
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False, comment="租户ID")
+    month = Column(Date, nullable=False, comment="月份（当月1日）")
+    type = Column(String(10), nullable=False, comment="交易类型: income/expense")
+    status = Column(String(20), nullable=False, comment="交易状态")
+    category_id = Column(UUID(as_uuid=True), nullable=False, comment="分类ID（无分类为全零UUID）")
+    project_id = Column(UUID(as_uuid=True), nullable=False, comment="项目ID（无项目为全零UUID）")
+    supplier_id = Column(UUID(as_uuid=True), nullable=False, comment="供应商ID（无供应商为全零UUID）")
+    payment_method = Column(String(50), nullable=False, comment="支付方式（未填写为空字符串）")
+    transaction_count = Column(Integer, nullable=False, default=0, comment="交易笔数")
+    total_amount = Column(DECIMAL(18, 2), nullable=False, default=0, comment="交易金额合计（本位币）")
+    
+    __table_args__ = (
+        UniqueConstraint(
+            'tenant_id', 'month', 'type', 'status', 'category_id', 'project_id', 'supplier_id', 'payment_method',
+            name='uq_transaction_monthly_rollup_key'
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<TransactionMonthlyRollup(month='{self.month}', type='{self.type}', amount={self.total_amount})>"
@@ -220,6 +220,38 @@ class ChangeLogResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# 项目复制
+class ProjectCloneTarget(BaseModel):
+    """复制出的新项目"""
+    name: str = Field(..., min_length=2, max_length=100, description="项目名称")
+    project_code: str = Field(..., min_length=2, max_length=50, description="项目代码")
+    start_date: Optional[date] = Field(None, description="开始日期（默认取源项目）")
+    end_date: Optional[date] = Field(None, description="计划结束日期（默认取源项目）")
+
+class ProjectCloneRequest(BaseModel):
+    """从一个项目复制一个或多个新项目"""
+    targets: List[ProjectCloneTarget] = Field(..., min_length=1, max_length=200, description="新项目列表")
+
+class ProjectBulkCloneItem(ProjectCloneTarget):
+    """批量复制的一项"""
+    source_project_id: str = Field(..., description="源项目ID")
+
+class ProjectBulkCloneRequest(BaseModel):
+    """从多个项目批量复制"""
+    items: List[ProjectBulkCloneItem] = Field(..., min_length=1, max_length=200, description="复制列表")
+
+class ProjectCloneItemResult(BaseModel):
+    """单个新项目"""
+    source_project_id: str = Field(..., description="源项目ID")
+    id: str = Field(..., description="新项目ID")
+    name: str = Field(..., description="项目名称")
+    project_code: str = Field(..., description="项目代码")
+
+class ProjectCloneResult(BaseModel):
+    """复制结果"""
+    cloned_count: int = Field(..., description="复制的项目数")
+    projects: List[ProjectCloneItemResult] = Field(..., description="新项目列表")
+
 # 项目查询参数
 class ProjectQueryParams(BaseModel):
     """项目查询参数"""
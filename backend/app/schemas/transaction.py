@@ -1,7 +1,7 @@
 """
 财务记录相关数据模式
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List, Dict, Any
 from datetime import date, datetime
 from decimal import Decimal
@@ -94,6 +94,7 @@ class TransactionResponse(BaseModel):
     amount: Decimal
     currency: str
     exchange_rate: Decimal
+    amount_base: Optional[Decimal] = None
     description: str
     notes: Optional[str] = None
     tags: Optional[List[str]] = None
@@ -211,6 +212,21 @@ class CategoryResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# 汇率
+class ExchangeRateUpsert(BaseModel):
+    """汇率设置请求（同一货币同一生效日期重复设置时覆盖）"""
+    currency: str = Field(..., min_length=1, max_length=10, description="货币类型")
+    rate: Decimal = Field(..., gt=0, description="汇率（1单位外币折合本位币）")
+    effective_date: date = Field(..., description="生效日期")
+
+class ExchangeRateResponse(BaseModel):
+    """汇率响应"""
+    id: str
+    currency: str
+    rate: Decimal
+    effective_date: date
+    created_at: Optional[datetime] = None
+
 # 批量导入
 class TransactionImport(BaseModel):
     """财务记录批量导入"""
@@ -225,3 +241,61 @@ class ImportResult(BaseModel):
     total_count: int = Field(..., description="总数量")
     failed_records: List[Dict[str, Any]] = Field(..., description="失败记录详情")
     success_ids: List[str] = Field(..., description="成功导入的ID列表")
+
+# 批量操作
+class BatchActionEnum(str, Enum):
+    """批量操作类型"""
+    APPROVE = "approve"       # 批量审批通过
+    REJECT = "reject"         # 批量拒绝
+    DELETE = "delete"         # 批量删除
+    UPDATE = "update"         # 批量修改字段
+
+class TransactionBatchFilter(BaseModel):
+    """批量操作的筛选条件（与ID列表二选一）"""
+    project_id: Optional[str] = Field(None, description="项目ID")
+    category_id: Optional[str] = Field(None, description="分类ID")
+    supplier_id: Optional[str] = Field(None, description="供应商ID")
+    type: Optional[TransactionTypeEnum] = Field(None, description="交易类型")
+    status: Optional[str] = Field(None, description="交易状态")
+    date_from: Optional[date] = Field(None, description="交易日期范围-起始")
+    date_to: Optional[date] = Field(None, description="交易日期范围-结束")
+
+class TransactionBatchUpdate(BaseModel):
+    """批量修改的字段（只修改显式提供的字段）"""
+    project_id: Optional[str] = Field(None, description="项目ID")
+    category_id: Optional[str] = Field(None, description="分类ID")
+    supplier_id: Optional[str] = Field(None, description="供应商ID")
+    payment_method: Optional[PaymentMethodEnum] = Field(None, description="支付方式")
+    transaction_date: Optional[date] = Field(None, description="交易日期")
+    status: Optional[TransactionStatusEnum] = Field(None, description="状态")
+    tags: Optional[List[str]] = Field(None, description="标签")
+
+class TransactionBatchOperation(BaseModel):
+    """财务记录批量操作请求"""
+    action: BatchActionEnum = Field(..., description="操作类型: approve/reject/delete/update")
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=5000, description="财务记录ID列表")
+    filter: Optional[TransactionBatchFilter] = Field(None, description="筛选条件")
+    approval_note: Optional[str] = Field(None, max_length=500, description="审批备注（approve/reject）")
+    updates: Optional[TransactionBatchUpdate] = Field(None, description="修改字段（update）")
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("ids 和 filter 必须且只能提供一个")
+        if self.action == BatchActionEnum.UPDATE and not (self.updates and self.updates.model_dump(exclude_unset=True)):
+            raise ValueError("update 操作必须提供 updates")
+        return self
+
+class TransactionBatchItemResult(BaseModel):
+    """单条记录的批量操作结果"""
+    id: str = Field(..., description="财务记录ID")
+    success: bool = Field(..., description="是否成功")
+    error: Optional[str] = Field(None, description="失败原因")
+
+class TransactionBatchResult(BaseModel):
+    """批量操作结果"""
+    action: BatchActionEnum = Field(..., description="操作类型")
+    matched_count: int = Field(..., description="匹配的记录数")
+    success_count: int = Field(..., description="成功数量")
+    failed_count: int = Field(..., description="失败数量")
+    results: List[TransactionBatchItemResult] = Field(..., description="逐条结果")
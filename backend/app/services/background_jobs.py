@@ -0,0 +1,126 @@
+"""
+后台任务队列
+
+统计后台任务（statistics_jobs.py）和级联删除任务（cascade_delete.py）共用的任务存储：
+backend=celery 时投递到 CELERY_BROKER_URL，由 worker（celery -A app.worker worker）执行，
+任务状态、进度和结果保存在 CELERY_RESULT_BACKEND；local 时在API进程内以后台协程执行，
+任务状态保存在进程内，用于开发环境或没有部署worker的单进程部署。
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# 任务状态
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# worker 执行中通过 task.update_state(state=PROGRESS_STATE, meta=...) 上报进度
+PROGRESS_STATE = "PROGRESS"
+
+class LocalJobStore:
+    """进程内任务：后台协程执行，状态保存在进程内，结束超过保留时间后清理"""
+
+    def __init__(self, result_ttl: Callable[[], int]):
+        self._result_ttl = result_ttl
+        self._jobs: Dict[str, dict] = {}
+        self._tasks = set()
+
+    def _prune(self):
+        expires_before = time.monotonic() - self._result_ttl()
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job["_finished"] is not None and job["_finished"] < expires_before
+        ]:
+            del self._jobs[job_id]
+
+    async def submit(self, job_id: str, fields: Dict[str, Any], run: Callable[[dict], Awaitable[Any]]):
+        """
+        提交任务：fields 为随状态返回的任务属性，run(job) 的返回值作为任务结果
+
+        run 执行期间可写入 job["progress"] 上报进度
+        """
+        self._prune()
+        job = {**fields, "status": PENDING, "progress": None, "result": None, "error": None, "_finished": None}
+        self._jobs[job_id] = job
+
+        async def execute():
+            job["status"] = RUNNING
+            try:
+                job["result"] = await run(job)
+                job["status"] = SUCCEEDED
+            except Exception as e:
+                logger.exception(f"后台任务 {job_id} 执行失败")
+                job["status"], job["error"] = FAILED, str(e)
+            finally:
+                job["_finished"] = time.monotonic()
+
+        task = asyncio.create_task(execute())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def status(self, job_id: str) -> Optional[dict]:
+        """任务属性和 status/progress/result/error；任务不存在时返回None"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return {key: value for key, value in job.items() if not key.startswith("_")}
+
+class CeleryJobStore:
+    """Celery任务：投递到Broker，状态、进度和结果从结果后端读取"""
+
+    STATES = {"PENDING": PENDING, "RECEIVED": PENDING, "STARTED": RUNNING, "RETRY": RUNNING,
+              PROGRESS_STATE: RUNNING, "SUCCESS": SUCCEEDED, "FAILURE": FAILED, "REVOKED": FAILED}
+
+    def __init__(self, task_name: str):
+        self.task_name = task_name
+
+    async def submit(self, job_id: str, args: list):
+        from ..worker import celery_app
+
+        await run_in_threadpool(celery_app.send_task, self.task_name, args=args, task_id=job_id)
+
+    async def status(self, job_id: str) -> dict:
+        """
+        返回 {"status", "meta", "error"}：meta 为 worker 上报的进度或任务返回值（字典时）
+
+        结果后端对未知任务同样返回 PENDING，因此总是返回状态
+        """
+        from ..worker import celery_app
+
+        def read():
+            async_result = celery_app.AsyncResult(job_id)
+            return async_result.state, async_result.info
+
+        state, payload = await run_in_threadpool(read)
+        status = self.STATES.get(state, RUNNING)
+        meta = payload if isinstance(payload, dict) else {}
+        error = str(payload) if status == FAILED and not isinstance(payload, dict) else None
+        return {"status": status, "meta": meta, "error": error}
+
+class JobQueue:
+    """按配置选择任务存储（配置以函数给出，运行时读取）"""
+
+    def __init__(self, task_name: str, backend: Callable[[], str], result_ttl: Callable[[], int]):
+        self.task_name = task_name
+        self._backend = backend
+        self._result_ttl = result_ttl
+        self._stores = {}
+
+    @property
+    def uses_celery(self) -> bool:
+        return self._backend() == "celery"
+
+    def store(self):
+        backend = self._backend()
+        if backend not in self._stores:
+            self._stores[backend] = (
+                CeleryJobStore(self.task_name) if backend == "celery" else LocalJobStore(self._result_ttl)
+            )
+        return self._stores[backend]
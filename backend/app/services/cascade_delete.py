@@ -0,0 +1,227 @@
+"""
+级联删除后台任务
+
+删除项目或租户时不再把所有子记录加载到会话中由ORM级联删除，而是提交后台任务按表分批执行
+DELETE ... WHERE id IN (一批ID)，每批一个事务，持锁时间和内存占用与批大小相关而不是与子记录数相关。
+任务进度（各表已删除行数/删除前行数）可通过任务状态接口查询。
+
+删除项目时，交易记录按批同步扣减月度汇总、使每日快照失效；删除租户时这些派生数据整体删除。
+每批提交后递增租户数据版本号，删除过程中读取的统计缓存和ETag随之失效。
+
+提交删除任务前项目（租户）状态置为 deleting，写接口拒绝该项目（认证拒绝该租户的所有请求）；
+删除项目（租户）本身的最后一批在同一事务中锁定该行，并清理此前仍在进行的写请求留下的子表记录。
+
+任务按 DELETE_JOBS_BACKEND 投递到 Celery worker（进度写入结果后端）或在API进程内执行（见 background_jobs.py）。
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from dataclasses import dataclass, field
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..core.data_version import data_version
+from . import transaction_rollup, daily_snapshots
+from .background_jobs import JobQueue
+
+CELERY_TASK_NAME = "maintenance.cascade_delete"
+
+job_queue = JobQueue(
+    CELERY_TASK_NAME,
+    backend=lambda: settings.DELETE_JOBS_BACKEND,
+    result_ttl=lambda: settings.DELETE_JOB_RESULT_TTL
+)
+
+# 删除目标类型
+PROJECT = "project"
+TENANT = "tenant"
+
+@dataclass
+class DeleteStep:
+    """一张表的删除步骤：condition 为该表待删除行的条件"""
+    table: str
+    condition: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    # 交易记录：删除前扣减月度汇总并使每日快照失效
+    maintain_ledger: bool = False
+    # 删除前执行的语句（如解除自引用外键）
+    prepare: Optional[str] = None
+    # 删除本表行之前在同一事务中清理的子表残留行（删除过程中并发写入的记录）
+    sweep: List["DeleteStep"] = field(default_factory=list)
+
+def project_plan(tenant_id, project_id) -> List[DeleteStep]:
+    """删除项目：交易记录、变更记录，最后删除项目本身"""
+    params = {"tenant_id": tenant_id, "project_id": project_id}
+    transactions = DeleteStep(
+        "transactions", "tenant_id = :tenant_id AND project_id = :project_id", params, maintain_ledger=True
+    )
+    change_logs = DeleteStep("project_change_logs", "tenant_id = :tenant_id AND project_id = :project_id", params)
+    return [
+        transactions,
+        change_logs,
+        DeleteStep("projects", "tenant_id = :tenant_id AND id = :project_id", params, sweep=[transactions, change_logs]),
+    ]
+
+def tenant_plan(tenant_id) -> List[DeleteStep]:
+    """删除租户：按外键依赖顺序删除租户下所有数据，最后删除租户本身"""
+    params = {"tenant_id": tenant_id}
+    steps = [
+        DeleteStep(table, "tenant_id = :tenant_id", params)
+        for table in (
+            "transactions", "transaction_monthly_rollups", "system_statistics", "exchange_rates",
+            "project_change_logs", "projects", "suppliers",
+        )
+    ]
+    steps.append(DeleteStep(
+        "categories", "tenant_id = :tenant_id", params,
+        prepare="UPDATE categories SET parent_id = NULL WHERE tenant_id = :tenant_id AND parent_id IS NOT NULL"
+    ))
+    steps.extend(
+        DeleteStep(table, "tenant_id = :tenant_id", params)
+        for table in ("monitoring_data", "tenant_activity", "users")
+    )
+    # 租户行锁定后，引用它的新记录无法再写入，在同一事务中清理此前各步骤之后写入的残留行
+    steps.append(DeleteStep("tenants", "id = :tenant_id", params, sweep=list(steps)))
+    return steps
+
+PLANS = {PROJECT: project_plan, TENANT: lambda tenant_id, target_id: tenant_plan(target_id)}
+
+async def count_rows(db: AsyncSession, steps: List[DeleteStep]) -> Dict[str, int]:
+    """各步骤删除前的行数（用于进度）"""
+    counts = {}
+    for step in steps:
+        result = await db.execute(text(f"SELECT count(*) FROM {step.table} WHERE {step.condition}"), step.params)
+        counts[step.table] = int(result.scalar() or 0)
+    return counts
+
+async def delete_batch(db: AsyncSession, step: DeleteStep, batch_size: int) -> Dict[str, int]:
+    """
+    删除一批（不提交事务），返回各表删除行数；本表没有待删除行时返回空字典
+
+    先锁定本批行：与修改同一行的写请求串行执行，已被并发删除的行不会重复扣减汇总
+    """
+    result = await db.execute(
+        text(f"SELECT id FROM {step.table} WHERE {step.condition} LIMIT :batch_size FOR UPDATE"),
+        {**step.params, "batch_size": batch_size}
+    )
+    ids = list(result.scalars().all())
+    if not ids:
+        return {}
+
+    deleted = {}
+    # 本表行已锁定，引用它的新记录无法再写入，此时清理子表残留行
+    for child in step.sweep:
+        if child.prepare:
+            await db.execute(text(child.prepare), child.params)
+        while True:
+            counts = await delete_batch(db, child, batch_size)
+            if not counts:
+                break
+            for table, count in counts.items():
+                deleted[table] = deleted.get(table, 0) + count
+
+    if step.maintain_ledger:
+        await transaction_rollup.accumulate_transactions(db, ids, -1)
+        await daily_snapshots.invalidate_transactions(db, ids)
+    await db.execute(
+        text(f"DELETE FROM {step.table} WHERE {step.condition} AND id = ANY(:ids)"),
+        {**step.params, "ids": ids}
+    )
+    deleted[step.table] = deleted.get(step.table, 0) + len(ids)
+    return deleted
+
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+async def run_delete(
+    session_factory,
+    target_type: str,
+    tenant_id,
+    target_id,
+    progress: ProgressCallback,
+    batch_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    按计划分批删除，每批提交一次、递增租户数据版本号并回调进度，返回最终进度
+
+    进度: {"current_table", "deleted", "total", "tables": {表: {"deleted", "total"}}}
+    """
+    batch_size = batch_size or settings.CASCADE_DELETE_BATCH_SIZE
+    steps = PLANS[target_type](tenant_id, target_id)
+
+    async with session_factory() as session:
+        totals = await count_rows(session, steps)
+    state = {
+        "current_table": None,
+        "deleted": 0,
+        "total": sum(totals.values()),
+        "tables": {table: {"deleted": 0, "total": total} for table, total in totals.items()},
+    }
+    await progress(state)
+
+    try:
+        for step in steps:
+            state["current_table"] = step.table
+            if step.prepare:
+                async with session_factory() as session:
+                    await session.execute(text(step.prepare), step.params)
+                    await session.commit()
+            while True:
+                async with session_factory() as session:
+                    deleted = await delete_batch(session, step, batch_size)
+                    await session.commit()
+                if not deleted:
+                    break
+                await data_version.bump(tenant_id)
+                for table, count in deleted.items():
+                    state["deleted"] += count
+                    state["tables"][table]["deleted"] += count
+                await progress(state)
+    finally:
+        # 任务结束（包括失败）时再递增一次，覆盖版本号递增后才提交完成的并发读取
+        await data_version.bump(tenant_id)
+
+    state["current_table"] = None
+    await progress(state)
+    return state
+
+async def submit(target_type: str, tenant_id, target_id) -> str:
+    """提交删除任务，返回任务ID"""
+    from ..core.database import db_manager
+
+    job_id = str(uuid.uuid4())
+    store = job_queue.store()
+    if job_queue.uses_celery:
+        await store.submit(job_id, [target_type, str(tenant_id), str(target_id)])
+    else:
+        async def run(job):
+            async def report(state):
+                job["progress"] = dict(state)
+
+            return await run_delete(db_manager.session_maker, target_type, tenant_id, target_id, report)
+
+        await store.submit(
+            job_id, {"target_type": target_type, "target_id": str(target_id), "tenant_id": str(tenant_id)}, run
+        )
+    return job_id
+
+async def get_status(job_id: str, tenant_id=None) -> Optional[dict]:
+    """
+    查询删除任务状态；指定 tenant_id 时任务不存在或属于其他租户返回None
+
+    Celery 结果后端对未知任务同样返回 PENDING，任务开始前无法校验租户，此时只返回状态
+    """
+    job = await job_queue.store().status(job_id)
+    if job is None:
+        return None
+    if job_queue.uses_celery:
+        # worker 上报的进度和任务返回值均为 {"target_type", "target_id", "tenant_id", "progress"}
+        meta = job["meta"]
+        job = {"target_type": meta.get("target_type"), "target_id": meta.get("target_id"),
+               "tenant_id": meta.get("tenant_id"), "status": job["status"],
+               "progress": meta.get("progress"), "error": job["error"]}
+    else:
+        job = {key: value for key, value in job.items() if key != "result"}
+    if tenant_id is not None and job["tenant_id"] is not None and job["tenant_id"] != str(tenant_id):
+        return None
+    return {"job_id": job_id, **job}
@@ -0,0 +1,159 @@
+"""
+财务图表统计
+
+GET /transactions/statistics/charts 的计算逻辑，所有图表均从月度汇总（ledger_source）聚合。
+接口同步调用；跨度较大的请求也可以由后台任务（见 statistics_jobs.py）在API进程外执行。
+"""
+from typing import Optional
+from datetime import date
+
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.project import Project
+from ..models.transaction import Category, Supplier
+from . import transaction_rollup, time_series
+
+async def compute_chart_statistics(
+    db: AsyncSession,
+    tenant_id,
+    period: str = "month",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> dict:
+    """计算收支对比、分类分布、趋势、供应商排行、项目分析和支付方式分析"""
+    # 所有图表均从月度汇总聚合
+    ledger = transaction_rollup.ledger_source(
+        tenant_id, date_from=date_from, date_to=date_to
+    )
+    income_amount = func.sum(case((ledger.c.type == 'income', ledger.c.total_amount), else_=0))
+    expense_amount = func.sum(case((ledger.c.type == 'expense', ledger.c.total_amount), else_=0))
+    
+    # 1. 收支对比数据
+    income_expense_query = await db.execute(
+        select(
+            income_amount.label('total_income'),
+            expense_amount.label('total_expense')
+        )
+    )
+    income_expense_data = income_expense_query.first()
+    
+    # 2. 支出分类分布
+    category_distribution_query = await db.execute(
+        select(
+            Category.name,
+            func.sum(ledger.c.total_amount).label('total_amount')
+        ).select_from(
+            ledger.join(Category.__table__, ledger.c.category_id == Category.id)
+        ).where(ledger.c.type == 'expense')
+        .group_by(Category.name)
+        .having(func.sum(ledger.c.transaction_count) > 0)
+        .order_by(func.sum(ledger.c.total_amount).desc())
+    )
+    
+    category_distribution = []
+    for row in category_distribution_query.all():
+        category_distribution.append({
+            'name': row.name,
+            'value': float(row.total_amount or 0)
+        })
+    
+    # 3. 趋势数据：按月聚合一次，补齐缺失月份后重采样为月/季/年（最近12个月、4个季度、5年）
+    trend_query = await db.execute(
+        select(
+            ledger.c.month,
+            income_amount.label('income'),
+            expense_amount.label('expense')
+        ).group_by(ledger.c.month)
+    )
+    monthly_trend = time_series.build_trend(
+        trend_query.all(), ['income', 'expense'], period if period in time_series.PERIODS else "year",
+        end=date_to, net=('income', 'expense')
+    )
+    
+    # 4. 供应商交易排行
+    supplier_ranking_query = await db.execute(
+        select(
+            Supplier.name,
+            func.sum(ledger.c.total_amount).label('total_amount'),
+            func.sum(ledger.c.transaction_count).label('transaction_count')
+        ).select_from(
+            ledger.join(Supplier.__table__, ledger.c.supplier_id == Supplier.id)
+        )
+        .group_by(Supplier.name)
+        .having(func.sum(ledger.c.transaction_count) > 0)
+        .order_by(func.sum(ledger.c.total_amount).desc())
+        .limit(10)
+    )
+    
+    supplier_ranking = []
+    for row in supplier_ranking_query.all():
+        supplier_ranking.append({
+            'name': row.name,
+            'value': float(row.total_amount or 0),
+            'count': int(row.transaction_count)
+        })
+    
+    # 5. 项目财务分析
+    project_analysis_query = await db.execute(
+        select(
+            Project.name,
+            Project.budget,
+            Project.contract_value,
+            expense_amount.label('actual_expense')
+        ).select_from(
+            Project.__table__.join(ledger, Project.id == ledger.c.project_id)
+        ).where(Project.tenant_id == tenant_id)
+        .group_by(Project.id, Project.name, Project.budget, Project.contract_value)
+        .having(func.sum(ledger.c.transaction_count) > 0)
+        .order_by(expense_amount.desc())
+        .limit(10)
+    )
+    
+    project_analysis = []
+    for row in project_analysis_query.all():
+        budget = float(row.budget or 0)
+        actual_expense = float(row.actual_expense or 0)
+        profit = budget - actual_expense
+        
+        project_analysis.append({
+            'name': row.name,
+            'budget': budget,
+            'actual_expense': actual_expense,
+            'profit': profit
+        })
+    
+    # 6. 支付方式分析
+    payment_method_query = await db.execute(
+        select(
+            ledger.c.payment_method,
+            func.sum(ledger.c.total_amount).label('total_amount'),
+            func.sum(ledger.c.transaction_count).label('count')
+        ).group_by(ledger.c.payment_method)
+        .having(func.sum(ledger.c.transaction_count) > 0)
+        .order_by(func.sum(ledger.c.total_amount).desc())
+    )
+    
+    payment_method_analysis = []
+    for row in payment_method_query.all():
+        payment_method_analysis.append({
+            'name': row.payment_method or '其他',
+            'value': float(row.total_amount or 0),
+            'count': int(row.count)
+        })
+    
+    # 构建响应数据
+    response_data = {
+        "income_expense": {
+            "income": float(income_expense_data.total_income or 0),
+            "expense": float(income_expense_data.total_expense or 0),
+            "net": float((income_expense_data.total_income or 0) - (income_expense_data.total_expense or 0))
+        },
+        "category_distribution": category_distribution,
+        "monthly_trend": monthly_trend,
+        "supplier_ranking": supplier_ranking,
+        "project_analysis": project_analysis,
+        "payment_method_analysis": payment_method_analysis
+    }
+    
+    return response_data
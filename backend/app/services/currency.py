@@ -0,0 +1,101 @@
+"""
+多币种换算服务
+
+交易写入时确定所用汇率并计算本位币金额（amount_base）存入记录，统计汇总直接累加本位币金额，
+查询时不再逐行换算。汇率优先级：本位币为1；请求中显式给出的汇率；汇率表中交易日期当天
+或之前最近生效的汇率。汇率表变更只影响之后写入的记录，已有记录保留写入时的汇率。
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+import bisect
+
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.transaction import ExchangeRate
+
+ONE = Decimal("1")
+CENT = Decimal("0.01")
+
+class MissingExchangeRateError(ValueError):
+    """外币记录既没有给出汇率，汇率表中也没有生效的汇率"""
+
+def is_base_currency(currency: Optional[str]) -> bool:
+    return not currency or currency.upper() == settings.BASE_CURRENCY
+
+def base_amount(amount, rate) -> Decimal:
+    """按汇率换算为本位币金额，保留两位小数"""
+    return (Decimal(str(amount)) * Decimal(str(rate))).quantize(CENT, rounding=ROUND_HALF_UP)
+
+class RateTable:
+    """租户汇率表的内存副本，供批量导入逐行查找"""
+
+    def __init__(self, rows: Iterable[Tuple[str, date, Decimal]]):
+        self._dates: Dict[str, List[date]] = {}
+        self._rates: Dict[str, List[Decimal]] = {}
+        for currency, effective_date, rate in sorted(rows, key=lambda row: (row[0], row[1])):
+            self._dates.setdefault(currency.upper(), []).append(effective_date)
+            self._rates.setdefault(currency.upper(), []).append(rate)
+
+    def rate_for(self, currency: str, on_date: date) -> Optional[Decimal]:
+        """交易日期当天或之前最近生效的汇率"""
+        dates = self._dates.get(currency.upper())
+        if not dates:
+            return None
+        index = bisect.bisect_right(dates, on_date) - 1
+        return self._rates[currency.upper()][index] if index >= 0 else None
+
+    def resolve(self, currency: str, on_date: date, explicit_rate: Optional[Decimal] = None) -> Decimal:
+        if is_base_currency(currency):
+            return ONE
+        if explicit_rate:
+            return Decimal(str(explicit_rate))
+        rate = self.rate_for(currency, on_date)
+        if rate is None:
+            raise MissingExchangeRateError(f"缺少 {currency} 在 {on_date} 的汇率，请填写汇率或先维护汇率表")
+        return rate
+
+async def load_rate_table(db: AsyncSession, tenant_id) -> RateTable:
+    """一次加载租户的全部汇率"""
+    result = await db.execute(
+        select(ExchangeRate.currency, ExchangeRate.effective_date, ExchangeRate.rate)
+        .where(ExchangeRate.tenant_id == tenant_id)
+    )
+    return RateTable(result.all())
+
+async def resolve_rate(
+    db: AsyncSession,
+    tenant_id,
+    currency: str,
+    on_date: date,
+    explicit_rate: Optional[Decimal] = None
+) -> Decimal:
+    """确定单条记录使用的汇率"""
+    if is_base_currency(currency):
+        return ONE
+    if explicit_rate:
+        return Decimal(str(explicit_rate))
+    result = await db.execute(
+        select(ExchangeRate.rate)
+        .where(and_(
+            ExchangeRate.tenant_id == tenant_id,
+            ExchangeRate.currency == currency.upper(),
+            ExchangeRate.effective_date <= on_date
+        ))
+        .order_by(ExchangeRate.effective_date.desc())
+        .limit(1)
+    )
+    rate = result.scalar_one_or_none()
+    if rate is None:
+        raise MissingExchangeRateError(f"缺少 {currency} 在 {on_date} 的汇率，请填写汇率或先维护汇率表")
+    return rate
+
+async def apply_base_amount(db: AsyncSession, transaction, explicit_rate: Optional[Decimal] = None):
+    """为记录确定汇率并写入本位币金额"""
+    rate = await resolve_rate(
+        db, transaction.tenant_id, transaction.currency, transaction.transaction_date, explicit_rate
+    )
+    transaction.exchange_rate = rate
+    transaction.amount_base = base_amount(transaction.amount, rate)
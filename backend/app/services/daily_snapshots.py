@@ -0,0 +1,234 @@
+"""
+租户每日财务快照
+
+每天定时把各租户前一天的收入、支出、待审批、各项目支出、各供应商金额批量写入 system_statistics
+（stat_type = tenant_daily_finance，一个租户一天一行）。每日趋势接口对已结束的日期直接读快照，
+只有今天（以及快照缺失的日期）从明细实时计算，查询量与日期窗口大小相关而不是与交易行数相关。
+
+交易写入时调用 invalidate_* 删除受影响日期的快照（与写入在同一事务中），
+这些日期在下次快照任务补齐之前按缺失处理、实时计算。
+
+快照与写入按 (租户, 日期) 的事务级咨询锁互斥：写入方删除快照时持有共享锁直到提交，
+快照任务只为能取得排他锁的日期计算和写入（取不到的日期正在写入，留待下次补齐），
+避免快照读到写入前的数据、又在写入方删除之后才提交，留下永久过期的快照。
+"""
+from typing import Dict, Iterable, List, Optional
+from datetime import date, timedelta
+import json
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+STAT_TYPE = "tenant_daily_finance"
+
+# 按 (租户, 日期) 聚合明细的SQL，{days_source} 为待计算的 (tenant_id, day) 集合
+_DAILY_FIGURES_SQL = """
+WITH wanted AS ({days_source}),
+base AS (
+    SELECT t.tenant_id, t.transaction_date AS day, t.type, t.status, t.project_id, t.supplier_id, t.amount_base
+    FROM transactions AS t
+    JOIN wanted AS w ON t.tenant_id = w.tenant_id AND t.transaction_date = w.day
+),
+totals AS (
+    SELECT tenant_id, day,
+        COALESCE(sum(amount_base) FILTER (WHERE type = 'income'), 0) AS income,
+        COALESCE(sum(amount_base) FILTER (WHERE type = 'expense'), 0) AS expense,
+        count(*) FILTER (WHERE type = 'income') AS income_count,
+        count(*) FILTER (WHERE type = 'expense') AS expense_count,
+        count(*) FILTER (WHERE status = 'pending') AS pending_count,
+        COALESCE(sum(amount_base) FILTER (WHERE status = 'pending'), 0) AS pending_amount
+    FROM base GROUP BY tenant_id, day
+),
+projects AS (
+    SELECT tenant_id, day, jsonb_object_agg(project_id, total) AS projects
+    FROM (SELECT tenant_id, day, project_id, sum(amount_base) AS total FROM base
+          WHERE type = 'expense' AND project_id IS NOT NULL GROUP BY tenant_id, day, project_id) AS p
+    GROUP BY tenant_id, day
+),
+suppliers AS (
+    SELECT tenant_id, day, jsonb_object_agg(supplier_id, total) AS suppliers
+    FROM (SELECT tenant_id, day, supplier_id, sum(amount_base) AS total FROM base
+          WHERE type = 'expense' AND supplier_id IS NOT NULL GROUP BY tenant_id, day, supplier_id) AS s
+    GROUP BY tenant_id, day
+)
+SELECT w.tenant_id, w.day, jsonb_build_object(
+    'income', COALESCE(t.income, 0),
+    'expense', COALESCE(t.expense, 0),
+    'income_count', COALESCE(t.income_count, 0),
+    'expense_count', COALESCE(t.expense_count, 0),
+    'pending_count', COALESCE(t.pending_count, 0),
+    'pending_amount', COALESCE(t.pending_amount, 0),
+    'projects', COALESCE(p.projects, '{{}}'::jsonb),
+    'suppliers', COALESCE(s.suppliers, '{{}}'::jsonb)
+) AS stat_data
+FROM wanted AS w
+LEFT JOIN totals AS t ON t.tenant_id = w.tenant_id AND t.day = w.day
+LEFT JOIN projects AS p ON p.tenant_id = w.tenant_id AND p.day = w.day
+LEFT JOIN suppliers AS s ON s.tenant_id = w.tenant_id AND s.day = w.day
+"""
+
+# (租户, 日期) 的咨询锁键：(hashtext(租户ID), 距 2000-01-01 的天数)
+def _lock_key(tenant_sql: str, day_sql: str) -> str:
+    return f"hashtext(CAST({tenant_sql} AS text)), ({day_sql} - DATE '2000-01-01')"
+
+def _load(stat_data) -> dict:
+    # 未声明列类型的 text() 查询中，asyncpg 返回的 JSONB 为字符串
+    return json.loads(stat_data) if isinstance(stat_data, str) else stat_data
+
+def _days_in(date_from: date, date_to: date) -> List[date]:
+    return [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+
+async def snapshot_days(
+    db: AsyncSession,
+    days: Iterable[date],
+    tenant_id=None,
+    only_missing: bool = True
+) -> int:
+    """
+    批量为所有租户（或指定租户）生成这些日期的快照，返回写入行数（不提交事务）
+
+    only_missing=True 时只补齐缺失或已失效的快照；没有交易的日期同样写入全零快照，避免读取时重复计算。
+    正在写入（持有共享锁）的租户日期跳过；只处理数据库 current_date 之前的日期，与失效一侧使用同一时钟
+    """
+    days = sorted(set(days))
+    if not days:
+        return 0
+
+    params = {"days": days, "stat_type": STAT_TYPE}
+    tenant_filter = ""
+    if tenant_id:
+        tenant_filter = "WHERE tn.id = :tenant_id"
+        params["tenant_id"] = tenant_id
+    missing_filter = ""
+    if only_missing:
+        missing_filter = (
+            "AND NOT EXISTS (SELECT 1 FROM system_statistics AS ss "
+            "WHERE ss.tenant_id = tn.id AND ss.stat_date = d.day AND ss.stat_type = :stat_type)"
+        )
+    candidates = (
+        f"SELECT tn.id AS tenant_id, d.day FROM tenants AS tn "
+        f"CROSS JOIN unnest(CAST(:days AS date[])) AS d(day) "
+        f"{tenant_filter or 'WHERE TRUE'} AND d.day < current_date {missing_filter}"
+    )
+
+    # 先取得排他锁（不等待），之后的语句能看到所有已提交的写入，未提交的写入方仍持有共享锁、不会被选中；
+    # OFFSET 0 阻止子查询上拉，只对筛选后的候选日期加锁
+    locked = await db.execute(
+        text(
+            f"SELECT c.tenant_id, c.day FROM ({candidates} OFFSET 0) AS c "
+            f"WHERE pg_try_advisory_xact_lock({_lock_key('c.tenant_id', 'c.day')})"
+        ),
+        params
+    )
+    locked = locked.all()
+    if not locked:
+        return 0
+    params["tenant_ids"] = [row.tenant_id for row in locked]
+    params["locked_days"] = [row.day for row in locked]
+    days_source = (
+        "SELECT unnest(CAST(:tenant_ids AS uuid[])) AS tenant_id, unnest(CAST(:locked_days AS date[])) AS day"
+    )
+
+    result = await db.execute(
+        text(
+            "INSERT INTO system_statistics (id, tenant_id, stat_date, stat_type, stat_data, created_at, updated_at) "
+            "SELECT gen_random_uuid(), figures.tenant_id, figures.day, :stat_type, figures.stat_data, now(), now() "
+            f"FROM ({_DAILY_FIGURES_SQL.format(days_source=days_source)}) AS figures "
+            "ON CONFLICT (tenant_id, stat_date, stat_type) "
+            "DO UPDATE SET stat_data = EXCLUDED.stat_data, updated_at = now()"
+        ),
+        params
+    )
+    return result.rowcount
+
+async def compute_live(db: AsyncSession, tenant_id, days: Iterable[date]) -> Dict[date, dict]:
+    """从明细实时计算指定日期的数据（与快照结构相同）"""
+    days = sorted(set(days))
+    if not days:
+        return {}
+    days_source = "SELECT CAST(:tenant_id AS uuid) AS tenant_id, d.day FROM unnest(CAST(:days AS date[])) AS d(day)"
+    result = await db.execute(
+        text(_DAILY_FIGURES_SQL.format(days_source=days_source)),
+        {"tenant_id": tenant_id, "days": days}
+    )
+    return {row.day: _load(row.stat_data) for row in result.all()}
+
+async def load_days(db: AsyncSession, tenant_id, date_from: date, date_to: date) -> List[dict]:
+    """
+    按日期读取租户每日数据：今天之前的日期读快照，今天和缺失快照的日期实时计算
+
+    返回按日期升序的列表，每项包含 date、is_live 和快照中的各项数据
+    """
+    today = date.today()
+    snapshots = {}
+    closed_to = min(date_to, today - timedelta(days=1))
+    if date_from <= closed_to:
+        result = await db.execute(
+            text(
+                "SELECT stat_date, stat_data FROM system_statistics "
+                "WHERE tenant_id = :tenant_id AND stat_type = :stat_type "
+                "AND stat_date BETWEEN :date_from AND :date_to"
+            ),
+            {"tenant_id": tenant_id, "stat_type": STAT_TYPE, "date_from": date_from, "date_to": closed_to}
+        )
+        snapshots = {row.stat_date: _load(row.stat_data) for row in result.all()}
+
+    days = _days_in(date_from, date_to)
+    live = await compute_live(db, tenant_id, [day for day in days if day not in snapshots])
+    return [
+        {"date": day, "is_live": day not in snapshots, **(snapshots.get(day) or live.get(day) or {})}
+        for day in days
+    ]
+
+async def invalidate_days(db: AsyncSession, tenant_id, days: Iterable[Optional[date]]):
+    """
+    删除这些日期的快照（交易写入后调用）
+
+    今天的日期同样加锁：写入方在零点之后才提交时，快照任务取不到锁，不会为该日期写入旧数据
+    """
+    days = sorted({day for day in days if day})
+    if not days:
+        return
+    await db.execute(
+        text(
+            f"SELECT pg_advisory_xact_lock_shared({_lock_key('CAST(:tenant_id AS uuid)', 'd.day')}) "
+            f"FROM unnest(CAST(:days AS date[])) AS d(day)"
+        ),
+        {"tenant_id": tenant_id, "days": days}
+    )
+    await db.execute(
+        text(
+            "DELETE FROM system_statistics WHERE tenant_id = :tenant_id AND stat_type = :stat_type "
+            "AND stat_date = ANY(CAST(:days AS date[])) AND stat_date < current_date"
+        ),
+        {"tenant_id": tenant_id, "stat_type": STAT_TYPE, "days": days}
+    )
+
+async def invalidate_from_table(db: AsyncSession, source_table: str, where_clause: str = "", params: dict = None):
+    """删除某张结构与 transactions 相同的表中记录涉及的租户日期快照（批量修改、导入后调用）"""
+    await db.execute(
+        text(
+            f"SELECT pg_advisory_xact_lock_shared({_lock_key('changed.tenant_id', 'changed.transaction_date')}) "
+            f"FROM (SELECT DISTINCT tenant_id, transaction_date FROM {source_table} "
+            f"WHERE TRUE {where_clause}) AS changed"
+        ),
+        params or {}
+    )
+    await db.execute(
+        text(
+            f"DELETE FROM system_statistics AS ss USING ("
+            f"SELECT DISTINCT tenant_id, transaction_date FROM {source_table} WHERE TRUE {where_clause}"
+            f") AS changed "
+            f"WHERE ss.tenant_id = changed.tenant_id AND ss.stat_date = changed.transaction_date "
+            f"AND ss.stat_type = :stat_type AND ss.stat_date < current_date"
+        ),
+        {**(params or {}), "stat_type": STAT_TYPE}
+    )
+
+async def invalidate_transactions(db: AsyncSession, transaction_ids: List[uuid.UUID]):
+    """删除这些记录当前日期的快照"""
+    if transaction_ids:
+        await invalidate_from_table(
+            db, "transactions", "AND id = ANY(:transaction_ids)", {"transaction_ids": list(transaction_ids)}
+        )
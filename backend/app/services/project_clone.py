@@ -0,0 +1,131 @@
+"""
+项目复制
+
+从模板项目（或任意项目）复制新项目：所有目标在一条 INSERT ... SELECT 中由数据库完成，
+技术规格、需求、交付物、付款条件等 JSONB 字段不经过应用层；名称、编号和可选的起止日期由请求指定，
+进度、实际成本、审批和评审等执行状态重置为新项目的初始值。
+"""
+from typing import Dict, List, Optional, Sequence
+from dataclasses import dataclass
+from datetime import date
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.project import Project, PROJECT_DELETING
+from . import project_costs
+
+class ProjectCloneError(ValueError):
+    """复制请求无效（源项目不存在、项目编号重复等）"""
+
+@dataclass
+class CloneTarget:
+    source_id: uuid.UUID
+    name: str
+    project_code: str
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+# 新项目取请求值或初始值的列，其余列从源项目原样复制
+_TARGET_VALUES = {
+    "id": "t.id",
+    "name": "t.name",
+    "project_code": "t.project_code",
+    "start_date": "COALESCE(t.start_date, p.start_date)",
+    "end_date": "COALESCE(t.end_date, p.end_date)",
+    "status": "'planning'",
+    "progress": "0",
+    "health_status": "'healthy'",
+    "actual_start_date": "NULL",
+    "actual_end_date": "NULL",
+    "actual_duration": "NULL",
+    "actual_cost": "0",
+    "cost_variance": "NULL",
+    "budget_utilization": "NULL",
+    "budget_change_reason": "NULL",
+    "contract_change_reason": "NULL",
+    "change_description": "NULL",
+    "contract_number": "NULL",
+    "approval_status": "'pending'",
+    "approval_history": "NULL",
+    "last_review_date": "NULL",
+    "next_review_date": "NULL",
+    "is_active": "TRUE",
+    "is_template": "FALSE",
+    "created_by": ":created_by",
+    "updated_by": "NULL",
+    "created_at": "now()",
+    "updated_at": "now()",
+}
+
+def _clone_sql():
+    columns = [column.name for column in Project.__table__.columns]
+    values = [_TARGET_VALUES.get(name, f"p.{name}") for name in columns]
+    return text(
+        f"INSERT INTO projects ({', '.join(columns)}) "
+        f"SELECT {', '.join(values)} "
+        f"FROM unnest(CAST(:ids AS uuid[]), CAST(:source_ids AS uuid[]), CAST(:names AS varchar[]), "
+        f"CAST(:project_codes AS varchar[]), CAST(:start_dates AS date[]), CAST(:end_dates AS date[])) "
+        f"AS t(id, source_id, name, project_code, start_date, end_date) "
+        f"JOIN projects AS p ON p.id = t.source_id AND p.tenant_id = :tenant_id"
+    )
+
+async def validate_targets(db: AsyncSession, tenant_id, targets: Sequence[CloneTarget]):
+    """校验源项目属于当前租户且未在删除中、项目编号在请求内和已有项目中均不重复"""
+    source_ids = {target.source_id for target in targets}
+    found = await db.execute(
+        select(Project.id).where(
+            Project.tenant_id == tenant_id,
+            Project.id.in_(source_ids),
+            Project.status.is_distinct_from(PROJECT_DELETING)
+        )
+    )
+    missing = source_ids - set(found.scalars().all())
+    if missing:
+        raise ProjectCloneError(f"源项目不存在: {', '.join(sorted(str(source_id) for source_id in missing))}")
+
+    codes = [target.project_code for target in targets]
+    duplicated = sorted({code for code in codes if codes.count(code) > 1})
+    if duplicated:
+        raise ProjectCloneError(f"请求中项目编号重复: {', '.join(duplicated)}")
+
+    # project_code 全局唯一
+    existing = await db.execute(select(Project.project_code).where(Project.project_code.in_(codes)))
+    existing_codes = sorted(existing.scalars().all())
+    if existing_codes:
+        raise ProjectCloneError(f"项目编号已存在: {', '.join(existing_codes)}")
+
+async def clone_projects(
+    db: AsyncSession,
+    tenant_id,
+    created_by,
+    targets: Sequence[CloneTarget]
+) -> List[Dict]:
+    """
+    复制项目（不提交事务），返回与 targets 顺序一致的 {source_id, id, name, project_code}
+
+    复制后按新项目的预算重新计算成本偏差和预算使用率
+    """
+    await validate_targets(db, tenant_id, targets)
+
+    new_ids = [uuid.uuid4() for _ in targets]
+    await db.execute(
+        _clone_sql(),
+        {
+            "tenant_id": tenant_id,
+            "created_by": created_by,
+            "ids": new_ids,
+            "source_ids": [target.source_id for target in targets],
+            "names": [target.name for target in targets],
+            "project_codes": [target.project_code for target in targets],
+            "start_dates": [target.start_date for target in targets],
+            "end_dates": [target.end_date for target in targets],
+        }
+    )
+    await project_costs.refresh_budget_metrics(db, new_ids)
+
+    return [
+        {"source_id": target.source_id, "id": new_id, "name": target.name, "project_code": target.project_code}
+        for target, new_id in zip(targets, new_ids)
+    ]
@@ -0,0 +1,189 @@
+"""
+项目成本汇总服务
+
+项目的实际成本（actual_cost）由其支出类财务记录的本位币金额累计而来，成本偏差（cost_variance = 预算 - 实际成本）
+和预算使用率（budget_utilization = 实际成本 / 预算 * 100）随之派生。
+所有调整都在数据库内以 actual_cost = actual_cost + 增量 的形式原子完成，
+并发写入同一项目时由行锁串行化，不会丢失更新；派生字段在同一条 UPDATE 中一并计算。
+涉及多个项目时先按项目ID顺序 SELECT ... FOR UPDATE 加锁（UPDATE ... FROM 的加锁顺序取决于执行计划），
+并发的批量操作以相同顺序加锁，不会互相死锁。
+各写入路径统一先更新月度汇总（transaction_rollup）和使每日快照失效，最后调整项目成本，
+即先锁汇总行、后锁项目行；新增写入路径须保持这一顺序，否则与并发写入交叉加锁会死锁。
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from decimal import Decimal
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 预算使用率列为 DECIMAL(5,2)，超出范围时截断
+MAX_BUDGET_UTILIZATION = Decimal("999.99")
+
+def _derived_set_clause(actual_cost_sql: str) -> str:
+    """由新的实际成本表达式生成 actual_cost 及派生字段的 SET 子句"""
+    return (
+        f"actual_cost = {actual_cost_sql}, "
+        f"cost_variance = p.budget - ({actual_cost_sql}), "
+        f"budget_utilization = CASE WHEN COALESCE(p.budget, 0) = 0 THEN NULL "
+        f"ELSE GREATEST(LEAST(round(({actual_cost_sql}) / p.budget * 100, 2), {MAX_BUDGET_UTILIZATION}), "
+        f"-{MAX_BUDGET_UTILIZATION}) END"
+    )
+
+def expense_contribution(transaction) -> Optional[Tuple[uuid.UUID, Decimal]]:
+    """一条记录对项目实际成本的贡献 (项目ID, 金额)，非支出或无项目时为None"""
+    if transaction.type != 'expense' or not transaction.project_id or not transaction.amount_base:
+        return None
+    return transaction.project_id, Decimal(str(transaction.amount_base))
+
+def contribution_deltas(before, after) -> Dict[uuid.UUID, Decimal]:
+    """由修改前后的成本贡献计算各项目的增量"""
+    deltas: Dict[uuid.UUID, Decimal] = {}
+    for contribution, sign in ((before, -1), (after, 1)):
+        if contribution:
+            project_id, amount = contribution
+            deltas[project_id] = deltas.get(project_id, Decimal("0")) + sign * amount
+    return deltas
+
+async def lock_projects(db: AsyncSession, id_source_sql: str, params: dict):
+    """按项目ID顺序锁定项目行：id_source_sql 为返回项目ID的子查询"""
+    await db.execute(
+        text(f"SELECT id FROM projects WHERE id IN ({id_source_sql}) ORDER BY id FOR UPDATE"),
+        params
+    )
+
+async def apply_cost_deltas(db: AsyncSession, deltas: Dict[uuid.UUID, Decimal]):
+    """按项目原子累加实际成本增量（可为负）"""
+    deltas = {
+        project_id: Decimal(str(amount))
+        for project_id, amount in deltas.items()
+        if project_id and amount
+    }
+    if not deltas:
+        return
+
+    project_ids = sorted(deltas, key=str)
+    if len(project_ids) > 1:
+        await lock_projects(
+            db, "SELECT unnest(CAST(:project_ids AS uuid[]))",
+            {"project_ids": [uuid.UUID(str(project_id)) for project_id in project_ids]}
+        )
+    await db.execute(
+        text(
+            f"UPDATE projects AS p SET "
+            f"{_derived_set_clause('COALESCE(p.actual_cost, 0) + d.delta')} "
+            f"FROM (SELECT unnest(CAST(:project_ids AS uuid[])) AS project_id, "
+            f"unnest(CAST(:amounts AS numeric[])) AS delta) AS d "
+            f"WHERE p.id = d.project_id"
+        ),
+        {
+            "project_ids": [uuid.UUID(str(project_id)) for project_id in project_ids],
+            "amounts": [deltas[project_id] for project_id in project_ids],
+        }
+    )
+
+async def apply_costs_from(
+    db: AsyncSession,
+    source_table: str,
+    where_clause: str,
+    params: dict,
+    sign: int = 1
+):
+    """
+    将某张结构与 transactions 相同的表中的支出按项目汇总后累加（sign=-1 时扣减）
+
+    用于批量导入（暂存表）和批量修改/删除（按ID集合）
+    """
+    await lock_projects(
+        db,
+        f"SELECT project_id FROM {source_table} WHERE type = 'expense' AND project_id IS NOT NULL {where_clause}",
+        params
+    )
+    await db.execute(
+        text(
+            f"UPDATE projects AS p SET "
+            f"{_derived_set_clause(f'COALESCE(p.actual_cost, 0) + {sign} * s.total')} "
+            f"FROM (SELECT project_id, SUM(amount_base) AS total FROM {source_table} "
+            f"WHERE type = 'expense' AND project_id IS NOT NULL {where_clause} "
+            f"GROUP BY project_id) AS s "
+            f"WHERE p.id = s.project_id"
+        ),
+        params
+    )
+
+async def refresh_budget_metrics(db: AsyncSession, project_ids: Iterable[uuid.UUID]):
+    """预算变化后重新计算派生字段（实际成本不变）"""
+    project_ids = [uuid.UUID(str(project_id)) for project_id in project_ids if project_id]
+    if not project_ids:
+        return
+    await db.execute(
+        text(
+            f"UPDATE projects AS p SET {_derived_set_clause('COALESCE(p.actual_cost, 0)')} "
+            f"WHERE p.id = ANY(:project_ids)"
+        ),
+        {"project_ids": project_ids}
+    )
+
+# 按明细重新计算的实际成本与当前值的对比
+_DRIFT_SQL = (
+    "SELECT p.id, p.tenant_id, p.name, COALESCE(p.actual_cost, 0) AS stored_cost, "
+    "COALESCE(s.total, 0) AS expected_cost "
+    "FROM projects AS p "
+    "LEFT JOIN (SELECT project_id, SUM(amount_base) AS total FROM transactions "
+    "WHERE type = 'expense' {tenant_filter} GROUP BY project_id) AS s ON s.project_id = p.id "
+    "WHERE COALESCE(p.actual_cost, 0) <> COALESCE(s.total, 0) {project_tenant_filter} "
+    "ORDER BY abs(COALESCE(p.actual_cost, 0) - COALESCE(s.total, 0)) DESC"
+)
+
+async def find_drift(db: AsyncSession, tenant_id=None) -> List[dict]:
+    """从明细批量重算所有项目的实际成本，返回与存储值不一致的项目"""
+    params = {}
+    tenant_filter = project_tenant_filter = ""
+    if tenant_id:
+        tenant_filter = "AND tenant_id = :tenant_id"
+        project_tenant_filter = "AND p.tenant_id = :tenant_id"
+        params["tenant_id"] = tenant_id
+
+    result = await db.execute(
+        text(_DRIFT_SQL.format(tenant_filter=tenant_filter, project_tenant_filter=project_tenant_filter)),
+        params
+    )
+    return [
+        {
+            "project_id": str(row.id),
+            "tenant_id": str(row.tenant_id),
+            "name": row.name,
+            "stored_cost": row.stored_cost,
+            "expected_cost": row.expected_cost,
+            "drift": row.stored_cost - row.expected_cost,
+        }
+        for row in result.all()
+    ]
+
+async def reconcile(db: AsyncSession, tenant_id=None, fix: bool = False) -> List[dict]:
+    """
+    对账：找出实际成本偏差的项目，fix=True 时按明细重写实际成本并刷新所有项目的派生字段（不提交事务）
+    """
+    drift = await find_drift(db, tenant_id)
+    if not fix:
+        return drift
+
+    tenant_filter = project_tenant_filter = ""
+    params = {}
+    if tenant_id:
+        tenant_filter = "AND tenant_id = :tenant_id"
+        project_tenant_filter = "AND base.tenant_id = :tenant_id"
+        params["tenant_id"] = tenant_id
+
+    await db.execute(
+        text(
+            f"UPDATE projects AS p SET "
+            f"{_derived_set_clause('COALESCE(s.total, 0)')} "
+            f"FROM projects AS base "
+            f"LEFT JOIN (SELECT project_id, SUM(amount_base) AS total FROM transactions "
+            f"WHERE type = 'expense' {tenant_filter} GROUP BY project_id) AS s ON s.project_id = base.id "
+            f"WHERE p.id = base.id {project_tenant_filter}"
+        ),
+        params
+    )
+    return drift
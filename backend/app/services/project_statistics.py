@@ -0,0 +1,99 @@
+"""
+项目统计看板
+
+一次扫描租户的 projects 行，用 GROUPING SETS 同时得到总数与金额合计、状态/类型/优先级分布、
+进度区间分布（width_bucket）和按创建月份的趋势。GET /projects/statistics/dashboard 和
+原有的各项目统计接口都从同一份结果（按租户数据版本缓存）格式化输出。
+"""
+from typing import Any, Dict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import stats_cache
+
+CACHE_ENDPOINT = "projects.statistics.dashboard"
+
+# 趋势保留有项目的最近N个月（/statistics/trend 的 months 上限）
+TREND_MONTHS = 24
+
+# width_bucket(进度, ARRAY[20, 50, 80, 100]) 的区间序号 -> 区间名称
+PROGRESS_RANGES = ['0-20%', '20-50%', '50-80%', '80-100%', '100%']
+
+# GROUPING SETS 的维度，顺序与 GROUPING(...) 的参数顺序一致
+DIMENSIONS = ('status', 'project_type', 'priority', 'progress_bucket', 'month')
+
+_DASHBOARD_SQL = text(f"""
+WITH base AS (
+    SELECT status, project_type, priority,
+        width_bucket(COALESCE(progress, 0), ARRAY[20, 50, 80, 100]) AS progress_bucket,
+        CAST(date_trunc('month', created_at) AS date) AS month,
+        budget, contract_value
+    FROM projects
+    WHERE tenant_id = :tenant_id
+)
+SELECT GROUPING({", ".join(DIMENSIONS)}) AS grouping_id, {", ".join(DIMENSIONS)},
+    count(*) AS count, sum(budget) AS budget, sum(contract_value) AS contract_value
+FROM base
+GROUP BY GROUPING SETS ({", ".join(f"({name})" for name in DIMENSIONS)}, ())
+""")
+
+def _dimension(grouping_id: int):
+    """GROUPING 位图中为0的位即该行所属维度，全为1时为合计行"""
+    for index, name in enumerate(DIMENSIONS):
+        if not grouping_id & (1 << (len(DIMENSIONS) - 1 - index)):
+            return name
+    return None
+
+async def compute_dashboard(db: AsyncSession, tenant_id) -> Dict[str, Any]:
+    """单次聚合计算项目看板数据"""
+    result = await db.execute(_DASHBOARD_SQL, {"tenant_id": tenant_id})
+
+    dashboard = {
+        "total_projects": 0,
+        "total_budget": 0.0,
+        "total_contract_amount": 0.0,
+        "status_counts": {},
+        "type_counts": {},
+        "priority_counts": {},
+        "progress_counts": {},
+        "monthly_trend": [],
+    }
+    for row in result.all():
+        dimension = _dimension(row.grouping_id)
+        if dimension is None:
+            dashboard["total_projects"] = row.count
+            dashboard["total_budget"] = float(row.budget or 0)
+            dashboard["total_contract_amount"] = float(row.contract_value or 0)
+        elif dimension == "status":
+            dashboard["status_counts"][row.status or 'unknown'] = row.count
+        elif dimension == "project_type":
+            dashboard["type_counts"][row.project_type or 'other'] = (
+                dashboard["type_counts"].get(row.project_type or 'other', 0) + row.count
+            )
+        elif dimension == "priority":
+            dashboard["priority_counts"][row.priority or 'unknown'] = row.count
+        elif dimension == "progress_bucket":
+            dashboard["progress_counts"][PROGRESS_RANGES[row.progress_bucket]] = row.count
+        elif row.month is not None:
+            dashboard["monthly_trend"].append({
+                "month": f"{row.month.year}年{row.month.month}月",
+                "period_start": row.month.isoformat(),
+                "projects": row.count,
+                "budget": float(row.budget or 0),
+            })
+
+    # 按时间正序，只保留最近 TREND_MONTHS 个有项目的月份
+    dashboard["monthly_trend"].sort(key=lambda item: item["period_start"])
+    dashboard["monthly_trend"] = dashboard["monthly_trend"][-TREND_MONTHS:]
+    dashboard["type_counts"] = dict(sorted(dashboard["type_counts"].items(), key=lambda item: item[1], reverse=True))
+    dashboard["progress_counts"] = {
+        label: dashboard["progress_counts"][label] for label in PROGRESS_RANGES if label in dashboard["progress_counts"]
+    }
+    return dashboard
+
+async def load_dashboard(db: AsyncSession, tenant_id) -> Dict[str, Any]:
+    """读取项目看板数据（按租户数据版本缓存，各项目统计接口共用）"""
+    return await stats_cache.get_or_compute(
+        tenant_id, CACHE_ENDPOINT, {}, lambda: compute_dashboard(db, tenant_id)
+    )
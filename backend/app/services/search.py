@@ -0,0 +1,51 @@
+"""
+关键词搜索服务
+
+交易记录、项目、供应商的关键词筛选统一匹配一个拼接后的"搜索文档"表达式，
+该表达式与迁移中创建的 pg_trgm GIN 表达式索引完全一致，
+因此 ILIKE '%关键词%' 可以走索引而不是全表扫描。
+
+注意：三元组索引需要至少3个字符才能有效过滤，1-2个字符的关键词仍会扫描索引全部条目。
+"""
+from sqlalchemy import func, literal_column
+
+from ..models.project import Project
+from ..models.transaction import Transaction, Supplier
+
+# 使用字面量而不是绑定参数，保证生成的SQL表达式与索引表达式一致
+_EMPTY = literal_column("''")
+_SEPARATOR = literal_column("' '")
+
+def build_search_document(*columns):
+    """
+    拼接多个列为搜索文档
+
+    生成 coalesce(a, '') || ' ' || coalesce(b, '') ...，该表达式是 IMMUTABLE 的，可用于表达式索引
+    """
+    document = func.coalesce(columns[0], _EMPTY)
+    for column in columns[1:]:
+        document = document.op("||")(_SEPARATOR).op("||")(func.coalesce(column, _EMPTY))
+    return document
+
+# 各实体的搜索文档（修改时需同步修改迁移中的索引表达式）
+TRANSACTION_SEARCH_DOCUMENT = build_search_document(
+    Transaction.description, Transaction.notes, Transaction.reference_number
+)
+PROJECT_SEARCH_DOCUMENT = build_search_document(
+    Project.name, Project.description, Project.project_code
+)
+SUPPLIER_SEARCH_DOCUMENT = build_search_document(
+    Supplier.name, Supplier.contact_person, Supplier.phone, Supplier.email
+)
+
+def escape_like(keyword: str) -> str:
+    """转义LIKE通配符（PostgreSQL默认转义字符为反斜杠）"""
+    return keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def keyword_filter(document, keyword: str):
+    """关键词包含匹配条件（不区分大小写）"""
+    return document.ilike(f"%{escape_like(keyword.strip())}%")
+
+def keyword_rank(document, keyword: str):
+    """关键词相关度，取值0-1，越大越相关"""
+    return func.word_similarity(keyword.strip(), document)
@@ -0,0 +1,100 @@
+"""
+统计后台任务
+
+跨度较大的统计请求不在请求内同步计算：提交任务后立即返回任务ID，客户端轮询任务状态取结果，
+结果同时写入统计缓存（同样的参数再次请求直接命中缓存）。
+
+任务按 STATS_JOBS_BACKEND 投递到 Celery worker 或在API进程内执行（见 background_jobs.py）。
+Celery 执行时结果经 stats_cache.store 写入的缓存必须是API进程可见的 redis 缓存；memory 缓存下
+写入只留在worker进程内，任务结果仍可通过任务状态接口取得，但同样参数的再次请求不会命中缓存。
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+from datetime import date, datetime
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..core.cache import stats_cache
+from ..core.data_version import data_version
+from . import chart_statistics
+from .background_jobs import SUCCEEDED, JobQueue
+
+CELERY_TASK_NAME = "statistics.run_job"
+
+job_queue = JobQueue(
+    CELERY_TASK_NAME,
+    backend=lambda: settings.STATS_JOBS_BACKEND,
+    result_ttl=lambda: settings.STATS_JOB_RESULT_TTL
+)
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+async def _compute_charts(db: AsyncSession, tenant_id, params: Dict[str, Any]) -> dict:
+    return await chart_statistics.compute_chart_statistics(
+        db, tenant_id, params["period"], _parse_date(params.get("date_from")), _parse_date(params.get("date_to"))
+    )
+
+# 任务类型（与统计缓存的接口名一致） -> 计算函数，参数与接口查询参数一致
+JOB_KINDS: Dict[str, Callable[[AsyncSession, Any, Dict[str, Any]], Awaitable[Any]]] = {
+    "transactions.statistics.charts": _compute_charts,
+}
+
+def months_spanned(date_from: Optional[date], date_to: Optional[date]) -> Optional[int]:
+    """日期范围跨越的月数，不限起始日期时返回None"""
+    if date_from is None:
+        return None
+    date_to = date_to or date.today()
+    return (date_to.year - date_from.year) * 12 + date_to.month - date_from.month + 1
+
+def should_run_async(mode: str, date_from: Optional[date], date_to: Optional[date]) -> bool:
+    """sync 始终同步；async 始终后台；auto 在跨度达到 CHART_ASYNC_MIN_MONTHS 或不限起始日期时后台执行"""
+    if mode != "auto":
+        return mode == "async"
+    months = months_spanned(date_from, date_to)
+    return months is None or months >= settings.CHART_ASYNC_MIN_MONTHS
+
+async def run_job(db: AsyncSession, kind: str, tenant_id, params: Dict[str, Any], version: int) -> Any:
+    """执行任务并把结果写入统计缓存（版本号为提交时的租户数据版本）"""
+    result = jsonable_encoder(await JOB_KINDS[kind](db, tenant_id, params))
+    await stats_cache.store(tenant_id, version, kind, params, result)
+    return result
+
+async def submit(kind: str, tenant_id, params: Dict[str, Any]) -> str:
+    """提交任务，返回任务ID"""
+    from ..core.database import db_manager
+
+    job_id = str(uuid.uuid4())
+    version = await data_version.get(tenant_id)
+    params = jsonable_encoder(params)
+    store = job_queue.store()
+    if job_queue.uses_celery:
+        await store.submit(job_id, [kind, str(tenant_id), params, version])
+    else:
+        async def run(job):
+            async for session in db_manager.get_read_session():
+                result = await run_job(session, kind, tenant_id, params, version)
+            return result
+
+        await store.submit(job_id, {"tenant_id": str(tenant_id)}, run)
+    return job_id
+
+async def get_status(job_id: str, tenant_id) -> Optional[dict]:
+    """
+    查询任务状态；任务不存在或属于其他租户时返回None
+
+    Celery 结果后端对未知任务同样返回 PENDING，任务完成前无法校验租户，此时只返回状态不含数据
+    """
+    job = await job_queue.store().status(job_id)
+    if job is None:
+        return None
+    if job_queue.uses_celery:
+        # 任务返回值为 {"tenant_id", "result"}
+        meta = job["meta"] if job["status"] == SUCCEEDED else {}
+        job = {"tenant_id": meta.get("tenant_id"), "status": job["status"],
+               "result": meta.get("result"), "error": job["error"]}
+    if job["tenant_id"] is not None and job["tenant_id"] != str(tenant_id):
+        return None
+    return {"job_id": job_id, "status": job["status"], "result": job["result"], "error": job["error"]}
@@ -0,0 +1,93 @@
+"""
+时间序列组装
+
+统计接口先用一条SQL按月聚合出各序列（如收入、支出），本模块用 pandas 一次完成：
+补齐缺失的月份、按月/季/年重采样、截取最近N个周期，并计算净额、累计值和环比变化。
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# 周期 -> (pandas 周期频率, 默认返回的周期数)
+PERIODS = {
+    "month": ("M", 12),
+    "quarter": ("Q", 4),
+    "year": ("Y", 5),
+}
+
+def period_label(period: pd.Period, period_type: str) -> str:
+    if period_type == "month":
+        return f"{period.year}年{period.month}月"
+    if period_type == "quarter":
+        return f"{period.year}年Q{period.quarter}"
+    return f"{period.year}年"
+
+def monthly_frame(rows: Iterable[Sequence], columns: Sequence[str]) -> pd.DataFrame:
+    """把 (月份, 序列1, 序列2, ...) 形式的查询结果转换为以月度周期为索引的浮点数据"""
+    frame = pd.DataFrame.from_records(list(rows), columns=["month", *columns])
+    if frame.empty:
+        return pd.DataFrame(columns=list(columns), dtype="float64", index=pd.PeriodIndex([], freq="M"))
+    frame.index = pd.PeriodIndex(pd.to_datetime(frame.pop("month")), freq="M")
+    # DECIMAL 列整体转换为 float64，避免逐个单元格转换
+    return frame.astype("float64").groupby(level=0).sum()
+
+def build_trend(
+    rows: Iterable[Sequence],
+    columns: Sequence[str],
+    period_type: str = "month",
+    limit: Optional[int] = None,
+    end: Optional[date] = None,
+    net: Optional[Sequence[str]] = None,
+    descending: bool = True
+) -> List[Dict]:
+    """
+    组装趋势序列
+
+    rows: 按月聚合的查询结果 (月份, 各序列值...)，缺失月份视为0
+    end: 最后一个周期所在日期，默认取数据中最近的月份
+    net: (被减数, 减数) 两个序列名，额外输出 net 序列
+    每个周期输出 label、period_start、各序列值、{序列}_cumulative 和 {序列}_change（环比，前一周期为0时为None）
+    """
+    freq, default_limit = PERIODS[period_type]
+    limit = limit or default_limit
+    monthly = monthly_frame(rows, columns)
+    if net:
+        monthly["net"] = monthly[net[0]] - monthly[net[1]]
+
+    if end is not None:
+        last_month = pd.Period(end, freq="M")
+    elif len(monthly.index):
+        last_month = monthly.index.max()
+    else:
+        return []
+
+    # 多取一个周期用于计算第一个周期的环比
+    last_period = last_month.asfreq(freq)
+    first_month = (last_period - limit).asfreq("M", how="start")
+    first_month = min(first_month, monthly.index.min()) if len(monthly.index) else first_month
+    filled = monthly.reindex(pd.period_range(first_month, last_month, freq="M"), fill_value=0.0)
+
+    resampled = filled.groupby(filled.index.asfreq(freq)).sum()
+    previous = resampled.shift(1)
+    cumulative = resampled.cumsum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (resampled - previous) / previous.abs()
+    change = change.replace([np.inf, -np.inf], np.nan)
+
+    window = resampled.index[-limit:]
+    result = pd.concat(
+        [
+            resampled.loc[window].round(2),
+            cumulative.loc[window].round(2).add_suffix("_cumulative"),
+            change.loc[window].round(4).add_suffix("_change"),
+        ],
+        axis=1
+    )
+    result = result.astype(object).where(result.notna(), None)
+    result.insert(0, "period_start", [period.start_time.date().isoformat() for period in window])
+    result.insert(0, "label", [period_label(period, period_type) for period in window])
+
+    records = result.to_dict("records")
+    return records[::-1] if descending else records
@@ -0,0 +1,265 @@
+"""
+财务记录批量操作服务
+
+批量审批、拒绝、删除、修改都以集合方式执行：一次查询确定目标记录，
+一条 UPDATE/DELETE 完成修改，月度汇总和项目实际成本按集合整体扣减、累加，
+由调用方在同一事务中提交。
+
+修改交易日期时与单条修改一致：外币记录按新日期从汇率表重新取汇率并换算本位币金额（一条UPDATE完成），
+新日期没有生效汇率的记录跳过并给出原因。
+"""
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from decimal import Decimal
+import uuid
+
+from sqlalchemy import select, update, delete, and_, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.project import Project, PROJECT_DELETING
+from ..models.transaction import Transaction, Category, Supplier
+from ..schemas.transaction import (
+    BatchActionEnum, TransactionBatchFilter, TransactionBatchUpdate
+)
+from . import transaction_rollup, project_costs, daily_snapshots
+
+# 单次批量操作的最大记录数
+MAX_BATCH_SIZE = 5000
+
+# 已审批记录不允许批量修改的字段
+APPROVED_RESTRICTED_FIELDS = {"transaction_date"}
+
+# 外币记录在 :transaction_date（或记录自身的交易日期）当天或之前最近生效的汇率
+_FOREIGN_CONDITION = "t.currency IS NOT NULL AND upper(t.currency) <> :base_currency"
+_RATE_LOOKUP = (
+    "SELECT er.rate FROM exchange_rates AS er "
+    "WHERE er.tenant_id = t.tenant_id AND er.currency = upper(t.currency) AND er.effective_date <= {on_date} "
+    "ORDER BY er.effective_date DESC LIMIT 1"
+)
+
+class BatchOperationError(ValueError):
+    """批量操作请求无效（整体拒绝）"""
+
+def parse_ids(ids: List[str]) -> Tuple[List[uuid.UUID], Dict[str, str]]:
+    """解析ID列表，返回 (有效ID, {无效ID: 原因})"""
+    valid = []
+    errors = {}
+    for raw_id in dict.fromkeys(ids):
+        try:
+            valid.append(uuid.UUID(str(raw_id)))
+        except ValueError:
+            errors[raw_id] = "无效的ID"
+    return valid, errors
+
+def _filter_conditions(tenant_id, batch_filter: TransactionBatchFilter) -> list:
+    conditions = [Transaction.tenant_id == tenant_id]
+    if batch_filter.project_id:
+        conditions.append(Transaction.project_id == batch_filter.project_id)
+    if batch_filter.category_id:
+        conditions.append(Transaction.category_id == batch_filter.category_id)
+    if batch_filter.supplier_id:
+        conditions.append(Transaction.supplier_id == batch_filter.supplier_id)
+    if batch_filter.type:
+        conditions.append(Transaction.type == batch_filter.type.value)
+    if batch_filter.status:
+        conditions.append(Transaction.status == batch_filter.status)
+    if batch_filter.date_from:
+        conditions.append(Transaction.transaction_date >= batch_filter.date_from)
+    if batch_filter.date_to:
+        conditions.append(Transaction.transaction_date <= batch_filter.date_to)
+    return conditions
+
+async def load_targets(
+    db: AsyncSession,
+    tenant_id,
+    ids: Optional[List[uuid.UUID]],
+    batch_filter: Optional[TransactionBatchFilter]
+) -> Dict[uuid.UUID, str]:
+    """一次查询加载目标记录，返回 {ID: 状态}，并锁定这些行直到事务结束"""
+    if ids is not None:
+        conditions = [Transaction.tenant_id == tenant_id, Transaction.id.in_(ids)]
+    else:
+        conditions = _filter_conditions(tenant_id, batch_filter)
+
+    result = await db.execute(
+        select(Transaction.id, Transaction.status)
+        .where(and_(*conditions))
+        .order_by(Transaction.id)
+        .limit(MAX_BATCH_SIZE + 1)
+        .with_for_update()
+    )
+    targets = {row.id: row.status for row in result.all()}
+    if len(targets) > MAX_BATCH_SIZE:
+        raise BatchOperationError(f"单次批量操作最多 {MAX_BATCH_SIZE} 条记录，请缩小筛选范围")
+    return targets
+
+def check_eligibility(
+    action: BatchActionEnum,
+    targets: Dict[uuid.UUID, str],
+    update_fields: Optional[dict] = None
+) -> Tuple[List[uuid.UUID], Dict[uuid.UUID, str]]:
+    """按操作类型检查每条记录是否可以执行，返回 (可执行ID, {不可执行ID: 原因})"""
+    eligible = []
+    errors = {}
+    for transaction_id, current_status in targets.items():
+        if action in (BatchActionEnum.APPROVE, BatchActionEnum.REJECT) and current_status != 'pending':
+            errors[transaction_id] = "只能审批待审批状态的记录"
+        elif (
+            action == BatchActionEnum.UPDATE
+            and current_status == 'approved'
+            and APPROVED_RESTRICTED_FIELDS & set(update_fields or {})
+        ):
+            errors[transaction_id] = "已审批的记录不能修改交易日期"
+        else:
+            eligible.append(transaction_id)
+    return eligible, errors
+
+async def validate_update_fields(db: AsyncSession, tenant_id, updates: TransactionBatchUpdate) -> dict:
+    """校验修改字段中的关联对象并转换为列值"""
+    values = updates.model_dump(exclude_unset=True)
+
+    references = (
+        ("project_id", Project, [Project.status.is_distinct_from(PROJECT_DELETING)], "项目不存在或无权限访问"),
+        ("supplier_id", Supplier, [], "供应商不存在"),
+        ("category_id", Category, [Category.is_active == '1'], "分类不存在"),
+    )
+    for field, model, extra_conditions, message in references:
+        if field not in values:
+            continue
+        if not values[field]:
+            if field == "project_id":
+                raise BatchOperationError("项目不能为空")
+            values[field] = None
+            continue
+        result = await db.execute(
+            select(model.id).where(model.id == values[field], model.tenant_id == tenant_id, *extra_conditions)
+        )
+        if result.scalar_one_or_none() is None:
+            raise BatchOperationError(message)
+
+    for field in ("payment_method", "status"):
+        if values.get(field) is not None and hasattr(values[field], "value"):
+            values[field] = values[field].value
+    return values
+
+async def check_exchange_rates(
+    db: AsyncSession,
+    transaction_ids: List[uuid.UUID],
+    update_values: Optional[dict]
+) -> Tuple[List[uuid.UUID], Dict[uuid.UUID, str]]:
+    """修改交易日期时，一次查询找出新日期没有生效汇率的外币记录，返回 (可执行ID, {不可执行ID: 原因})"""
+    new_date = (update_values or {}).get("transaction_date")
+    if not new_date or not transaction_ids:
+        return transaction_ids, {}
+
+    result = await db.execute(
+        text(
+            f"SELECT t.id, t.currency FROM transactions AS t "
+            f"WHERE t.id = ANY(:transaction_ids) AND {_FOREIGN_CONDITION} "
+            f"AND NOT EXISTS ({_RATE_LOOKUP.format(on_date=':transaction_date')})"
+        ),
+        {
+            "transaction_ids": list(transaction_ids),
+            "base_currency": settings.BASE_CURRENCY,
+            "transaction_date": new_date,
+        }
+    )
+    errors = {
+        row.id: f"缺少 {row.currency} 在 {new_date} 的汇率，请先维护汇率表"
+        for row in result.all()
+    }
+    return [transaction_id for transaction_id in transaction_ids if transaction_id not in errors], errors
+
+async def reprice_foreign(db: AsyncSession, transaction_ids: List[uuid.UUID]):
+    """按记录当前的交易日期为外币记录重新取汇率并换算本位币金额"""
+    await db.execute(
+        text(
+            f"UPDATE transactions AS t SET exchange_rate = r.rate, amount_base = round(t.amount * r.rate, 2) "
+            f"FROM (SELECT t.id, ({_RATE_LOOKUP.format(on_date='t.transaction_date')}) AS rate "
+            f"FROM transactions AS t WHERE t.id = ANY(:transaction_ids) AND {_FOREIGN_CONDITION}) AS r "
+            f"WHERE t.id = r.id AND r.rate IS NOT NULL"
+        ),
+        {"transaction_ids": list(transaction_ids), "base_currency": settings.BASE_CURRENCY}
+    )
+
+async def apply_project_costs(db: AsyncSession, transaction_ids: List[uuid.UUID], sign: int):
+    """按项目汇总这些记录中的支出，整体扣减（sign=-1）或累加（sign=1）到项目实际成本"""
+    if not transaction_ids:
+        return
+    await project_costs.apply_costs_from(
+        db, "transactions", "AND id = ANY(:transaction_ids)",
+        {"transaction_ids": list(transaction_ids)}, sign
+    )
+
+async def expense_totals(db: AsyncSession, transaction_ids: List[uuid.UUID]) -> Dict[uuid.UUID, Decimal]:
+    """这些记录中的支出按项目汇总的本位币金额（不加锁，用于修改前后求差）"""
+    result = await db.execute(
+        text(
+            "SELECT project_id, SUM(amount_base) AS total FROM transactions "
+            "WHERE id = ANY(:transaction_ids) AND type = 'expense' AND project_id IS NOT NULL "
+            "GROUP BY project_id"
+        ),
+        {"transaction_ids": list(transaction_ids)}
+    )
+    return {row.project_id: row.total for row in result.all()}
+
+async def execute(
+    db: AsyncSession,
+    action: BatchActionEnum,
+    transaction_ids: List[uuid.UUID],
+    current_user,
+    approval_note: Optional[str] = None,
+    update_values: Optional[dict] = None
+):
+    """以集合方式执行批量操作（不提交事务）"""
+    if not transaction_ids:
+        return
+
+    now = datetime.utcnow()
+    target = Transaction.id.in_(transaction_ids)
+
+    # 修改前扣减旧维度的汇总，并使涉及日期的每日快照失效
+    await transaction_rollup.accumulate_transactions(db, transaction_ids, -1)
+    await daily_snapshots.invalidate_transactions(db, transaction_ids)
+
+    if action == BatchActionEnum.DELETE:
+        await apply_project_costs(db, transaction_ids, -1)
+        await db.execute(delete(Transaction).where(target).execution_options(synchronize_session=False))
+        return
+
+    costs_before = None
+    if action in (BatchActionEnum.APPROVE, BatchActionEnum.REJECT):
+        values = {
+            "status": "approved" if action == BatchActionEnum.APPROVE else "rejected",
+            "approved_by": str(current_user.id),
+            "approved_at": now,
+            "updated_at": now,
+        }
+        if approval_note:
+            values["description"] = func.coalesce(Transaction.description, '') + f"\n[审批备注: {approval_note}]"
+        await db.execute(update(Transaction).where(target).values(**values).execution_options(synchronize_session=False))
+    else:
+        # 修改项目或交易日期（外币记录重新换算本位币金额）时，按修改前后各项目支出的差额调整实际成本
+        reprices = bool(update_values.get("transaction_date"))
+        if "project_id" in update_values or reprices:
+            costs_before = await expense_totals(db, transaction_ids)
+        await db.execute(
+            update(Transaction).where(target)
+            .values(**update_values, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if reprices:
+            await reprice_foreign(db, transaction_ids)
+
+    # 修改后累加新维度的汇总（日期变化时新日期的快照同样失效）
+    await transaction_rollup.accumulate_transactions(db, transaction_ids, 1)
+    if update_values and "transaction_date" in update_values:
+        await daily_snapshots.invalidate_transactions(db, transaction_ids)
+
+    # 项目行最后锁定（先汇总行、后项目行，与单条写入的加锁顺序一致）
+    if costs_before is not None:
+        deltas = await expense_totals(db, transaction_ids)
+        for project_id, total in costs_before.items():
+            deltas[project_id] = deltas.get(project_id, Decimal("0")) - total
+        await project_costs.apply_cost_deltas(db, deltas)
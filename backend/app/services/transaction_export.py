@@ -0,0 +1,132 @@
+"""
+财务记录导出服务
+
+各导出格式都以异步生成器的形式逐块产出字节，数据行来自数据库服务端游标，
+内存占用与导出行数无关。
+"""
+from typing import AsyncIterator, Dict, Any, List
+from datetime import date, datetime
+from decimal import Decimal
+import csv
+import io
+import json
+import tempfile
+
+from starlette.concurrency import run_in_threadpool
+
+# 导出列：(字段名, 表头)
+EXPORT_COLUMNS = [
+    ("id", "记录ID"),
+    ("transaction_date", "交易日期"),
+    ("type", "交易类型"),
+    ("amount", "金额"),
+    ("currency", "货币"),
+    ("exchange_rate", "汇率"),
+    ("project_name", "项目"),
+    ("supplier_name", "供应商"),
+    ("category_name", "分类"),
+    ("description", "描述"),
+    ("notes", "备注"),
+    ("payment_method", "支付方式"),
+    ("status", "状态"),
+    ("reference_number", "参考编号"),
+    ("created_at", "创建时间"),
+]
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+# 每累计多少行输出一个数据块
+CHUNK_ROWS = 500
+# XLSX临时文件读取块大小
+FILE_CHUNK_SIZE = 64 * 1024
+
+def _json_default(value):
+    """JSON序列化的类型兼容"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+def _cell_value(value):
+    """转换为表格单元格可接受的值"""
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (str, int, float, date, datetime)):
+        return value
+    return str(value)
+
+async def iter_csv(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """导出CSV（带BOM，便于Excel直接打开中文）"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow([label for _, label in EXPORT_COLUMNS])
+
+    count = 0
+    async for row in rows:
+        writer.writerow(["" if row.get(key) is None else row.get(key) for key, _ in EXPORT_COLUMNS])
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue().encode("utf-8")
+
+async def iter_ndjson(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """导出NDJSON（每行一个JSON对象）"""
+    lines = []
+    async for row in rows:
+        record = {key: row.get(key) for key, _ in EXPORT_COLUMNS}
+        lines.append(json.dumps(record, ensure_ascii=False, default=_json_default))
+        if len(lines) >= CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+async def iter_xlsx(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """
+    导出XLSX
+
+    使用openpyxl只写模式逐行写入，工作簿内容落在临时文件中，
+    XLSX是zip格式，必须写完后才能输出，因此生成完成后再分块读出。
+    写入单元格、保存（压缩）和读取临时文件都在线程池中按块执行，不阻塞事件循环。
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title="财务记录")
+
+    def append_rows(values: List[List[Any]]):
+        for value in values:
+            worksheet.append(value)
+
+    pending = [[label for _, label in EXPORT_COLUMNS]]
+    async for row in rows:
+        pending.append([_cell_value(row.get(key)) for key, _ in EXPORT_COLUMNS])
+        if len(pending) >= CHUNK_ROWS:
+            await run_in_threadpool(append_rows, pending)
+            pending = []
+    await run_in_threadpool(append_rows, pending)
+
+    with tempfile.TemporaryFile() as output:
+        await run_in_threadpool(workbook.save, output)
+        output.seek(0)
+        while True:
+            chunk = await run_in_threadpool(output.read, FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+EXPORT_WRITERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+    "xlsx": iter_xlsx,
+}
@@ -0,0 +1,282 @@
+"""
+财务记录批量导入服务
+
+流程：解析上传文件 -> 按批校验（使用预加载的租户项目/供应商/分类映射，不逐行查询）
+-> asyncpg COPY 写入临时暂存表 -> 一条 INSERT ... SELECT 合并到 transactions。
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+import csv
+import io
+import json
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.project import Project, PROJECT_DELETING
+from ..models.transaction import Category, Supplier
+from .transaction_export import EXPORT_COLUMNS
+from . import transaction_rollup, project_costs, daily_snapshots
+from .currency import RateTable, base_amount
+
+STAGING_TABLE = "transactions_import_staging"
+# 每批校验并COPY的行数
+IMPORT_BATCH_SIZE = 5000
+
+# 写入暂存表和正式表的列（顺序与COPY记录一致）
+IMPORT_COLUMNS = [
+    "id", "tenant_id", "project_id", "supplier_id", "category_id", "transaction_date",
+    "type", "amount", "currency", "exchange_rate", "amount_base", "description", "notes", "tags",
+    "payment_method", "status", "reference_number", "created_by", "created_at", "updated_at",
+]
+
+# 表头别名：支持字段名和导出文件的中文表头
+HEADER_ALIASES = {label: key for key, label in EXPORT_COLUMNS}
+HEADER_ALIASES.update({
+    "项目ID": "project_id",
+    "供应商ID": "supplier_id",
+    "分类ID": "category_id",
+    "标签": "tags",
+})
+
+TYPE_ALIASES = {
+    "income": "income",
+    "expense": "expense",
+    "收入": "income",
+    "支出": "expense",
+}
+
+class ImportFileError(ValueError):
+    """导入文件无法解析"""
+
+def _normalize_header(header) -> Optional[str]:
+    """将表头映射为字段名"""
+    if header is None:
+        return None
+    header = str(header).strip()
+    return HEADER_ALIASES.get(header, header)
+
+def parse_upload(filename: str, content: bytes) -> List[Dict[str, Any]]:
+    """解析CSV或XLSX文件为字典行列表"""
+    lower_name = (filename or "").lower()
+
+    if lower_name.endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        try:
+            workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        except Exception as e:
+            raise ImportFileError(f"无法读取XLSX文件: {e}")
+        worksheet = workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        headers = [_normalize_header(cell) for cell in next(rows, [])]
+        records = [
+            {header: value for header, value in zip(headers, row) if header}
+            for row in rows
+            if any(value not in (None, "") for value in row)
+        ]
+        workbook.close()
+        return records
+
+    if lower_name.endswith(".csv"):
+        try:
+            content_text = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            content_text = content.decode("gbk", errors="strict")
+        reader = csv.reader(io.StringIO(content_text))
+        headers = [_normalize_header(cell) for cell in next(reader, [])]
+        return [
+            {header: value for header, value in zip(headers, row) if header}
+            for row in reader
+            if any(value.strip() for value in row)
+        ]
+
+    raise ImportFileError("仅支持CSV或XLSX文件")
+
+async def load_tenant_lookups(db: AsyncSession, tenant_id) -> Dict[str, Dict[str, uuid.UUID]]:
+    """预加载租户的项目、供应商、分类映射（ID和名称均可定位；正在删除的项目不可导入）"""
+    lookups = {}
+    for key, model, extra_conditions in (
+        ("project", Project, [Project.status.is_distinct_from(PROJECT_DELETING)]),
+        ("supplier", Supplier, []),
+        ("category", Category, [Category.is_active == '1']),
+    ):
+        result = await db.execute(
+            select(model.id, model.name).where(model.tenant_id == tenant_id, *extra_conditions)
+        )
+        mapping = {}
+        for row in result.all():
+            mapping[str(row.id)] = row.id
+            mapping.setdefault(f"name:{row.name}", row.id)
+        lookups[key] = mapping
+    return lookups
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+def _text(value) -> Optional[str]:
+    if _blank(value):
+        return None
+    return str(value).strip()
+
+class TransactionRowValidator:
+    """单行校验并转换为COPY记录"""
+
+    def __init__(self, tenant_id, created_by, lookups: Dict[str, Dict[str, uuid.UUID]], rate_table: RateTable):
+        self.tenant_id = tenant_id
+        self.created_by = created_by
+        self.lookups = lookups
+        self.rate_table = rate_table
+        self.now = datetime.utcnow()
+
+    def _resolve(self, kind: str, row: Dict[str, Any], label: str, required: bool = False) -> Optional[uuid.UUID]:
+        """按ID或名称解析关联对象"""
+        mapping = self.lookups[kind]
+        ref_id = _text(row.get(f"{kind}_id"))
+        ref_name = _text(row.get(f"{kind}_name"))
+
+        if ref_id:
+            if ref_id not in mapping:
+                raise ValueError(f"{label}不存在: {ref_id}")
+            return mapping[ref_id]
+        if ref_name:
+            if f"name:{ref_name}" not in mapping:
+                raise ValueError(f"{label}不存在: {ref_name}")
+            return mapping[f"name:{ref_name}"]
+        if required:
+            raise ValueError(f"{label}不能为空")
+        return None
+
+    def _parse_date(self, value) -> date:
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        if _blank(value):
+            raise ValueError("交易日期不能为空")
+        try:
+            return datetime.strptime(str(value).strip()[:10], "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError(f"交易日期格式错误，请使用 YYYY-MM-DD 格式: {value}")
+
+    def _parse_decimal(self, value, label: str, default: Optional[Decimal] = None) -> Decimal:
+        if _blank(value):
+            if default is None:
+                raise ValueError(f"{label}不能为空")
+            return default
+        try:
+            return Decimal(str(value).strip().replace(",", ""))
+        except InvalidOperation:
+            raise ValueError(f"{label}格式错误: {value}")
+
+    def validate(self, row: Dict[str, Any]) -> Tuple:
+        """校验单行，返回与IMPORT_COLUMNS顺序一致的记录，失败抛出ValueError"""
+        transaction_date = self._parse_date(row.get("transaction_date"))
+
+        type_value = TYPE_ALIASES.get(str(row.get("type") or "").strip().lower())
+        if not type_value:
+            raise ValueError(f"交易类型无效: {row.get('type')}")
+
+        amount = self._parse_decimal(row.get("amount"), "交易金额").quantize(Decimal("0.01"))
+        if amount <= 0:
+            raise ValueError("交易金额必须大于0")
+
+        explicit_rate = self._parse_decimal(row.get("exchange_rate"), "汇率", default=Decimal("0"))
+        if explicit_rate < 0:
+            raise ValueError("汇率不能为负数")
+
+        description = _text(row.get("description"))
+        if not description:
+            raise ValueError("交易描述不能为空")
+        if len(description) > 500:
+            raise ValueError("交易描述不能超过500个字符")
+
+        currency = _text(row.get("currency")) or "CNY"
+        if len(currency) > 10:
+            raise ValueError(f"货币类型无效: {currency}")
+        # 未填写汇率的外币记录按汇率表取交易日期生效的汇率
+        exchange_rate = self.rate_table.resolve(currency, transaction_date, explicit_rate)
+
+        payment_method = _text(row.get("payment_method"))
+        if payment_method and len(payment_method) > 50:
+            raise ValueError("支付方式不能超过50个字符")
+
+        reference_number = _text(row.get("reference_number"))
+        if reference_number and len(reference_number) > 100:
+            raise ValueError("参考编号不能超过100个字符")
+
+        tags = _text(row.get("tags"))
+        tag_list = [tag.strip() for tag in tags.replace("，", ",").split(",") if tag.strip()] if tags else []
+
+        return (
+            uuid.uuid4(),
+            self.tenant_id,
+            self._resolve("project", row, "项目", required=True),
+            self._resolve("supplier", row, "供应商"),
+            self._resolve("category", row, "分类"),
+            transaction_date,
+            type_value,
+            amount,
+            currency,
+            exchange_rate,
+            base_amount(amount, exchange_rate),
+            description,
+            _text(row.get("notes")),
+            json.dumps(tag_list, ensure_ascii=False),
+            payment_method,
+            "confirmed",
+            reference_number,
+            self.created_by,
+            self.now,
+            self.now,
+        )
+
+def validate_rows(
+    rows: Iterable[Dict[str, Any]],
+    validator: TransactionRowValidator,
+    first_line: int = 2
+) -> Tuple[List[Tuple], List[Dict[str, Any]]]:
+    """批量校验，返回 (有效记录, 错误报告)；行号对应文件中的行（表头为第1行）"""
+    records = []
+    errors = []
+    for line_no, row in enumerate(rows, start=first_line):
+        try:
+            records.append(validator.validate(row))
+        except ValueError as e:
+            errors.append({"row": line_no, "error": str(e), "data": {k: _text(v) for k, v in row.items()}})
+    return records, errors
+
+async def create_staging_table(db: AsyncSession):
+    """创建事务级临时暂存表（提交后自动删除）"""
+    await db.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+        f"(LIKE transactions INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+
+async def copy_to_staging(db: AsyncSession, records: List[Tuple]):
+    """通过asyncpg COPY协议写入暂存表"""
+    if not records:
+        return
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        STAGING_TABLE, records=records, columns=IMPORT_COLUMNS
+    )
+
+async def merge_staging(db: AsyncSession) -> int:
+    """
+    将暂存表合并到正式表，返回写入行数
+
+    与单条创建保持一致：支出记录累加到所属项目的实际成本（按项目聚合后一条UPDATE完成），
+    并在同一事务中累加月度汇总、使导入日期的每日快照失效
+    """
+    columns = ", ".join(IMPORT_COLUMNS)
+    result = await db.execute(text(
+        f"INSERT INTO transactions ({columns}) SELECT {columns} FROM {STAGING_TABLE}"
+    ))
+    await transaction_rollup.accumulate_from_table(db, STAGING_TABLE)
+    await daily_snapshots.invalidate_from_table(db, STAGING_TABLE)
+    await project_costs.apply_costs_from(db, STAGING_TABLE, "", {})
+    return result.rowcount or 0
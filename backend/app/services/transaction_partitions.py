@@ -0,0 +1,73 @@
+"""
+交易表分区维护
+
+transactions 按 transaction_date 按月范围分区（transactions_yYYYYmMM），
+未建分区的日期落入默认分区 transactions_default。分区的创建逻辑在数据库函数
+create_transaction_partition / ensure_transaction_partitions 中（见分区迁移），
+这里负责预建未来月份分区、查看分区情况，以及把旧分区分离出来单独归档。
+"""
+from typing import List
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+
+PARENT_TABLE = "transactions"
+DEFAULT_PARTITION = "transactions_default"
+
+async def ensure_partitions(db: AsyncSession, months_ahead: int = None) -> int:
+    """预建当月及未来 months_ahead 个月的分区，返回新建数量（不提交事务）"""
+    if months_ahead is None:
+        months_ahead = settings.TRANSACTION_PARTITION_MONTHS_AHEAD
+    result = await db.execute(
+        text("SELECT ensure_transaction_partitions(:months_ahead)"),
+        {"months_ahead": months_ahead}
+    )
+    return result.scalar_one()
+
+async def create_partition(db: AsyncSession, month: date) -> str:
+    """创建指定月份的分区（默认分区中该月的数据会移入新分区），返回分区名"""
+    result = await db.execute(text("SELECT create_transaction_partition(:month)"), {"month": month})
+    return result.scalar_one()
+
+async def list_partitions(db: AsyncSession) -> List[dict]:
+    """列出所有分区及其范围、估算行数和占用空间，按范围排序"""
+    result = await db.execute(
+        text(
+            "SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound, "
+            "c.reltuples::bigint AS estimated_rows, pg_total_relation_size(c.oid) AS total_bytes "
+            "FROM pg_inherits AS i "
+            "JOIN pg_class AS c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass) "
+            "ORDER BY c.relname"
+        ),
+        {"parent": PARENT_TABLE}
+    )
+    return [
+        {
+            "name": row.name,
+            "bound": row.bound,
+            "estimated_rows": max(row.estimated_rows, 0),
+            "total_bytes": row.total_bytes,
+        }
+        for row in result.all()
+    ]
+
+async def detach_partitions_before(db: AsyncSession, before_month: date) -> List[str]:
+    """
+    分离早于指定月份的分区（不提交事务），返回分离的分区名
+
+    分离后的表保留原名，可单独备份、迁移到归档库或删除；
+    月度汇总不受影响，但明细查询和项目成本对账将不再包含这些月份。
+    """
+    cutoff = f"{PARENT_TABLE}_y{before_month.year:04d}m{before_month.month:02d}"
+    detached = []
+    for partition in await list_partitions(db):
+        name = partition["name"]
+        if name == DEFAULT_PARTITION or name >= cutoff:
+            continue
+        await db.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+        detached.append(name)
+    return detached
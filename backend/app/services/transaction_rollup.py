@@ -0,0 +1,231 @@
+"""
+交易月度汇总维护服务
+
+transaction_monthly_rollups 表按月份和统计维度累计交易笔数与金额，
+交易的创建、修改、审批、删除在同一数据库事务中调用本模块增量更新汇总，
+统计接口读取汇总表，查询成本与月份数相关而不是与交易行数相关。
+"""
+from typing import Dict, List, Optional, Tuple
+from datetime import date, timedelta
+from decimal import Decimal
+import uuid
+
+from sqlalchemy import select, func, and_, or_, cast, Date, text, delete, literal, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.transaction import Transaction, TransactionMonthlyRollup
+
+# 维度为空时的占位值
+NONE_ID = uuid.UUID(int=0)
+NONE_TEXT = ""
+
+ROLLUP_KEY_COLUMNS = [
+    "tenant_id", "month", "type", "status", "category_id", "project_id", "supplier_id", "payment_method",
+]
+
+RollupKey = Tuple[uuid.UUID, date, str, str, uuid.UUID, uuid.UUID, uuid.UUID, str]
+
+def month_start(value: date) -> date:
+    """所在月份的1日"""
+    return value.replace(day=1)
+
+def _dimension_id(value) -> uuid.UUID:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return NONE_ID
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+def snapshot(transaction: Transaction) -> Optional[Tuple[RollupKey, Decimal]]:
+    """记录交易当前的汇总维度和金额，用于修改前后求差"""
+    if transaction is None or transaction.transaction_date is None:
+        return None
+    key = (
+        _dimension_id(transaction.tenant_id),
+        month_start(transaction.transaction_date),
+        transaction.type,
+        transaction.status or NONE_TEXT,
+        _dimension_id(transaction.category_id),
+        _dimension_id(transaction.project_id),
+        _dimension_id(transaction.supplier_id),
+        transaction.payment_method or NONE_TEXT,
+    )
+    return key, Decimal(str(transaction.amount_base or 0))
+
+async def apply_deltas(db: AsyncSession, deltas: Dict[RollupKey, Tuple[int, Decimal]]):
+    """按维度累加笔数和金额的增量（INSERT ... ON CONFLICT DO UPDATE，并发安全）"""
+    values = [
+        {
+            "id": uuid.uuid4(),
+            **dict(zip(ROLLUP_KEY_COLUMNS, key)),
+            "transaction_count": count,
+            "total_amount": amount,
+        }
+        for key, (count, amount) in deltas.items()
+        if count or amount
+    ]
+    if not values:
+        return
+
+    table = TransactionMonthlyRollup.__table__
+    statement = insert(table).values(values)
+    statement = statement.on_conflict_do_update(
+        constraint="uq_transaction_monthly_rollup_key",
+        set_={
+            "transaction_count": table.c.transaction_count + statement.excluded.transaction_count,
+            "total_amount": table.c.total_amount + statement.excluded.total_amount,
+            "updated_at": func.now(),
+        }
+    )
+    await db.execute(statement)
+
+async def record_change(
+    db: AsyncSession,
+    before: Optional[Tuple[RollupKey, Decimal]],
+    after: Optional[Tuple[RollupKey, Decimal]]
+):
+    """
+    根据交易修改前后的快照更新汇总
+
+    创建时 before 为 None，删除时 after 为 None
+    """
+    deltas: Dict[RollupKey, Tuple[int, Decimal]] = {}
+    if before:
+        key, amount = before
+        count_delta, amount_delta = deltas.get(key, (0, Decimal("0")))
+        deltas[key] = (count_delta - 1, amount_delta - amount)
+    if after:
+        key, amount = after
+        count_delta, amount_delta = deltas.get(key, (0, Decimal("0")))
+        deltas[key] = (count_delta + 1, amount_delta + amount)
+    await apply_deltas(db, deltas)
+
+async def _accumulate(db: AsyncSession, source_table: str, where_clause: str, params: dict, sign: int = 1):
+    """将源表按维度聚合后累加（sign=-1 时扣减）到汇总表"""
+    key_columns = ", ".join(ROLLUP_KEY_COLUMNS)
+    await db.execute(
+        text(
+            f"INSERT INTO transaction_monthly_rollups "
+            f"(id, {key_columns}, transaction_count, total_amount) "
+            f"SELECT gen_random_uuid(), tenant_id, "
+            f"date_trunc('month', transaction_date)::date, type, COALESCE(status, ''), "
+            f"COALESCE(category_id, '{NONE_ID}'::uuid), COALESCE(project_id, '{NONE_ID}'::uuid), "
+            f"COALESCE(supplier_id, '{NONE_ID}'::uuid), COALESCE(payment_method, ''), "
+            f"{sign} * count(*), {sign} * COALESCE(sum(amount_base), 0) "
+            f"FROM {source_table} {where_clause} "
+            f"GROUP BY 1, 2, 3, 4, 5, 6, 7, 8, 9 "
+            f"ON CONFLICT ON CONSTRAINT uq_transaction_monthly_rollup_key DO UPDATE SET "
+            f"transaction_count = transaction_monthly_rollups.transaction_count + EXCLUDED.transaction_count, "
+            f"total_amount = transaction_monthly_rollups.total_amount + EXCLUDED.total_amount, "
+            f"updated_at = now()"
+        ),
+        params
+    )
+
+async def accumulate_from_table(db: AsyncSession, source_table: str, tenant_id=None):
+    """
+    将某张结构与 transactions 相同的表按维度聚合后累加到汇总表
+
+    用于批量导入（暂存表）和重建（transactions 表）
+    """
+    if tenant_id:
+        await _accumulate(db, source_table, "WHERE tenant_id = :tenant_id", {"tenant_id": tenant_id})
+    else:
+        await _accumulate(db, source_table, "", {})
+
+async def accumulate_transactions(db: AsyncSession, transaction_ids: List[uuid.UUID], sign: int):
+    """
+    按ID集合整体累加或扣减汇总，用于批量修改和删除
+
+    修改前以 sign=-1 扣减旧维度，修改后以 sign=1 累加新维度；删除只需扣减
+    """
+    if not transaction_ids:
+        return
+    await _accumulate(
+        db, "transactions", "WHERE id = ANY(:transaction_ids)",
+        {"transaction_ids": list(transaction_ids)}, sign
+    )
+
+async def rebuild(db: AsyncSession, tenant_id=None):
+    """从交易明细重建汇总（不提交事务）"""
+    statement = delete(TransactionMonthlyRollup)
+    if tenant_id:
+        statement = statement.where(TransactionMonthlyRollup.tenant_id == tenant_id)
+    await db.execute(statement)
+    await accumulate_from_table(db, "transactions", tenant_id)
+
+def _raw_ledger(tenant_id, ranges: List[Tuple[date, date]], project_id=None):
+    """不足整月的日期区间直接从明细聚合，输出列与汇总表一致"""
+    conditions = [
+        Transaction.tenant_id == tenant_id,
+        or_(*[Transaction.transaction_date.between(start, end) for start, end in ranges]),
+    ]
+    if project_id:
+        conditions.append(Transaction.project_id == project_id)
+
+    dimensions = [
+        cast(func.date_trunc('month', Transaction.transaction_date), Date).label('month'),
+        Transaction.type.label('type'),
+        func.coalesce(Transaction.status, NONE_TEXT).label('status'),
+        func.coalesce(Transaction.category_id, literal(NONE_ID)).label('category_id'),
+        func.coalesce(Transaction.project_id, literal(NONE_ID)).label('project_id'),
+        func.coalesce(Transaction.supplier_id, literal(NONE_ID)).label('supplier_id'),
+        func.coalesce(Transaction.payment_method, NONE_TEXT).label('payment_method'),
+    ]
+    return select(
+        *dimensions,
+        # count(*) 不引用 id 列，覆盖索引 idx_transactions_tenant_date_cover 即可满足整个聚合
+        func.count().label('transaction_count'),
+        func.sum(Transaction.amount_base).label('total_amount'),
+    ).where(and_(*conditions)).group_by(*dimensions)
+
+def ledger_source(
+    tenant_id,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    project_id=None
+):
+    """
+    统计数据源子查询
+
+    日期范围内的整月读取汇总表，首尾不足整月的部分从明细聚合后合并，
+    结果与直接聚合明细一致。列: month, type, status, category_id, project_id,
+    supplier_id, payment_method, transaction_count, total_amount
+    """
+    # 整月区间 [first_full, end_full)
+    first_full = None
+    if date_from:
+        first_full = date_from if date_from.day == 1 else month_start(date_from + timedelta(days=32 - date_from.day))
+    end_full = month_start(date_to + timedelta(days=1)) if date_to else None
+
+    if first_full and end_full and first_full >= end_full:
+        raw_ranges = [(date_from, date_to)]
+        use_rollup = False
+    else:
+        raw_ranges = []
+        if date_from and date_from != first_full:
+            raw_ranges.append((date_from, first_full - timedelta(days=1)))
+        if date_to and end_full <= date_to:
+            raw_ranges.append((end_full, date_to))
+        use_rollup = True
+
+    parts = []
+    if use_rollup:
+        rollup = TransactionMonthlyRollup
+        conditions = [rollup.tenant_id == tenant_id]
+        if first_full:
+            conditions.append(rollup.month >= first_full)
+        if end_full:
+            conditions.append(rollup.month < end_full)
+        if project_id:
+            conditions.append(rollup.project_id == project_id)
+        parts.append(
+            select(
+                rollup.month, rollup.type, rollup.status, rollup.category_id, rollup.project_id,
+                rollup.supplier_id, rollup.payment_method, rollup.transaction_count, rollup.total_amount,
+            ).where(and_(*conditions))
+        )
+    if raw_ranges:
+        parts.append(_raw_ledger(tenant_id, raw_ranges, project_id))
+
+    statement = parts[0] if len(parts) == 1 else union_all(*parts)
+    return statement.subquery("ledger")
@@ -0,0 +1,106 @@
+"""
+Celery worker 入口
+
+启动: celery -A app.worker worker -l info
+执行 STATS_JOBS_BACKEND=celery / DELETE_JOBS_BACKEND=celery 时投递的后台任务（见 services/statistics_jobs.py、services/cascade_delete.py）。
+
+定时任务: celery -A app.worker beat -l info
+每天 DAILY_SNAPSHOT_HOUR 点生成各租户每日财务快照（见 services/daily_snapshots.py）。
+"""
+import asyncio
+from datetime import date, timedelta
+
+from celery import Celery
+from celery.schedules import crontab
+
+from .config import settings
+
+celery_app = Celery(
+    "finance_worker",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND
+)
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    task_track_started=True,
+    result_expires=max(settings.STATS_JOB_RESULT_TTL, settings.DELETE_JOB_RESULT_TTL),
+    beat_schedule={
+        "snapshot-daily-statistics": {
+            "task": "statistics.snapshot_daily",
+            "schedule": crontab(hour=settings.DAILY_SNAPSHOT_HOUR, minute=0),
+        },
+    },
+)
+
+async def _run_statistics_job(kind: str, tenant_id: str, params: dict, version: int) -> dict:
+    from .core.database import db_manager, primary_reads
+    from .core.cache import stats_cache
+    from .core.data_version import data_version
+    from .services import statistics_jobs
+
+    # 每个任务在独立的事件循环中执行，连接池和Redis连接随任务创建和关闭
+    await db_manager.initialize()
+    try:
+        # 与接口一致：租户刚写入时副本可能滞后，按主库数据生成该版本的结果
+        if await data_version.recently_bumped(tenant_id):
+            primary_reads.set(True)
+        async for session in db_manager.get_read_session():
+            result = await statistics_jobs.run_job(session, kind, tenant_id, params, version)
+        return {"tenant_id": tenant_id, "result": result}
+    finally:
+        await db_manager.close()
+        await stats_cache.close()
+        await data_version.close()
+
+@celery_app.task(name="statistics.run_job")
+def run_statistics_job(kind: str, tenant_id: str, params: dict, version: int) -> dict:
+    """执行统计后台任务，返回 {"tenant_id", "result"}"""
+    return asyncio.run(_run_statistics_job(kind, tenant_id, params, version))
+
+async def _snapshot_daily_statistics(days: int) -> int:
+    from .core.database import db_manager
+    from .services import daily_snapshots
+
+    await db_manager.initialize()
+    try:
+        # 补齐截至昨天的最近N天（交易写入时已失效的快照在此重新生成）
+        yesterday = date.today() - timedelta(days=1)
+        async with db_manager.session_maker() as session:
+            written = await daily_snapshots.snapshot_days(
+                session, [yesterday - timedelta(days=offset) for offset in range(days)]
+            )
+            await session.commit()
+        return written
+    finally:
+        await db_manager.close()
+
+@celery_app.task(name="statistics.snapshot_daily")
+def snapshot_daily_statistics(days: int = None) -> int:
+    """生成各租户每日财务快照，返回写入行数"""
+    return asyncio.run(_snapshot_daily_statistics(days or settings.DAILY_SNAPSHOT_BACKFILL_DAYS))
+
+async def _cascade_delete(task, target_type: str, tenant_id: str, target_id: str) -> dict:
+    from .core.database import db_manager
+    from .core.data_version import data_version
+    from .services import cascade_delete
+    from .services.background_jobs import PROGRESS_STATE
+
+    meta = {"target_type": target_type, "target_id": target_id, "tenant_id": tenant_id}
+
+    async def report(progress):
+        task.update_state(state=PROGRESS_STATE, meta={**meta, "progress": progress})
+
+    await db_manager.initialize()
+    try:
+        progress = await cascade_delete.run_delete(db_manager.session_maker, target_type, tenant_id, target_id, report)
+        return {**meta, "progress": progress}
+    finally:
+        await data_version.close()
+        await db_manager.close()
+
+@celery_app.task(name="maintenance.cascade_delete", bind=True)
+def cascade_delete(self, target_type: str, tenant_id: str, target_id: str) -> dict:
+    """分批删除项目或租户及其下属数据，执行中以 PROGRESS 状态上报进度"""
+    return asyncio.run(_cascade_delete(self, target_type, tenant_id, target_id))
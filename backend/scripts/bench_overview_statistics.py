@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+财务概览统计新旧实现对比基准
+
+旧实现：对明细表分别执行总计、状态、支付方式、月度趋势、热门分类、最近记录共6次查询。
+新实现：GET /transactions/statistics/overview 的处理函数（月度汇总 + GROUPING SETS 单次聚合，
+加最近记录共2次查询）。
+
+默认生成一个100万行交易的合成租户，对比两者的耗时和SQL语句数，结束后删除合成数据。
+
+用法: python scripts/bench_overview_statistics.py [--rows 1000000] [--runs 5] [--tenant-id <已有租户>] [--keep]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, select, func, and_, case, desc, extract, text
+from sqlalchemy.orm import joinedload
+
+from app.core.database import db_manager
+from app.models.transaction import Transaction, Category
+from app.services import transaction_rollup
+from app.api.v1.transactions import get_transaction_statistics
+
+# 新实现允许的最大SQL语句数
+MAX_NEW_STATEMENTS = 2
+
+
+async def seed_tenant(session, rows):
+    """生成合成租户及其项目、分类、供应商和交易明细"""
+    tenant_id = uuid.uuid4()
+    params = {"tenant_id": tenant_id}
+    await session.execute(
+        text("INSERT INTO tenants (id, name) VALUES (:tenant_id, :name)"),
+        {**params, "name": f"基准租户-{str(tenant_id)[:8]}"}
+    )
+    for table, prefix, count in (("projects", "基准项目", 50), ("categories", "基准分类", 20), ("suppliers", "基准供应商", 30)):
+        await session.execute(
+            text(
+                f"INSERT INTO {table} (id, tenant_id, name) "
+                f"SELECT gen_random_uuid(), :tenant_id, '{prefix}' || g FROM generate_series(1, {count}) AS g"
+            ),
+            params
+        )
+
+    await session.execute(
+        text(
+            "WITH p AS (SELECT array_agg(id) AS ids FROM projects WHERE tenant_id = :tenant_id), "
+            "c AS (SELECT array_agg(id) AS ids FROM categories WHERE tenant_id = :tenant_id), "
+            "s AS (SELECT array_agg(id) AS ids FROM suppliers WHERE tenant_id = :tenant_id) "
+            "INSERT INTO transactions (id, tenant_id, project_id, supplier_id, category_id, transaction_date, "
+            "type, amount, currency, exchange_rate, amount_base, description, tags, payment_method, status, "
+            "created_at, updated_at) "
+            "SELECT gen_random_uuid(), :tenant_id, "
+            "p.ids[1 + g % array_length(p.ids, 1)], "
+            "CASE WHEN g % 5 = 0 THEN NULL ELSE s.ids[1 + g % array_length(s.ids, 1)] END, "
+            "c.ids[1 + g % array_length(c.ids, 1)], "
+            "current_date - (random() * 730)::int, "
+            "CASE WHEN random() < 0.4 THEN 'income' ELSE 'expense' END, "
+            "a.amount, 'CNY', 1, a.amount, '基准交易 ' || g, '[]'::jsonb, "
+            "(ARRAY['bank_transfer', 'cash', 'check', 'credit_card'])[1 + g % 4], "
+            "(ARRAY['confirmed', 'pending', 'approved'])[1 + (g / 7) % 3], now(), now() "
+            "FROM generate_series(1, :rows) AS g, p, c, s, "
+            "LATERAL (SELECT round((random() * 10000 + g * 0)::numeric, 2) + 0.01 AS amount) AS a"
+        ),
+        {**params, "rows": rows}
+    )
+    await transaction_rollup.rebuild(session, tenant_id)
+    await session.commit()
+    await session.execute(text("ANALYZE transactions"))
+    await session.execute(text("ANALYZE transaction_monthly_rollups"))
+    return tenant_id
+
+
+async def legacy_overview(session, tenant_id):
+    """旧实现：逐项扫描明细表"""
+    conditions = [Transaction.tenant_id == tenant_id]
+    await session.execute(
+        select(
+            func.count(Transaction.id),
+            func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0)),
+            func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)),
+            func.count(case((Transaction.type == 'income', 1))),
+            func.count(case((Transaction.type == 'expense', 1))),
+            func.count(case((Transaction.status == 'pending', 1))),
+            func.sum(case((Transaction.status == 'pending', Transaction.amount), else_=0)),
+            func.avg(Transaction.amount)
+        ).where(and_(*conditions))
+    )
+    await session.execute(
+        select(Transaction.status, func.count(Transaction.id)).where(and_(*conditions)).group_by(Transaction.status)
+    )
+    await session.execute(
+        select(Transaction.payment_method, func.count(Transaction.id))
+        .where(and_(*conditions)).group_by(Transaction.payment_method)
+    )
+    year = extract('year', Transaction.transaction_date)
+    month = extract('month', Transaction.transaction_date)
+    await session.execute(
+        select(
+            year, month,
+            func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0)),
+            func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0)),
+            func.count(Transaction.id)
+        ).where(and_(*conditions)).group_by(year, month).order_by(year.desc(), month.desc()).limit(6)
+    )
+    await session.execute(
+        select(Category.name, func.count(Transaction.id), func.sum(Transaction.amount))
+        .select_from(Transaction.__table__.join(Category.__table__, Transaction.category_id == Category.id))
+        .where(and_(*conditions)).group_by(Category.name).order_by(func.sum(Transaction.amount).desc()).limit(5)
+    )
+    result = await session.execute(
+        select(Transaction)
+        .options(joinedload(Transaction.project), joinedload(Transaction.category), joinedload(Transaction.created_by_user))
+        .where(and_(*conditions)).order_by(desc(Transaction.created_at)).limit(5)
+    )
+    result.scalars().all()
+
+
+async def new_overview(session, tenant_id):
+    """新实现：直接调用接口处理函数（绕过统计缓存）"""
+    await get_transaction_statistics.__wrapped__(
+        project_id=None, date_from=None, date_to=None,
+        current_user=SimpleNamespace(tenant_id=tenant_id), db=session
+    )
+
+
+async def measure(session, statements, func_, tenant_id, runs):
+    """多次执行取耗时中位数，并记录单次执行的SQL语句数"""
+    timings = []
+    statement_count = 0
+    for _ in range(runs):
+        statements.clear()
+        start_time = time.perf_counter()
+        await func_(session, tenant_id)
+        timings.append((time.perf_counter() - start_time) * 1000)
+        statement_count = len(statements)
+    return statistics.median(timings), statement_count
+
+
+async def run_benchmark(rows, runs, tenant_id, keep):
+    await db_manager.initialize()
+
+    statements = []
+
+    @event.listens_for(db_manager.engine.sync_engine, "before_cursor_execute")
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    seeded = False
+    async with db_manager.session_maker() as session:
+        if tenant_id:
+            tenant_id = uuid.UUID(tenant_id)
+        else:
+            print(f"生成 {rows} 行合成交易数据...")
+            start_time = time.perf_counter()
+            tenant_id = await seed_tenant(session, rows)
+            seeded = True
+            print(f"   完成，耗时 {time.perf_counter() - start_time:.1f}s，租户 {tenant_id}")
+
+        try:
+            # 预热，避免首次连接和计划缓存影响结果
+            await legacy_overview(session, tenant_id)
+            await new_overview(session, tenant_id)
+
+            legacy_ms, legacy_statements = await measure(session, statements, legacy_overview, tenant_id, runs)
+            new_ms, new_statements = await measure(session, statements, new_overview, tenant_id, runs)
+        finally:
+            if seeded and not keep:
+                await session.rollback()
+                await session.execute(text("DELETE FROM tenants WHERE id = :tenant_id"), {"tenant_id": tenant_id})
+                await session.commit()
+
+    await db_manager.close()
+
+    print(f"   旧实现  中位耗时 {legacy_ms:.1f}ms  SQL语句 {legacy_statements} 次")
+    print(f"   新实现  中位耗时 {new_ms:.1f}ms  SQL语句 {new_statements} 次")
+    if new_ms:
+        print(f"   加速比 {legacy_ms / new_ms:.1f}x")
+
+    if new_statements > MAX_NEW_STATEMENTS:
+        print(f"❌ 新实现的SQL语句数超过 {MAX_NEW_STATEMENTS} 次")
+        return 1
+
+    print("✅ 基准完成")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="财务概览统计新旧实现对比基准")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="合成租户的交易行数")
+    parser.add_argument("--runs", type=int, default=5, help="每种实现的执行次数")
+    parser.add_argument("--tenant-id", default=None, help="使用已有租户，不生成合成数据")
+    parser.add_argument("--keep", action="store_true", help="保留生成的合成数据")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run_benchmark(args.rows, args.runs, args.tenant_id, args.keep)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+项目列表加载方式基准
+
+对项目最多的租户，分别以整行加载（select(Project)，加载全部JSONB大字段）和列表投影加载
+（project_list_options，只加载响应用到的列）读取同样的一页项目，统计每页耗时和Python内存峰值，
+最后以列表投影方式调用 GET /projects 的处理函数测量接口整体耗时。
+
+用法: python scripts/bench_project_list.py [--limit 1000] [--rounds 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response
+from sqlalchemy import select, func, desc
+from sqlalchemy.orm import selectinload
+
+from app.core.database import db_manager
+from app.models.project import Project
+from app.api.v1.projects import get_projects, project_list_options
+
+
+async def find_largest_tenant(session):
+    """找到项目最多的租户"""
+    result = await session.execute(
+        select(Project.tenant_id, func.count(Project.id).label('count'))
+        .group_by(Project.tenant_id)
+        .order_by(desc('count'))
+        .limit(1)
+    )
+    return result.first()
+
+
+async def measure(rounds, load_page):
+    """执行 rounds 次，返回 (行数, 耗时中位数ms, 内存峰值MB中位数)"""
+    timings, peaks, rows = [], [], 0
+    for _ in range(rounds):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        rows = len(await load_page())
+        timings.append((time.perf_counter() - start_time) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024 / 1024)
+        tracemalloc.stop()
+    return rows, statistics.median(timings), statistics.median(peaks)
+
+
+async def run_benchmark(limit, rounds):
+    """对比整行加载和列表投影加载"""
+    await db_manager.initialize()
+
+    async with db_manager.session_maker() as session:
+        tenant = await find_largest_tenant(session)
+        if not tenant:
+            print("❌ 数据库中没有项目，无法运行基准")
+            return 1
+        print(f"租户 {tenant.tenant_id}，共 {tenant.count} 个项目，每页 {limit} 个，各执行 {rounds} 次")
+
+        page = (
+            select(Project)
+            .where(Project.tenant_id == tenant.tenant_id)
+            .order_by(desc(Project.created_at), desc(Project.id))
+            .limit(limit)
+        )
+
+        async def load(options):
+            # 每次清空会话，避免命中身份映射中已加载的对象
+            session.expunge_all()
+            result = await session.execute(page.options(*options))
+            return result.scalars().unique().all()
+
+        variants = [
+            ("整行加载", lambda: load((selectinload(Project.manager),))),
+            ("列表投影", lambda: load(project_list_options())),
+        ]
+        results = {}
+        for label, load_page in variants:
+            results[label] = await measure(rounds, load_page)
+            rows, elapsed_ms, peak_mb = results[label]
+            print(f"   {label:<6} 返回 {rows:<6} 行  耗时 {elapsed_ms:.1f}ms  内存峰值 {peak_mb:.2f}MB")
+
+        current_user = SimpleNamespace(tenant_id=tenant.tenant_id)
+
+        async def call_endpoint():
+            session.expunge_all()
+            return await get_projects(
+                response=Response(), db=session, current_user=current_user, skip=0, limit=limit,
+                cursor=None, status=None, type=None, priority=None, search=None, sort_by_relevance=False
+            )
+
+        rows, elapsed_ms, peak_mb = await measure(rounds, call_endpoint)
+        print(f"   GET /projects 返回 {rows:<6} 行  耗时 {elapsed_ms:.1f}ms  内存峰值 {peak_mb:.2f}MB")
+
+    await db_manager.close()
+
+    _, full_ms, full_mb = results["整行加载"]
+    _, projected_ms, projected_mb = results["列表投影"]
+    print(
+        f"✅ 列表投影耗时 {projected_ms / full_ms:.0%}、内存峰值 {projected_mb / full_mb:.0%}（相对整行加载）"
+        if full_ms and full_mb else "✅ 基准完成"
+    )
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="项目列表加载方式基准")
+    parser.add_argument("--limit", type=int, default=1000, help="每页项目数")
+    parser.add_argument("--rounds", type=int, default=5, help="每种方式执行次数（取中位数）")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run_benchmark(args.limit, args.rounds)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+交易记录列表查询次数回归基准
+
+对数据量最大的租户分别以不同 limit 调用 GET /transactions 的处理函数，
+统计每次请求发出的SQL语句数量和耗时。查询次数必须与 limit 无关，
+否则说明列表接口又出现了逐行查询关联名称的 N+1 问题。
+
+用法: python scripts/bench_transaction_list_queries.py [--limits 10,100,1000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response
+from sqlalchemy import event, select, func, desc
+
+from app.core.database import db_manager
+from app.models.transaction import Transaction
+from app.api.v1.transactions import get_transactions
+
+
+async def find_largest_tenant(session):
+    """找到交易记录最多的租户"""
+    result = await session.execute(
+        select(Transaction.tenant_id, func.count(Transaction.id).label('count'))
+        .group_by(Transaction.tenant_id)
+        .order_by(desc('count'))
+        .limit(1)
+    )
+    return result.first()
+
+
+async def run_benchmark(limits):
+    """按不同 limit 统计查询次数"""
+    await db_manager.initialize()
+
+    statements = []
+
+    @event.listens_for(db_manager.engine.sync_engine, "before_cursor_execute")
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with db_manager.session_maker() as session:
+        tenant = await find_largest_tenant(session)
+        if not tenant:
+            print("❌ 数据库中没有交易记录，无法运行基准")
+            return 1
+
+        print(f"租户 {tenant.tenant_id}，共 {tenant.count} 条交易记录")
+        current_user = SimpleNamespace(tenant_id=tenant.tenant_id)
+
+        results = []
+        for limit in limits:
+            statements.clear()
+            start_time = time.perf_counter()
+            rows = await get_transactions(
+                response=Response(), skip=0, limit=limit, cursor=None, project_id=None, category_id=None,
+                supplier_id=None, type=None, start_date=None, end_date=None,
+                search=None, sort_by_relevance=False, db=session, current_user=current_user
+            )
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            results.append((limit, len(rows), len(statements), elapsed_ms))
+            print(f"   limit={limit:<6} 返回 {len(rows):<6} 行  SQL语句 {len(statements):<4} 次  耗时 {elapsed_ms:.1f}ms")
+
+    await db_manager.close()
+
+    query_counts = {count for _, _, count, _ in results}
+    if len(query_counts) != 1:
+        print("❌ 查询次数随 limit 增长，列表接口存在 N+1 查询")
+        return 1
+
+    print(f"✅ 查询次数恒定为 {query_counts.pop()} 次")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="交易记录列表查询次数回归基准")
+    parser.add_argument("--limits", default="10,100,1000", help="逗号分隔的 limit 列表")
+    args = parser.parse_args()
+
+    limits = [int(value) for value in args.limits.split(",")]
+    sys.exit(asyncio.run(run_benchmark(limits)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+热点查询执行计划分析
+
+对各接口的代表性查询执行 EXPLAIN (ANALYZE, BUFFERS)，输出执行耗时、读取的数据块、
+使用的索引和是否出现全表/分区顺序扫描。用 --output 保存结果，在建索引之后用 --baseline
+指定之前保存的结果即可对比前后的耗时和索引使用变化。
+
+查询由接口实际使用的构建函数生成（编译为 PostgreSQL 方言并内联参数），接口查询变化后分析随之更新。
+EXPLAIN ANALYZE 会真实执行查询，所有查询都是只读的，并在回滚的事务中执行。
+
+用法: python scripts/explain_hot_queries.py [--tenant-id <租户ID>] [--months 3]
+                                            [--output before.json] [--baseline before.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import date
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text, select, func, desc
+from sqlalchemy.dialects import postgresql
+
+from app.core.database import db_manager
+from app.models.project import Project
+from app.models.transaction import Transaction
+from app.services import transaction_rollup
+from app.api.v1.transactions import _build_transaction_list_query, _build_overview_query
+from app.api.v1.projects import _build_project_list_query
+
+PAGE_SIZE = 20
+
+
+def _transaction_page(params, **filters):
+    """交易列表接口的首页查询（按交易日期+ID倒序）"""
+    return _build_transaction_list_query(params["tenant_id"], **filters).order_by(
+        desc(Transaction.transaction_date), desc(Transaction.id)
+    ).limit(PAGE_SIZE)
+
+
+def _ledger_count(params):
+    """表格统计接口总数较大时的计数查询（整月读汇总表）"""
+    ledger = transaction_rollup.ledger_source(params["tenant_id"], params["date_from"], params["date_to"])
+    return select(func.coalesce(func.sum(ledger.c.transaction_count), 0))
+
+
+# 接口 -> (依赖的参数, 由接口实际使用的查询构建函数生成语句)
+HOT_QUERIES = {
+    "GET /transactions (按日期分页)": (
+        (), lambda p: _transaction_page(p, start_date=p["date_from"], end_date=p["date_to"])
+    ),
+    "GET /transactions?supplier_id (供应商明细)": (
+        ("supplier_id",),
+        lambda p: _transaction_page(
+            p, supplier_id=p["supplier_id"], start_date=p["date_from"], end_date=p["date_to"]
+        )
+    ),
+    "GET /transactions?category_id (分类明细)": (
+        ("category_id",),
+        lambda p: _transaction_page(
+            p, category_id=p["category_id"], start_date=p["date_from"], end_date=p["date_to"]
+        )
+    ),
+    "GET /transactions?project_id (项目明细)": (
+        ("project_id",), lambda p: _transaction_page(p, project_id=p["project_id"])
+    ),
+    "GET /transactions/statistics/overview (汇总表+边缘月份明细)": (
+        (),
+        lambda p: _build_overview_query(
+            transaction_rollup.ledger_source(p["tenant_id"], date_from=p["date_from"], date_to=p["date_to"])
+        )
+    ),
+    "GET /transactions/statistics/table (汇总表计数)": ((), _ledger_count),
+    "GET /projects (按创建时间分页)": (
+        (),
+        lambda p: _build_project_list_query(p["tenant_id"]).order_by(
+            desc(Project.created_at), desc(Project.id)
+        ).limit(PAGE_SIZE)
+    ),
+    "GET /projects?status (按状态分页)": (
+        (),
+        lambda p: _build_project_list_query(p["tenant_id"], status=p["project_status"]).order_by(
+            desc(Project.created_at), desc(Project.id)
+        ).limit(PAGE_SIZE)
+    ),
+}
+
+
+def render_sql(statement) -> str:
+    """按 PostgreSQL 方言编译并内联参数，EXPLAIN 的就是接口实际执行的SQL"""
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+# 只有这些计划节点类型才读取基表的全部数据
+SEQUENTIAL_NODE_TYPES = {"Seq Scan", "Parallel Seq Scan"}
+
+
+async def pick_parameters(session, tenant_id, months):
+    """为查询挑选参数：默认取交易最多的租户，以及该租户下最常用的供应商、分类、项目和项目状态"""
+    if not tenant_id:
+        result = await session.execute(text(
+            "SELECT tenant_id FROM transactions GROUP BY tenant_id ORDER BY count(*) DESC LIMIT 1"
+        ))
+        tenant_id = result.scalar_one_or_none()
+        if tenant_id is None:
+            return None
+
+    params = {"tenant_id": tenant_id}
+    for key, column in (("supplier_id", "supplier_id"), ("category_id", "category_id"), ("project_id", "project_id")):
+        result = await session.execute(
+            text(
+                f"SELECT {column} FROM transactions WHERE tenant_id = :tenant_id AND {column} IS NOT NULL "
+                f"GROUP BY {column} ORDER BY count(*) DESC LIMIT 1"
+            ),
+            {"tenant_id": tenant_id}
+        )
+        params[key] = result.scalar_one_or_none()
+
+    result = await session.execute(
+        text("SELECT status FROM projects WHERE tenant_id = :tenant_id GROUP BY status ORDER BY count(*) DESC LIMIT 1"),
+        {"tenant_id": tenant_id}
+    )
+    params["project_status"] = result.scalar_one_or_none() or "active"
+
+    today = date.today()
+    month_index = today.year * 12 + today.month - 1 - months
+    params["date_from"] = date(month_index // 12, month_index % 12 + 1, 1)
+    params["date_to"] = today
+    return params
+
+
+def summarize_plan(plan):
+    """从JSON格式的执行计划中提取耗时、数据块、索引和扫描方式"""
+    indexes = set()
+    node_types = set()
+    sequential_scans = set()
+
+    def walk(node):
+        node_types.add(node["Node Type"])
+        if node.get("Index Name"):
+            indexes.add(node["Index Name"])
+        if node["Node Type"] in SEQUENTIAL_NODE_TYPES:
+            sequential_scans.add(node.get("Relation Name", ""))
+        for child in node.get("Plans", []):
+            walk(child)
+
+    root = plan["Plan"]
+    walk(root)
+    return {
+        "execution_ms": round(plan["Execution Time"], 3),
+        "planning_ms": round(plan["Planning Time"], 3),
+        "shared_hit_blocks": root.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": root.get("Shared Read Blocks", 0),
+        "indexes": sorted(indexes),
+        "sequential_scans": sorted(sequential_scans),
+        "node_types": sorted(node_types),
+    }
+
+
+async def explain_queries(session, params):
+    """逐个执行 EXPLAIN ANALYZE，缺少参数的查询跳过"""
+    results = {}
+    for name, (required, build) in HOT_QUERIES.items():
+        missing = [key for key in required if params.get(key) is None]
+        if missing:
+            results[name] = {"skipped": f"缺少参数 {', '.join(missing)}"}
+            continue
+        sql = render_sql(build(params))
+        result = await session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        results[name] = summarize_plan(plan[0])
+    await session.rollback()
+    return results
+
+
+def print_report(results, baseline):
+    """输出每个查询的结果，有基线时输出耗时变化和索引使用变化"""
+    for name, summary in results.items():
+        print(f"\n{name}")
+        if "skipped" in summary:
+            print(f"   跳过: {summary['skipped']}")
+            continue
+
+        line = f"   执行 {summary['execution_ms']:.2f}ms  规划 {summary['planning_ms']:.2f}ms  " \
+               f"数据块 命中 {summary['shared_hit_blocks']} / 读取 {summary['shared_read_blocks']}"
+        before = (baseline or {}).get(name)
+        if before and "skipped" not in before:
+            if summary["execution_ms"]:
+                line += f"  (之前 {before['execution_ms']:.2f}ms，{before['execution_ms'] / summary['execution_ms']:.1f}x)"
+            else:
+                line += f"  (之前 {before['execution_ms']:.2f}ms)"
+        print(line)
+        print(f"   索引: {', '.join(summary['indexes']) or '无'}")
+        if before and "skipped" not in before and before["indexes"] != summary["indexes"]:
+            print(f"   之前索引: {', '.join(before['indexes']) or '无'}")
+        if summary["sequential_scans"]:
+            print(f"   ⚠️ 顺序扫描: {', '.join(summary['sequential_scans'])}")
+
+
+async def run_advisor(tenant_id, months, output, baseline_path):
+    await db_manager.initialize()
+
+    async with db_manager.session_maker() as session:
+        params = await pick_parameters(session, tenant_id, months)
+        if params is None:
+            await db_manager.close()
+            print("❌ 没有交易数据，无法分析")
+            return 1
+        results = await explain_queries(session, params)
+
+    await db_manager.close()
+
+    baseline = None
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"租户 {params['tenant_id']}，日期范围 {params['date_from']} ~ {params['date_to']}")
+    print_report(results, baseline)
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到 {output}")
+
+    sequential = [name for name, summary in results.items() if summary.get("sequential_scans")]
+    if sequential:
+        print(f"\n⚠️ {len(sequential)} 个查询仍有顺序扫描（小表或统计信息过期时属正常，可先执行 ANALYZE）")
+
+    print("✅ 执行计划分析完成")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="热点查询执行计划分析")
+    parser.add_argument("--tenant-id", default=None, help="分析指定租户（默认取交易最多的租户）")
+    parser.add_argument("--months", type=int, default=3, help="日期范围查询覆盖的月数")
+    parser.add_argument("--output", default=None, help="把结果保存为JSON，作为之后对比的基线")
+    parser.add_argument("--baseline", default=None, help="与之前保存的结果对比")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run_advisor(args.tenant_id, args.months, args.output, args.baseline)))
+
+
+if __name__ == "__main__":
+    main()
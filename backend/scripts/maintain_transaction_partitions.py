@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+交易表分区维护
+
+预建当月及未来月份的分区（建议每天由定时任务执行一次），列出各分区的估算行数和占用空间；
+指定 --detach-before 时把早于该月份的分区从 transactions 分离，分离后的表可单独归档或删除。
+默认分区中有数据时说明存在未建分区的日期，可用 --create-month 补建对应月份的分区。
+
+用法: python scripts/maintain_transaction_partitions.py [--months-ahead 3] [--create-month 2020-01]
+                                                       [--detach-before 2020-01]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import db_manager
+from app.services import transaction_partitions
+
+
+def parse_month(value):
+    """解析 YYYY-MM 格式的月份"""
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"月份格式应为 YYYY-MM: {value}")
+
+
+async def maintain_partitions(months_ahead=None, create_months=(), detach_before=None):
+    """预建、补建、分离分区并输出分区概况"""
+    await db_manager.initialize()
+
+    async with db_manager.session_maker() as session:
+        try:
+            created = await transaction_partitions.ensure_partitions(session, months_ahead)
+            print(f"   ✅ 预建未来月份分区 {created} 个")
+            for month in create_months:
+                name = await transaction_partitions.create_partition(session, month)
+                print(f"   ✅ 分区 {name} 已就绪")
+            if detach_before:
+                detached = await transaction_partitions.detach_partitions_before(session, detach_before)
+                for name in detached:
+                    print(f"   ✅ 已分离分区 {name}")
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            await db_manager.close()
+            print(f"❌ 分区维护失败: {e}")
+            return 1
+
+        partitions = await transaction_partitions.list_partitions(session)
+
+    await db_manager.close()
+
+    print(f"交易表共 {len(partitions)} 个分区:")
+    default_rows = 0
+    for partition in partitions:
+        print(
+            f"   {partition['name']:<24} {partition['bound']:<60} "
+            f"约 {partition['estimated_rows']} 行  {partition['total_bytes'] / 1024 / 1024:.1f}MB"
+        )
+        if partition["name"] == transaction_partitions.DEFAULT_PARTITION:
+            default_rows = partition["estimated_rows"]
+
+    if default_rows:
+        print("❌ 默认分区中有数据，请用 --create-month 补建对应月份的分区")
+        return 1
+
+    print("✅ 交易表分区维护完成")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="交易表分区维护")
+    parser.add_argument("--months-ahead", type=int, default=None, help="预建的未来月份分区数（默认取配置）")
+    parser.add_argument("--create-month", type=parse_month, action="append", default=[], help="补建指定月份的分区，可重复")
+    parser.add_argument("--detach-before", type=parse_month, default=None, help="分离早于该月份的分区")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(maintain_partitions(args.months_ahead, args.create_month, args.detach_before)))
+
+
+if __name__ == "__main__":
+    main()
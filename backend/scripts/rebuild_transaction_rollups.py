@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+重建交易月度汇总
+
+从交易明细重新计算 transaction_monthly_rollups，每个租户在独立事务中完成
+（删除旧汇总并重新聚合），用于修复汇总偏差或手工改动明细后的数据校正。
+
+用法: python scripts/rebuild_transaction_rollups.py [--tenant-id <租户ID>]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from app.core.database import db_manager
+from app.models.tenant import Tenant
+from app.services import transaction_rollup
+
+
+async def rebuild_rollups(tenant_id=None):
+    """逐租户重建汇总"""
+    await db_manager.initialize()
+
+    async with db_manager.session_maker() as session:
+        if tenant_id:
+            tenant_ids = [tenant_id]
+        else:
+            result = await session.execute(select(Tenant.id))
+            tenant_ids = [row.id for row in result.all()]
+
+    print(f"开始重建 {len(tenant_ids)} 个租户的交易月度汇总...")
+    failed = 0
+    for current_tenant_id in tenant_ids:
+        start_time = time.perf_counter()
+        async with db_manager.session_maker() as session:
+            try:
+                await transaction_rollup.rebuild(session, current_tenant_id)
+                await session.commit()
+                elapsed_ms = (time.perf_counter() - start_time) * 1000
+                print(f"   ✅ 租户 {current_tenant_id} 完成，耗时 {elapsed_ms:.1f}ms")
+            except Exception as e:
+                await session.rollback()
+                failed += 1
+                print(f"   ❌ 租户 {current_tenant_id} 失败: {e}")
+
+    await db_manager.close()
+
+    if failed:
+        print(f"❌ {failed} 个租户重建失败")
+        return 1
+
+    print("✅ 交易月度汇总重建完成")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重建交易月度汇总")
+    parser.add_argument("--tenant-id", default=None, help="只重建指定租户")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(rebuild_rollups(args.tenant_id)))
+
+
+if __name__ == "__main__":
+    main()
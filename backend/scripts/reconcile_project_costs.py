@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+项目实际成本对账
+
+从支出明细批量重算每个项目的实际成本，与 projects.actual_cost 对比并列出偏差；
+指定 --fix 时按明细重写实际成本，并刷新成本偏差和预算使用率。
+
+用法: python scripts/reconcile_project_costs.py [--tenant-id <租户ID>] [--fix] [--tolerance 0.01]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from decimal import Decimal
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import db_manager
+from app.services import project_costs
+
+# 最多打印的偏差项目数
+MAX_PRINTED_ROWS = 50
+
+
+async def reconcile_costs(tenant_id=None, fix=False, tolerance=Decimal("0")):
+    """对账并按需修复"""
+    await db_manager.initialize()
+
+    start_time = time.perf_counter()
+    async with db_manager.session_maker() as session:
+        try:
+            drift = await project_costs.reconcile(session, tenant_id, fix=fix)
+            if fix:
+                await session.commit()
+        except Exception as e:
+            await session.rollback()
+            await db_manager.close()
+            print(f"❌ 对账失败: {e}")
+            return 1
+
+    await db_manager.close()
+
+    drift = [row for row in drift if abs(row["drift"]) > tolerance]
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    print(f"对账完成，耗时 {elapsed_ms:.1f}ms，{len(drift)} 个项目实际成本存在偏差")
+    for row in drift[:MAX_PRINTED_ROWS]:
+        print(
+            f"   租户 {row['tenant_id']} 项目 {row['name']} ({row['project_id']}): "
+            f"存储 {row['stored_cost']}，明细 {row['expected_cost']}，偏差 {row['drift']}"
+        )
+    if len(drift) > MAX_PRINTED_ROWS:
+        print(f"   ... 其余 {len(drift) - MAX_PRINTED_ROWS} 个项目未列出")
+
+    if drift and not fix:
+        print("❌ 存在偏差，使用 --fix 按明细修复")
+        return 1
+
+    print("✅ 项目实际成本已修复" if fix else "✅ 项目实际成本一致")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="项目实际成本对账")
+    parser.add_argument("--tenant-id", default=None, help="只对账指定租户")
+    parser.add_argument("--fix", action="store_true", help="按明细重写实际成本并刷新派生字段")
+    parser.add_argument("--tolerance", type=Decimal, default=Decimal("0"), help="忽略不超过该金额的偏差")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(reconcile_costs(args.tenant_id, args.fix, args.tolerance)))
+
+
+if __name__ == "__main__":
+    main()
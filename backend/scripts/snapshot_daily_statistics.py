@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+生成租户每日财务快照
+
+默认补齐截至昨天最近 DAILY_SNAPSHOT_BACKFILL_DAYS 天缺失或已失效的快照（与 celery beat 定时任务相同），
+首次上线或调整快照内容后可用 --days 回填更长的历史，--force 重新生成已有快照。
+
+用法: python scripts/snapshot_daily_statistics.py [--date 2026-10-16] [--days 365]
+                                                 [--tenant-id <uuid>] [--force]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.core.database import db_manager
+from app.services import daily_snapshots
+
+
+def parse_date(value):
+    """解析 YYYY-MM-DD 格式的日期"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式应为 YYYY-MM-DD: {value}")
+
+
+async def snapshot(end_date=None, days=None, tenant_id=None, force=False):
+    """按日期逐日生成快照（每天一个事务，便于长时间回填时中断后继续）"""
+    end_date = end_date or date.today() - timedelta(days=1)
+    days = days or settings.DAILY_SNAPSHOT_BACKFILL_DAYS
+    if end_date >= date.today():
+        print("❌ 只能为已结束的日期生成快照")
+        return 1
+
+    await db_manager.initialize()
+    started = time.perf_counter()
+    total = 0
+    try:
+        for offset in range(days):
+            day = end_date - timedelta(days=offset)
+            async with db_manager.session_maker() as session:
+                written = await daily_snapshots.snapshot_days(
+                    session, [day], tenant_id=tenant_id, only_missing=not force
+                )
+                await session.commit()
+            total += written
+            if written:
+                print(f"   ✅ {day} 写入 {written} 条快照")
+    except Exception as e:
+        print(f"❌ 生成快照失败: {e}")
+        return 1
+    finally:
+        await db_manager.close()
+
+    print(f"✅ 每日快照生成完成，共写入 {total} 条，耗时 {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成租户每日财务快照")
+    parser.add_argument("--date", type=parse_date, default=None, help="最后一天（默认昨天）")
+    parser.add_argument("--days", type=int, default=None, help="向前回填的天数（默认取配置）")
+    parser.add_argument("--tenant-id", default=None, help="只处理指定租户")
+    parser.add_argument("--force", action="store_true", help="重新生成已有快照")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(snapshot(args.date, args.days, args.tenant_id, args.force)))
+
+
+if __name__ == "__main__":
+    main()